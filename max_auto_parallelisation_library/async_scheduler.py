@@ -0,0 +1,72 @@
+import asyncio
+import functools
+import inspect
+from max_auto_parallelisation_library.executors import task_worker_count
+from max_auto_parallelisation_library.graph import successor_map
+from max_auto_parallelisation_library.mapping import MapRun
+from max_auto_parallelisation_library.scheduler import release_successors, task_args, task_function, store_outputs
+from max_auto_parallelisation_library.store import TaskView
+
+
+async def run_dataflow_async(precedence, task_map, backend, variables=None, successors=None, concurrency=100):
+    """
+    Executes tasks on the running event loop as soon as all of their own predecessors have finished.
+    Coroutine run functions are awaited on the loop, so thousands of IO-bound tasks can wait
+    at the same time without a thread each. Other run functions are offloaded to the executor
+    chosen by the backend.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: list_of_dependencies}.
+        task_map: A dictionary {task_name: Task}.
+        backend: An executor backend (see executors.py) for the run functions that are not coroutines.
+        variables: See scheduler.run_dataflow.
+        successors: The successor map of the graph, computed if not given.
+        concurrency (int): Maximum number of tasks running at the same time.
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+    remaining_deps = {task_name: len(deps) for task_name, deps in precedence.items()}
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def execute(task):
+        async with semaphore:
+            args = task_args(task, variables)
+            if inspect.iscoroutinefunction(task.run):
+                result = await task.run(*args)
+                if args and isinstance(args[0], TaskView):
+                    return args[0].outputs(result)
+                return result
+            executor = backend.executor_for(task)
+            if isinstance(task.run, MapRun) and variables is not None:
+                # one call per chunk, as with the other schedulers
+                return await asyncio.wrap_future(task.run.submit(executor, args[0], task_worker_count(backend, task)))
+            return await loop.run_in_executor(executor, functools.partial(task_function(task, variables), *args))
+
+    running = {}
+    ready_tasks = [task_name for task_name, count in remaining_deps.items() if count == 0]
+    try:
+        while ready_tasks or running:
+            while ready_tasks:
+                task_name = ready_tasks.pop()
+                task = task_map.get(task_name)
+                if task and task.run:
+                    running[asyncio.ensure_future(execute(task))] = task_name
+                else:
+                    ready_tasks.extend(release_successors(task_name, successors, remaining_deps))
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                task_name = running.pop(future)
+                # propagates the exception raised by the task, if any
+                store_outputs(task_map[task_name], future.result(), variables)
+                ready_tasks.extend(release_successors(task_name, successors, remaining_deps))
+    finally:
+        # on failure, the coroutines still running are cancelled
+        for future in running:
+            future.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,256 @@
+"""
+Benchmark suite for the planning and the execution of task systems.
+
+Synthetic task systems of growing size are generated (chains, fan-out/fan-in,
+random layered DAGs, tasks sharing a few variables) and each planning step is
+timed separately. Results are written as JSON or CSV so that they can be
+compared across versions:
+
+    python -m max_auto_parallelisation_library.benchmark --sizes 100 1000 --output results.json
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.validators import TaskSystemValidator
+from max_auto_parallelisation_library.bernstein import max_parallel_precedence
+from max_auto_parallelisation_library.graph import compute_levels, transitive_reduction
+
+
+# Task bodies
+
+def make_body(kind, duration=0.001):
+    """
+    Returns a task run function.
+
+    Args:
+        kind (str): "none" (no run function), "sleep", "cpu" (busy loop) or "io" (file write and read).
+        duration (float): Approximate duration of the body in seconds (for "io", the
+            number of bytes written is duration * 100 MB).
+    """
+    if kind == "none":
+        return None
+    if kind == "sleep":
+        def run():
+            time.sleep(duration)
+        return run
+    if kind == "cpu":
+        def run():
+            end = time.perf_counter() + duration
+            while time.perf_counter() < end:
+                sum(range(100))
+        return run
+    if kind == "io":
+        payload = os.urandom(max(1, int(duration * 100_000_000)))
+
+        def run():
+            with tempfile.TemporaryFile() as file:
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+                file.seek(0)
+                file.read()
+        return run
+    raise ValueError(f"Unknown task body: {kind}")
+
+
+# Synthetic task systems
+
+def chain_system(num_tasks, body=None):
+    """Each task reads the variable written by the previous one."""
+    tasks = [
+        Task(name=f"T{i}", reads=[f"V{i}"] if i else [], writes=[f"V{i + 1}"], run=body)
+        for i in range(num_tasks)
+    ]
+    precedence = {f"T{i}": [f"T{i - 1}"] if i else [] for i in range(num_tasks)}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def fan_out_fan_in_system(num_tasks, body=None):
+    """A source task, num_tasks - 2 independent tasks reading its output, and a sink reading them all."""
+    width = max(1, num_tasks - 2)
+    tasks = [Task(name="source", writes=["IN"], run=body)]
+    precedence = {"source": []}
+    for i in range(width):
+        tasks.append(Task(name=f"T{i}", reads=["IN"], writes=[f"OUT{i}"], run=body))
+        precedence[f"T{i}"] = ["source"]
+    tasks.append(Task(name="sink", reads=[f"OUT{i}" for i in range(width)], writes=["RESULT"], run=body))
+    precedence["sink"] = [f"T{i}" for i in range(width)]
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def random_layered_system(num_tasks, body=None, num_layers=10, density=0.2, seed=0):
+    """
+    Tasks split in layers, each task reads a random subset of the variables written
+    by the previous layer and depends on the tasks that wrote them.
+    """
+    rng = random.Random(seed)
+    width = max(1, num_tasks // num_layers)
+    tasks = []
+    precedence = {}
+    previous = []
+    for i in range(num_tasks):
+        if i % width == 0 and tasks:
+            previous = tasks[-width:]
+        inputs = [task for task in previous if rng.random() < density]
+        name = f"T{i}"
+        tasks.append(Task(
+            name=name,
+            reads=[task.writes[0] for task in inputs],
+            writes=[f"V{i}"],
+            run=body,
+        ))
+        precedence[name] = [task.name for task in inputs]
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def wide_shared_variable_system(num_tasks, body=None, num_vars=10, seed=0):
+    """
+    Tasks declared in a total order, each one reading and writing a few variables out of
+    num_vars shared ones: many conflicts for the Bernstein pass to check.
+    """
+    rng = random.Random(seed)
+    variables = [f"V{i}" for i in range(num_vars)]
+    tasks = [
+        Task(name=f"T{i}", reads=rng.sample(variables, 2), writes=rng.sample(variables, 1), run=body)
+        for i in range(num_tasks)
+    ]
+    precedence = {f"T{i}": [f"T{i - 1}"] if i else [] for i in range(num_tasks)}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+GENERATORS = {
+    "chain": chain_system,
+    "fan_out_fan_in": fan_out_fan_in_system,
+    "random_layered": random_layered_system,
+    "wide_shared_variable": wide_shared_variable_system,
+}
+
+
+# Measures
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark_planning(system):
+    """
+    Times each planning step of a task system separately.
+
+    Returns:
+        A dictionary {step: seconds}.
+    """
+    _, validation = _timed(TaskSystemValidator.validate_system, system.tasks, system.precedence)
+    max_precedence, bernstein = _timed(max_parallel_precedence, system.tasks, system.precedence)
+    reduced, reduction = _timed(transitive_reduction, max_precedence)
+    _, levels = _timed(compute_levels, reduced)
+    return {
+        "validation": validation,
+        "bernstein": bernstein,
+        "transitive_reduction": reduction,
+        "levels": levels,
+        "edges": sum(len(deps) for deps in system.precedence.values()),
+        "max_parallel_edges": sum(len(deps) for deps in reduced.values()),
+    }
+
+
+def benchmark_execution(system, modes=("levels", "dataflow")):
+    """
+    Times runSeq and run in each mode, once the execution plan is computed.
+
+    Returns:
+        A dictionary {mode: seconds}.
+    """
+    system.get_plan()
+    results = {}
+    _, results["runSeq"] = _timed(system.runSeq)
+    for mode in modes:
+        _, results[f"run_{mode}"] = _timed(lambda: system.run(mode=mode))
+    return results
+
+
+def run_benchmarks(sizes=(100, 1000), generators=None, bodies=("none",),
+                   execute_up_to=200, duration=0.001, repeat=1):
+    """
+    Runs the benchmark suite.
+
+    Args:
+        sizes: Numbers of tasks of the generated systems.
+        generators: Names of the generators to use (see GENERATORS), all by default.
+        bodies: Task bodies (see make_body). With "none", only the planning is measured.
+        execute_up_to (int): Systems larger than this are only planned, not executed.
+        duration (float): Duration of each task body in seconds.
+        repeat (int): Number of measures of each configuration.
+
+    Returns:
+        A list of flat dictionaries, one per measure.
+    """
+    records = []
+    for generator_name in generators or GENERATORS:
+        generator = GENERATORS[generator_name]
+        for size in sizes:
+            for body in bodies:
+                for run_index in range(repeat):
+                    system = generator(size, body=make_body(body, duration))
+                    record = {
+                        "generator": generator_name,
+                        "tasks": size,
+                        "body": body,
+                        "run": run_index,
+                        "python": platform.python_version(),
+                    }
+                    record.update(benchmark_planning(system))
+                    if body != "none" and size <= execute_up_to:
+                        record.update(benchmark_execution(system))
+                    records.append(record)
+    return records
+
+
+def write_results(records, path):
+    """Writes the records as CSV if path ends with .csv, as JSON otherwise."""
+    if str(path).endswith(".csv"):
+        fields = []
+        for record in records:
+            fields.extend(key for key in record if key not in fields)
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w") as file:
+            json.dump(records, file, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the planning and execution of task systems.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--generators", nargs="+", choices=sorted(GENERATORS))
+    parser.add_argument("--bodies", nargs="+", default=["none", "sleep"],
+                        choices=["none", "sleep", "cpu", "io"])
+    parser.add_argument("--execute-up-to", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=0.001)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    records = run_benchmarks(
+        sizes=args.sizes,
+        generators=args.generators,
+        bodies=args.bodies,
+        execute_up_to=args.execute_up_to,
+        duration=args.duration,
+        repeat=args.repeat,
+    )
+    write_results(records, args.output)
+    print(f"{len(records)} measures written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from max_auto_parallelisation_library.graph import topological_order, ancestor_bitsets, iter_bits
+from max_auto_parallelisation_library.resources import ResourceIndex
+
+
+class ConflictIndex:
+    """
+    Inverted index from variables to the tasks that read or write them.
+
+    Variable names are interned to integer ids and, for each variable, the readers
+    and the writers are stored as bitsets over task positions. The tasks conflicting
+    with a given task (Bernstein's conditions) are then obtained with a few bitwise
+    operations, without comparing tasks that share no variable.
+
+    Structured resource keys (tuples, see the resources module) are kept in a ResourceIndex,
+    so that partitions, ranges and wildcards of the same dataset conflict only when they overlap.
+    """
+
+    def __init__(self, tasks, index):
+        """
+        Args:
+            tasks (list[Task]): The tasks to index.
+            index (dict): Position of each task name in the bitsets.
+        """
+        self.variable_ids = {}
+        self.readers = []
+        self.writers = []
+        self.structured = ResourceIndex()
+        for task in tasks:
+            self.add(task, index[task.name])
+
+    def add(self, task, position):
+        """Indexes the reads and writes of a task at the given bit position."""
+        bit = 1 << position
+        for var in task.reads:
+            if isinstance(var, tuple):
+                self.structured.add(var, ResourceIndex.READ, bit)
+            else:
+                self.readers[self._intern(var)] |= bit
+        for var in task.writes:
+            if isinstance(var, tuple):
+                self.structured.add(var, ResourceIndex.WRITE, bit)
+            else:
+                self.writers[self._intern(var)] |= bit
+
+    def remove(self, task, position):
+        """Removes a task previously indexed at the given bit position."""
+        bit = 1 << position
+        for var in task.reads:
+            if isinstance(var, tuple):
+                self.structured.remove(var, ResourceIndex.READ, bit)
+            else:
+                self.readers[self.variable_ids[var]] &= ~bit
+        for var in task.writes:
+            if isinstance(var, tuple):
+                self.structured.remove(var, ResourceIndex.WRITE, bit)
+            else:
+                self.writers[self.variable_ids[var]] &= ~bit
+
+    def _intern(self, var):
+        var_id = self.variable_ids.get(var)
+        if var_id is None:
+            var_id = len(self.readers)
+            self.variable_ids[var] = var_id
+            self.readers.append(0)
+            self.writers.append(0)
+        return var_id
+
+    def conflicts(self, task):
+        """
+        Returns the bitset of the tasks that do not satisfy Bernstein's conditions with task
+        (the task itself may be included).
+        """
+        mask = 0
+        for var in task.writes:
+            if isinstance(var, tuple):
+                mask |= self.structured.overlapping(var, ResourceIndex.READ)
+                mask |= self.structured.overlapping(var, ResourceIndex.WRITE)
+            else:
+                var_id = self.variable_ids[var]
+                mask |= self.readers[var_id] | self.writers[var_id]
+        for var in task.reads:
+            if isinstance(var, tuple):
+                mask |= self.structured.overlapping(var, ResourceIndex.WRITE)
+            else:
+                mask |= self.writers[self.variable_ids[var]]
+        return mask
+
+
+def max_parallel_precedence(tasks, precedence):
+    """
+    Computes the precedence of maximum parallelism before redundant edge elimination:
+    task_i precedes task_j when they conflict and task_i is a (direct or transitive)
+    dependency of task_j in the original precedence.
+
+    Args:
+        tasks (list[Task]): The tasks of the system.
+        precedence: The original precedence graph as a dictionary {task: dependencies}.
+
+    Returns:
+        A dictionary {task: set_of_dependencies}.
+    """
+    order = topological_order(precedence)
+    index = {task_name: i for i, task_name in enumerate(order)}
+    ancestors = ancestor_bitsets(precedence, order)
+    conflict_index = ConflictIndex(tasks, index)
+
+    max_precedence = {}
+    for task in tasks:
+        i = index[task.name]
+        deps_mask = ancestors[i] & conflict_index.conflicts(task) & ~(1 << i)
+        max_precedence[task.name] = {order[j] for j in iter_bits(deps_mask)}
+    return max_precedence
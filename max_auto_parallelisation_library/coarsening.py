@@ -0,0 +1,170 @@
+import inspect
+from max_auto_parallelisation_library.graph import successor_map, topological_order
+from max_auto_parallelisation_library.mapping import MapRun
+from max_auto_parallelisation_library.resources import expand
+from max_auto_parallelisation_library.scheduler import store_outputs
+from max_auto_parallelisation_library.store import TaskView
+
+
+class FusedRun:
+    """
+    Run function of a work item made of several tasks, executed one after the other
+    in a topological order. Each task receives its own reads, including the values written
+    by the previous tasks of the work item, and the work item returns all of their writes.
+
+    An exception raised by a task is propagated unchanged, with the name of the failing
+    task in its task_name attribute.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def __call__(self, *args):
+        if not args:
+            for task in self.tasks:
+                self._call(task)
+            return None
+
+        inputs = args[0]
+        values = dict(inputs)
+        outputs = {}
+        for task in self.tasks:
+            task_values = {var: values[var] for var in expand(task.reads, values) if var in values}
+            if isinstance(inputs, TaskView):
+                view = TaskView(task.name, task_values, task.reads, task.writes, inputs._violations)
+                result = view.outputs(self._call(task, view))
+            else:
+                result = self._call(task, task_values)
+            store_outputs(task, result, values)
+            outputs.update(result or {})
+        return outputs
+
+    @staticmethod
+    def _call(task, *args):
+        if task.run is None:
+            return None
+        try:
+            return task.run(*args)
+        except Exception as error:
+            error.task_name = task.name
+            raise
+
+
+def _fusible(task, cost, grain):
+    # map tasks are fanned out over the workers, they are never fused
+    return cost < grain and not inspect.iscoroutinefunction(task.run) and not isinstance(task.run, MapRun)
+
+
+def coarsen(precedence, task_map, costs, grain, successors=None):
+    """
+    Groups the tasks whose estimated cost is below grain into work items of at most grain seconds,
+    so that the scheduling overhead of tiny tasks is paid once per work item:
+    - linear chains (a task with a single successor which has no other dependency) are fused;
+    - the work items with the same dependencies are batched together.
+    Neither step can create a cycle, and the tasks of a work item only conflict with tasks
+    of other work items through the remaining edges, so Bernstein's conditions still hold.
+
+    Args:
+        precedence: The maximum parallelism precedence graph {task: dependencies}.
+        task_map: A dictionary {task_name: Task}.
+        costs: A dictionary {task_name: estimated_cost}.
+        grain (float): Minimum amount of work, in seconds, worth a separate work item.
+        successors: The successor map of the graph, computed if not given.
+
+    Returns:
+        A tuple (precedence, task_map) of the work items. A work item of a single task is
+        the task itself, the others are tasks named after their members joined by "+".
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+
+    def small(task_name):
+        task = task_map.get(task_name)
+        return task is not None and _fusible(task, costs.get(task_name, grain), grain)
+
+    def bound(task_name):
+        return getattr(task_map.get(task_name), "bound", "io")
+
+    # 1. linear chains
+    unit_of = {}
+    members = {}
+    unit_cost = {}
+    for task_name in topological_order(precedence):
+        deps = precedence[task_name]
+        if len(deps) == 1 and small(task_name):
+            dep = next(iter(deps))
+            unit = unit_of[dep]
+            if (small(dep) and len(successors[dep]) == 1 and bound(dep) == bound(task_name)
+                    and unit_cost[unit] + costs[task_name] <= grain):
+                members[unit].append(task_name)
+                unit_of[task_name] = unit
+                unit_cost[unit] += costs[task_name]
+                continue
+        unit_of[task_name] = task_name
+        members[task_name] = [task_name]
+        unit_cost[task_name] = costs.get(task_name, grain)
+
+    unit_deps = _unit_precedence(precedence, members, unit_of)
+
+    # 2. siblings: units with the same dependencies cannot reach each other
+    groups = {}
+    for unit, deps in unit_deps.items():
+        if unit_cost[unit] < grain and all(small(task_name) for task_name in members[unit]):
+            groups.setdefault((frozenset(deps), bound(unit)), []).append(unit)
+    for siblings in groups.values():
+        batch, batch_cost = None, 0
+        for unit in siblings:
+            if batch is not None and batch_cost + unit_cost[unit] <= grain:
+                members[batch].extend(members.pop(unit))
+                batch_cost += unit_cost[unit]
+                for task_name in members[batch]:
+                    unit_of[task_name] = batch
+            else:
+                batch, batch_cost = unit, unit_cost[unit]
+
+    unit_deps = _unit_precedence(precedence, members, unit_of)
+    units = {}
+    unit_names = {}
+    for unit, tasks in members.items():
+        if len(tasks) == 1:
+            unit_names[unit] = tasks[0]
+            if tasks[0] in task_map:
+                units[tasks[0]] = task_map[tasks[0]]
+            continue
+        fused = [task_map[task_name] for task_name in tasks]
+        name = "+".join(tasks)
+        unit_names[unit] = name
+        units[name] = _fused_task(name, fused, sum(costs.get(task.name, 0) for task in fused))
+    fused_precedence = {
+        unit_names[unit]: [unit_names[dep] for dep in deps] for unit, deps in unit_deps.items()
+    }
+    return fused_precedence, units
+
+
+def _unit_precedence(precedence, members, unit_of):
+    unit_deps = {}
+    for unit, tasks in members.items():
+        deps = {unit_of[dep] for task_name in tasks for dep in precedence[task_name]}
+        deps.discard(unit)
+        unit_deps[unit] = deps
+    return unit_deps
+
+
+def _fused_task(name, tasks, cost):
+    # imported here, maxpar imports this module
+    from max_auto_parallelisation_library.maxpar import Task
+
+    reads, writes = [], []
+    for task in tasks:
+        reads.extend(var for var in task.reads if var not in reads)
+        writes.extend(var for var in task.writes if var not in writes)
+    return Task(
+        name=name,
+        reads=reads,
+        writes=writes,
+        run=FusedRun(tasks),
+        bound=tasks[0].bound,
+        cost=cost,
+        # the outputs of the members are held until the work item completes
+        memory=sum(task.memory or 0 for task in tasks) or None,
+    )
@@ -0,0 +1,98 @@
+import heapq
+from max_auto_parallelisation_library.graph import successor_map, topological_order
+
+
+class CostModel:
+    """
+    Estimates the execution time of tasks.
+
+    The estimate of a task is learned from its measured durations (exponential moving
+    average) once it has been executed, and otherwise falls back to the static cost
+    declared on the task, then to default_cost.
+    """
+
+    def __init__(self, default_cost=1.0, smoothing=0.5):
+        """
+        Args:
+            default_cost (float): Estimate of the tasks with no declared or measured cost.
+            smoothing (float): Weight of the last measure in the moving average, between 0 and 1.
+        """
+        self.default_cost = default_cost
+        self.smoothing = smoothing
+        self.measured = {}
+
+    def record(self, task_name, duration):
+        """Records a measured execution time of a task, in seconds."""
+        previous = self.measured.get(task_name)
+        if previous is None:
+            self.measured[task_name] = duration
+        else:
+            self.measured[task_name] = self.smoothing * duration + (1 - self.smoothing) * previous
+
+    def estimate(self, task):
+        """Returns the estimated execution time of a task, in seconds."""
+        if task.name in self.measured:
+            return self.measured[task.name]
+        if getattr(task, "cost", None) is not None:
+            return task.cost
+        return self.default_cost
+
+
+def upward_ranks(precedence, costs, successors=None):
+    """
+    Computes the upward rank of each task: its cost plus the longest chain of costs
+    among its successors, i.e. the length of the critical path starting at the task.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+        costs: A dictionary {task: estimated_cost}.
+        successors: The successor map of the graph, computed if not given.
+
+    Returns:
+        A dictionary {task: rank}.
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+    ranks = {}
+    for task_name in reversed(topological_order(precedence)):
+        ranks[task_name] = costs[task_name] + max(
+            (ranks[successor] for successor in successors[task_name]), default=0
+        )
+    return ranks
+
+
+def predict_makespan(precedence, costs, num_workers, successors=None):
+    """
+    Simulates a list scheduling of the graph on num_workers workers, where ready tasks
+    are started by decreasing upward rank, and returns the predicted total execution time.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+        costs: A dictionary {task: estimated_cost}.
+        num_workers (int): Number of tasks that can run at the same time.
+        successors: The successor map of the graph, computed if not given.
+
+    Returns:
+        The predicted makespan, in the unit of costs.
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+    ranks = upward_ranks(precedence, costs, successors)
+    remaining_deps = {task_name: len(deps) for task_name, deps in precedence.items()}
+
+    ready = [(-ranks[task_name], task_name) for task_name, count in remaining_deps.items() if count == 0]
+    heapq.heapify(ready)
+    running = []  # heap of (end_time, task_name)
+    now = 0.0
+
+    while ready or running:
+        while ready and len(running) < num_workers:
+            _, task_name = heapq.heappop(ready)
+            heapq.heappush(running, (now + costs[task_name], task_name))
+
+        now, task_name = heapq.heappop(running)
+        for successor in successors[task_name]:
+            remaining_deps[successor] -= 1
+            if remaining_deps[successor] == 0:
+                heapq.heappush(ready, (-ranks[successor], successor))
+    return now
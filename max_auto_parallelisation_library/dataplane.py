@@ -0,0 +1,210 @@
+import functools
+from collections import Counter
+from multiprocessing import resource_tracker, shared_memory
+from max_auto_parallelisation_library.memory import version_readers
+from max_auto_parallelisation_library.resources import expand
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only the data plane needs it
+    np = None
+
+
+class SharedArray:
+    """
+    Picklable handle of a NumPy array stored in a shared memory block.
+    Only the name, shape and dtype of the block are sent to the workers, never the data.
+    """
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return (self.name, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.name, self.shape, self.dtype = state
+
+    def __repr__(self):
+        return f"SharedArray({self.name!r}, shape={self.shape}, dtype={self.dtype!r})"
+
+    def ndarray(self, block):
+        """Returns a zero-copy array over an attached shared memory block."""
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=block.buf)
+
+    def copy(self):
+        """Returns a copy of the array, owned by the calling process."""
+        block = shared_memory.SharedMemory(name=self.name)
+        try:
+            return self.ndarray(block).copy()
+        finally:
+            block.close()
+
+
+def _exportable(value, min_bytes):
+    return (
+        np is not None and isinstance(value, np.ndarray)
+        and not value.dtype.hasobject and value.nbytes >= min_bytes
+    )
+
+
+def _create_block(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    handle = SharedArray(block.name, array.shape, array.dtype.str)
+    handle.ndarray(block)[...] = array
+    return block, handle
+
+
+def _untrack(block):
+    # the blocks are owned by the SharedArrayPlane of the parent process, the resource
+    # tracker must not unlink them when a worker process exits
+    resource_tracker.unregister(block._name, "shared_memory")
+
+
+def call_with_shared(function, min_bytes, inputs):
+    """
+    Calls a run function in a worker: its shared inputs are attached as zero-copy arrays,
+    and its large array outputs are written into new shared memory blocks, so only their
+    handles are sent back to the parent process.
+    """
+    blocks = []
+    try:
+        arrays = {}
+        for var, value in inputs.items():
+            if isinstance(value, SharedArray):
+                block = shared_memory.SharedMemory(name=value.name)
+                _untrack(block)
+                blocks.append(block)
+                value = value.ndarray(block)
+            arrays[var] = value
+        outputs = function(arrays)
+        del arrays
+
+        if outputs:
+            outputs = dict(outputs)
+            for var, value in outputs.items():
+                if _exportable(value, min_bytes):
+                    block, outputs[var] = _create_block(value)
+                    _untrack(block)
+                    blocks.append(block)
+        return outputs
+    finally:
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # the task kept a view on its input, the mapping is released with it
+                pass
+
+
+class SharedArrayPlane:
+    """
+    Moves the NumPy arrays exchanged by the tasks through shared memory instead of pickling them.
+
+    Arrays of at least min_bytes written by a task are stored in a shared memory block by the
+    worker that produced them, and the tasks reading them get zero-copy views. Each block is
+    reference counted with the number of tasks reading this version of the variable, computed
+    from the precedence graph, and is freed as soon as its last reader completes. The final
+    value of each variable is copied back into the variables at the end of the run.
+    """
+
+    def __init__(self, min_bytes=1 << 16):
+        """
+        Args:
+            min_bytes (int): Arrays smaller than this are pickled as usual.
+        """
+        if np is None:
+            raise ImportError("SharedArrayPlane requires numpy")
+        self.min_bytes = min_bytes
+        self._consumers = Counter()
+        self._final = set()
+        self._refs = {}
+        self._reading = {}
+        self._originals = {}
+
+    def prepare(self, precedence, task_map, variables):
+        """
+        Counts the readers of each version of each variable, and moves the large initial
+        arrays into shared memory. Must be called before the workers are started.
+        """
+        # started by the parent, so that the workers forked later share its resource tracker
+        resource_tracker.ensure_running()
+        _, self._consumers, last_writer = version_readers(precedence, task_map, variables)
+        self._final = {(writer, var) for var, writer in last_writer.items()}
+
+        for var, value in list(variables.items()):
+            refs = self._count((None, var), final=var not in last_writer)
+            if refs and _exportable(value, self.min_bytes):
+                block, handle = _create_block(value)
+                block.close()
+                self._refs[handle.name] = refs
+                self._originals[var] = (handle.name, value)
+                variables[var] = handle
+
+    def _count(self, version, final=None):
+        if final is None:
+            final = version in self._final
+        return self._consumers[version] + int(final)
+
+    def wrap(self, function):
+        """Returns the run function to submit to the executor."""
+        return functools.partial(call_with_shared, function, self.min_bytes)
+
+    def submitted(self, task, variables):
+        """Records the shared versions read by a task when it is submitted."""
+        self._reading[task.name] = [
+            variables[var].name for var in expand(task.reads, variables)
+            if isinstance(variables.get(var), SharedArray)
+        ]
+
+    def completed(self, task, outputs):
+        """Counts the references to the outputs of a task and releases its inputs."""
+        for var, value in (outputs or {}).items():
+            if isinstance(value, SharedArray):
+                self._refs[value.name] = self._count((task.name, var))
+                if self._refs[value.name] == 0:
+                    self._release(value.name)
+        for name in self._reading.pop(task.name, ()):
+            self._release(name)
+
+    def _release(self, name):
+        refs = self._refs.get(name, 0) - 1
+        if refs > 0:
+            self._refs[name] = refs
+            return
+        self._refs.pop(name, None)
+        _unlink(name)
+
+    def finish(self, variables):
+        """Copies the final shared arrays back into variables and frees every remaining block."""
+        try:
+            for var, value in list(variables.items()):
+                if isinstance(value, SharedArray):
+                    original = self._originals.get(var)
+                    if original is not None and original[0] == value.name:
+                        variables[var] = original[1]
+                    elif value.name in self._refs:
+                        variables[var] = value.copy()
+        finally:
+            for name in self._refs:
+                _unlink(name)
+            self._refs.clear()
+            self._reading.clear()
+            self._originals.clear()
+
+    def __len__(self):
+        """Number of shared memory blocks currently alive."""
+        return len(self._refs)
+
+
+def _unlink(name):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
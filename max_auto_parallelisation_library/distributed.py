@@ -0,0 +1,512 @@
+"""
+Distributed executor backend: a coordinator hands the ready tasks to worker processes
+running on other machines, over TCP sockets.
+
+Start the coordinator with the backend, then one worker per machine (or per core):
+
+    backend = DistributedBackend(address=("0.0.0.0", 7000))
+    system.run(backend=backend, variables={})
+
+    python -m max_auto_parallelisation_library.distributed coordinator-host:7000 --slots 4
+
+Messages are pickled, like with the process backend: the workers must be able to import
+the run functions, and the coordinator and the workers must trust each other.
+"""
+import argparse
+import collections
+import concurrent.futures
+import copy
+import itertools
+import multiprocessing
+import pickle
+import socket
+import struct
+import threading
+import time
+
+_HEADER = struct.Struct("!Q")
+_MISSING = object()
+
+
+class WorkerLostError(RuntimeError):
+    """Raised when the workers executing a task were lost more times than allowed."""
+
+
+def _send(sock, message):
+    _send_data(sock, pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _send_data(sock, data):
+    """Sends an already pickled message."""
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock):
+    """Returns the next message, or None when the connection is closed."""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    data = _recv_exactly(sock, _HEADER.unpack(header)[0])
+    return None if data is None else pickle.loads(data)
+
+
+def _outputs_of(result):
+    # a run function returns its outputs, measured_call returns (outputs, measure)
+    if isinstance(result, dict):
+        return result
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], dict):
+        return result[0]
+    return {}
+
+
+class _Held:
+    """Stands for a value the worker already holds, instead of sending it again."""
+
+    __slots__ = ("var",)
+
+    def __init__(self, var):
+        self.var = var
+
+    def __getstate__(self):
+        return self.var
+
+    def __setstate__(self, var):
+        self.var = var
+
+
+class _Job:
+    __slots__ = ("job_id", "future", "function", "args", "attempts")
+
+    def __init__(self, job_id, function, args):
+        self.job_id = job_id
+        self.future = concurrent.futures.Future()
+        self.function = function
+        self.args = args
+        self.attempts = 0
+
+
+class _Worker:
+    def __init__(self, worker_id, sock, slots):
+        self.worker_id = worker_id
+        self.sock = sock
+        self.slots = slots
+        self.running = {}  # job_id -> _Job
+        self.held = {}  # variable -> value the worker holds, as last sent or received, under send_lock
+        self.last_seen = time.monotonic()
+        self.send_lock = threading.Lock()
+
+    def free_slots(self):
+        return self.slots - len(self.running)
+
+
+class _DistributedExecutor:
+    """Executor interface used by the schedulers, see DistributedBackend.executor_for."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def submit(self, function, *args):
+        return self.backend.submit(function, *args)
+
+
+class DistributedBackend:
+    """
+    Coordinator of remote workers, usable as an executor backend by every scheduler.
+
+    Tasks exchange their variables explicitly: only the values of the declared reads are sent
+    with a task, and the values of its writes are sent back. Each worker keeps the last values
+    it received or produced, and a task is preferably placed on the free worker holding the
+    most of its reads, whose values are then not sent again.
+
+    Workers send a heartbeat every heartbeat_interval seconds. A worker that disconnects or
+    stays silent for heartbeat_timeout seconds is dropped, and its tasks are submitted again
+    to the other workers, up to max_retries times per task.
+    """
+
+    requires_variables = True
+
+    def __init__(self, address=("127.0.0.1", 0), heartbeat_interval=1.0, heartbeat_timeout=5.0, max_retries=2):
+        """
+        Args:
+            address: (host, port) on which the coordinator listens for workers,
+                port 0 picks a free port (see the address attribute).
+            heartbeat_interval (float): Interval of the heartbeats of the workers, in seconds.
+            heartbeat_timeout (float): Silence after which a worker is considered lost.
+            max_retries (int): Number of times a task is submitted again after losing its worker.
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.values_sent = 0
+        self.values_reused = 0
+        self._workers = {}
+        self._pending = collections.deque()
+        self._outbox = collections.deque()  # (worker, job) assigned by _dispatch, sent by _flush
+        self._job_ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._lock = threading.Condition()
+        self._closed = False
+
+        self._listener = socket.create_server(address)
+        self.address = self._listener.getsockname()[:2]
+        self._threads = [
+            threading.Thread(target=self._accept_loop, daemon=True),
+            threading.Thread(target=self._monitor_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def executor_for(self, task):
+        return _DistributedExecutor(self)
+
+    def worker_count(self):
+        """Returns the number of tasks the connected workers can execute at the same time."""
+        with self._lock:
+            return max(1, sum(worker.slots for worker in self._workers.values()))
+
+    def wait_for_workers(self, count, timeout=None):
+        """Blocks until count workers are connected. Returns False on timeout."""
+        with self._lock:
+            return self._lock.wait_for(lambda: len(self._workers) >= count, timeout)
+
+    def submit(self, function, *args):
+        """Queues a call to be executed by a worker and returns its future."""
+        job = _Job(next(self._job_ids), function, args)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The distributed backend is closed")
+            self._pending.append(job)
+            self._dispatch()
+        self._flush()
+        return job.future
+
+    def close(self):
+        """Stops the workers, and fails the tasks that were not executed."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+            pending = list(self._pending)
+            self._pending.clear()
+            self._lock.notify_all()
+        try:
+            # unblocks the accept of the listening thread
+            self._listener.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._listener.close()
+        for worker in workers:
+            pending.extend(worker.running.values())
+            try:
+                with worker.send_lock:
+                    _send(worker.sock, ("shutdown",))
+            except OSError:
+                pass
+            worker.sock.close()
+        for job in pending:
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("The distributed backend was closed"))
+
+    # coordinator internals
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._worker_loop, args=(sock,), daemon=True).start()
+
+    def _worker_loop(self, sock):
+        try:
+            hello = _recv(sock)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            hello = None
+        if not hello or hello[0] != "hello":
+            sock.close()
+            return
+        worker = _Worker(next(self._worker_ids), sock, hello[1])
+        with self._lock:
+            if self._closed:
+                sock.close()
+                return
+            self._workers[worker.worker_id] = worker
+            self._lock.notify_all()
+            self._dispatch()
+        self._flush()
+
+        while True:
+            try:
+                message = _recv(sock)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                message = None
+            if message is None:
+                break
+            worker.last_seen = time.monotonic()
+            if message[0] == "result":
+                self._complete(worker, *message[1:])
+        with self._lock:
+            self._lose(worker)
+        self._flush()
+
+    def _monitor_loop(self):
+        while True:
+            time.sleep(self.heartbeat_interval / 2)
+            with self._lock:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for worker in list(self._workers.values()):
+                    if now - worker.last_seen > self.heartbeat_timeout:
+                        self._lose(worker)
+            self._flush()
+
+    def _complete(self, worker, job_id, ok, result):
+        with self._lock:
+            job = worker.running.pop(job_id, None)
+            if job is None:
+                # the worker was considered lost and the task was submitted again
+                return
+            self._dispatch()
+        if ok:
+            with worker.send_lock:
+                worker.held.update(_outputs_of(result))
+            job.future.set_result(result)
+        else:
+            job.future.set_exception(result)
+        self._flush()
+
+    def _lose(self, worker):
+        """Drops a worker and submits its tasks again. Called with the lock held, see _dispatch."""
+        if self._workers.pop(worker.worker_id, None) is None:
+            return
+        worker.sock.close()
+        for job in worker.running.values():
+            job.attempts += 1
+            if job.attempts > self.max_retries:
+                job.future.set_exception(WorkerLostError(
+                    f"Lost the worker of a task {job.attempts} times"
+                ))
+            else:
+                self._pending.appendleft(job)
+        worker.running.clear()
+        self._dispatch()
+
+    def _dispatch(self):
+        """
+        Assigns the pending tasks to the free workers. Called with the lock held, the tasks
+        are pickled and sent by _flush once it is released.
+        """
+        while self._pending:
+            free = [worker for worker in self._workers.values() if worker.free_slots() > 0]
+            if not free:
+                return
+            job = self._pending.popleft()
+            inputs = job.args[-1] if job.args and isinstance(job.args[-1], dict) else {}
+            # locality: the worker already holding the most of the reads, then the least busy
+            worker = max(free, key=lambda worker: (
+                sum(1 for var, value in inputs.items() if worker.held.get(var, _MISSING) is value),
+                worker.free_slots(),
+            ))
+            worker.running[job.job_id] = job
+            self._outbox.append((worker, job))
+
+    def _flush(self):
+        """
+        Sends the tasks assigned by _dispatch. Called without the lock, so that a slow worker
+        only delays the tasks sent to it.
+        """
+        while True:
+            with self._lock:
+                if not self._outbox:
+                    return
+                worker, job = self._outbox.popleft()
+            self._send_job(worker, job)
+
+    def _send_job(self, worker, job):
+        """Encodes, pickles and sends a task assigned to worker."""
+        error = None
+        lost = False
+        # encoded under the send lock of the worker, whose messages are decoded in order
+        with worker.send_lock:
+            try:
+                args, sent, reused = self._encode_args(worker, job.args)
+                payload = pickle.dumps((job.function, args), protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as pickle_error:
+                error = pickle_error
+            else:
+                # counted before the task can complete, the lock is not held while sending
+                with self._lock:
+                    self.values_sent += len(sent)
+                    self.values_reused += reused
+                try:
+                    _send(worker.sock, ("run", job.job_id, payload))
+                except OSError:
+                    lost = True
+                else:
+                    worker.held.update(sent)
+        with self._lock:
+            if lost:
+                # the job is submitted again by _lose
+                self._lose(worker)
+            elif error is not None:
+                if worker.running.pop(job.job_id, None) is not None:
+                    job.future.set_exception(error)
+                self._dispatch()
+
+    def _encode_args(self, worker, args):
+        """
+        Replaces the values the worker already holds by _Held. Returns the encoded arguments,
+        the values to record as held by the worker once sent, and the number of values reused.
+        """
+        if not args or not isinstance(args[-1], dict):
+            return args, {}, 0
+        inputs = {}
+        sent = {}
+        for var, value in args[-1].items():
+            if worker.held.get(var, _MISSING) is value:
+                inputs[var] = _Held(var)
+            else:
+                inputs[var] = sent[var] = value
+        return args[:-1] + (inputs,), sent, len(inputs) - len(sent)
+
+
+# worker side
+
+def run_worker(address, slots=1, heartbeat_interval=1.0):
+    """
+    Connects to a coordinator and executes the tasks it sends until it shuts down.
+
+    Args:
+        address: (host, port) of the coordinator.
+        slots (int): Number of tasks executed at the same time, in threads.
+        heartbeat_interval (float): Interval of the heartbeats sent to the coordinator.
+    """
+    sock = socket.create_connection(tuple(address))
+    send_lock = threading.Lock()
+    held = {}
+    stop = threading.Event()
+
+    def send(message):
+        send_data(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def send_data(data):
+        with send_lock:
+            _send_data(sock, data)
+
+    def heartbeat():
+        while not stop.wait(heartbeat_interval):
+            try:
+                send(("heartbeat",))
+            except OSError:
+                return
+
+    def decode(payload):
+        function, args = pickle.loads(payload)
+        if args and isinstance(args[-1], dict):
+            # resolved in the order of the messages, before the next task can replace a value;
+            # each task gets its own copy of the held values, which it may modify in place
+            inputs = {}
+            for var, value in args[-1].items():
+                if isinstance(value, _Held):
+                    inputs[var] = copy.deepcopy(held[var])
+                else:
+                    inputs[var] = value
+                    held[var] = copy.deepcopy(value)
+            args = args[:-1] + (inputs,)
+        return function, args
+
+    def report(job_id, ok, result):
+        try:
+            data = pickle.dumps(("result", job_id, ok, result), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            # unpicklable results and exceptions are reported as a failure of the task
+            data = pickle.dumps(("result", job_id, False, RuntimeError(repr(error if ok else result))),
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            send_data(data)
+        except OSError:
+            pass
+
+    def execute(job_id, function, args):
+        try:
+            result = function(*args)
+        except Exception as error:
+            report(job_id, False, error)
+            return
+        held.update(_outputs_of(result))
+        report(job_id, True, result)
+
+    send(("hello", slots))
+    threading.Thread(target=heartbeat, daemon=True).start()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=slots) as pool:
+        try:
+            while True:
+                try:
+                    message = _recv(sock)
+                except OSError:
+                    message = None
+                if message is None or message[0] == "shutdown":
+                    break
+                _, job_id, payload = message
+                try:
+                    function, args = decode(payload)
+                except Exception as error:
+                    report(job_id, False, error)
+                    continue
+                pool.submit(execute, job_id, function, args)
+        finally:
+            stop.set()
+            sock.close()
+
+
+def start_local_workers(address, count, slots=1, heartbeat_interval=1.0):
+    """
+    Starts count worker processes on this machine, connected to the coordinator at address.
+    Useful for tests and for using every core of the coordinator's machine.
+
+    Returns:
+        The list of the multiprocessing.Process of the workers.
+    """
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(
+            target=run_worker, args=(address, slots, heartbeat_interval), daemon=True
+        )
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a worker of a distributed task system.")
+    parser.add_argument("coordinator", help="host:port of the coordinator")
+    parser.add_argument("--slots", type=int, default=1)
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    host, _, port = args.coordinator.rpartition(":")
+    run_worker((host, int(port)), slots=args.slots, heartbeat_interval=args.heartbeat_interval)
+
+
+if __name__ == "__main__":
+    main()
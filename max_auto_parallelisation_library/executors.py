@@ -0,0 +1,158 @@
+import concurrent.futures
+import os
+import threading
+
+
+class _PoolBackend:
+    """
+    Backend owning a long-lived worker pool.
+    The pool is created on first use, reused across runs and task systems,
+    and shut down by close() or at the end of a with block.
+    """
+
+    pool_class = None
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shuts the worker pool down, it is recreated if the backend is used again."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def executor_for(self, task):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self.pool_class(max_workers=self.max_workers)
+        return self._executor
+
+    def worker_count(self):
+        """Returns the number of tasks the pool can execute at the same time."""
+        if self.max_workers is not None:
+            return self.max_workers
+        return self.default_workers()
+
+
+class ThreadBackend(_PoolBackend):
+    """
+    Executes every task in a thread pool.
+    Suited to IO-bound tasks, CPU-bound tasks are serialised by the GIL.
+    """
+
+    pool_class = concurrent.futures.ThreadPoolExecutor
+    requires_variables = False
+
+    @staticmethod
+    def default_workers():
+        # same default as concurrent.futures.ThreadPoolExecutor
+        return min(32, (os.cpu_count() or 1) + 4)
+
+
+class ProcessBackend(_PoolBackend):
+    """
+    Executes every task in a process pool, giving real parallelism to CPU-bound tasks.
+
+    Tasks cannot share module globals with the parent process: their run function
+    must be picklable, receives a dictionary with the values of its reads and returns
+    a dictionary with the values of its writes.
+    """
+
+    pool_class = concurrent.futures.ProcessPoolExecutor
+    requires_variables = True
+
+    @staticmethod
+    def default_workers():
+        return os.cpu_count() or 1
+
+
+class HybridBackend:
+    """
+    Executes the tasks tagged bound="cpu" in a process pool and the other tasks in a thread pool.
+    Tasks exchange their reads and writes explicitly, as with the ProcessBackend.
+    """
+
+    requires_variables = True
+
+    def __init__(self, max_threads=None, max_processes=None):
+        self.threads = ThreadBackend(max_workers=max_threads)
+        self.processes = ProcessBackend(max_workers=max_processes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        try:
+            self.processes.close()
+        finally:
+            self.threads.close()
+
+    def executor_for(self, task):
+        return self.backend_for(task).executor_for(task)
+
+    def backend_for(self, task):
+        """Returns the pool backend executing a task."""
+        if getattr(task, "bound", "io") == "cpu":
+            return self.processes
+        return self.threads
+
+    def worker_count(self):
+        return self.threads.worker_count() + self.processes.worker_count()
+
+
+BACKENDS = {
+    "thread": ThreadBackend,
+    "process": ProcessBackend,
+    "hybrid": HybridBackend,
+}
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def default_backend():
+    """
+    Returns the thread backend shared by the task systems that do not have their own.
+    """
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = ThreadBackend()
+        return _default_backend
+
+
+def task_worker_count(backend, task):
+    """
+    Returns the number of workers of the executor that backend chooses for task, among
+    which the chunks of a map task are spread.
+    """
+    if isinstance(backend, HybridBackend):
+        return backend.backend_for(task).worker_count()
+    return backend.worker_count()
+
+
+def make_backend(backend):
+    """
+    Returns an executor backend.
+
+    Args:
+        backend: The name of a backend ("thread", "process", "hybrid") or a backend instance.
+    """
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown executor backend: {backend}")
+        return BACKENDS[backend]()
+    return backend
@@ -0,0 +1,151 @@
+"""
+Graph utilities on precedence dictionaries {task: dependencies}.
+Reachability is kept as integer bitsets: bit i is set when the task at
+position i of the topological order belongs to the set.
+"""
+
+
+def successor_map(precedence):
+    """
+    Builds the reverse adjacency of a precedence graph.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+
+    Returns:
+        A dictionary {task: list_of_tasks_that_depend_on_it}.
+    """
+    successors = {task_name: [] for task_name in precedence}
+    for task_name, deps in precedence.items():
+        for dep in deps:
+            successors.setdefault(dep, []).append(task_name)
+    return successors
+
+
+def compute_levels(precedence, successors=None):
+    """
+    Splits the tasks in levels with Kahn's algorithm, in time linear in the size of the graph.
+    Each level contains the tasks whose dependencies all belong to previous levels.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+        successors: The successor map of the graph, computed if not given.
+
+    Returns:
+        A list of lists, where each sublist contains the names of tasks in a level.
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+    remaining_deps = {task_name: len(deps) for task_name, deps in precedence.items()}
+
+    levels = []
+    ready_tasks = [task_name for task_name, count in remaining_deps.items() if count == 0]
+    while ready_tasks:
+        levels.append(ready_tasks)
+        next_ready = []
+        for completed_task in ready_tasks:
+            for successor in successors[completed_task]:
+                remaining_deps[successor] -= 1
+                if remaining_deps[successor] == 0:
+                    next_ready.append(successor)
+        ready_tasks = next_ready
+    return levels
+
+
+def topological_order(precedence):
+    """
+    Computes a topological order of the precedence graph (dependencies first).
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+
+    Returns:
+        A list of task names where every task appears after its dependencies.
+
+    Raises:
+        ValueError: If the precedence graph contains a cycle.
+    """
+    successors = successor_map(precedence)
+    remaining_deps = {task_name: 0 for task_name in successors}
+    for task_name, deps in precedence.items():
+        remaining_deps[task_name] = len(deps)
+
+    order = [task_name for task_name, count in remaining_deps.items() if count == 0]
+    for task_name in order:  # order grows while we iterate over it
+        for successor in successors.get(task_name, ()):
+            remaining_deps[successor] -= 1
+            if remaining_deps[successor] == 0:
+                order.append(successor)
+
+    if len(order) != len(remaining_deps):
+        raise ValueError("The precedence graph contains a cycle")
+    return order
+
+
+def ancestor_bitsets(precedence, order):
+    """
+    Computes the transitive closure of the precedence graph once, in topological order.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+        order: A topological order of the graph, as returned by topological_order.
+
+    Returns:
+        A list where the i-th element is the bitset of all (direct and transitive)
+        dependencies of order[i].
+    """
+    index = {task_name: i for i, task_name in enumerate(order)}
+    ancestors = [0] * len(order)
+    for i, task_name in enumerate(order):
+        mask = 0
+        for dep in precedence.get(task_name, ()):
+            j = index[dep]
+            mask |= ancestors[j] | (1 << j)
+        ancestors[i] = mask
+    return ancestors
+
+
+def iter_bits(mask):
+    """Yields the positions of the bits set in mask, lowest first."""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+def transitive_reduction(precedence):
+    """
+    Removes the redundant edges of a precedence graph.
+    An edge dep -> task is redundant if dep is also reachable through another dependency of task.
+
+    The tasks are processed in topological order while keeping the ancestors of each
+    task as a bitset, so every edge is tested with a single bit lookup.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: dependencies}.
+
+    Returns:
+        A new dictionary {task: list_of_dependencies} without redundant edges.
+    """
+    order = topological_order(precedence)
+    index = {task_name: i for i, task_name in enumerate(order)}
+    ancestors = [0] * len(order)
+    reduced = {}
+
+    for i, task_name in enumerate(order):
+        deps = sorted({index[dep] for dep in precedence.get(task_name, ())}, reverse=True)
+        # a dependency is redundant if it is an ancestor of a dependency closer to the task,
+        # which always comes later in the topological order
+        reachable = 0
+        kept = []
+        for j in deps:
+            if not reachable >> j & 1:
+                kept.append(j)
+                reachable |= ancestors[j]
+        for j in kept:
+            reachable |= 1 << j
+        ancestors[i] = reachable
+        if task_name in precedence:
+            reduced[task_name] = [order[j] for j in sorted(kept)]
+
+    return {task_name: reduced[task_name] for task_name in precedence}
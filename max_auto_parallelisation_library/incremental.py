@@ -0,0 +1,111 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from max_auto_parallelisation_library.resources import expand
+
+_MISSING = object()
+
+
+def fingerprint(value):
+    """
+    Returns a content hash of a value, or None if the value cannot be pickled.
+    Two values with the same fingerprint are considered unchanged.
+    """
+    if value is _MISSING:
+        return "missing"
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class OutputCache:
+    """
+    Size-bounded LRU store of task outputs, keyed by the task name and the content
+    hashes of the values of its reads.
+
+    A task whose reads have the same content as in a previous run is not executed again,
+    its cached outputs are reused. Since the keys only depend on contents, a task whose
+    upstream tasks were re-executed but produced the same values is not executed either.
+    Tasks with an unpicklable read are always executed.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None):
+        """
+        Args:
+            max_entries (int): Maximum number of cached outputs.
+            max_bytes (int): Maximum total pickled size of the cached outputs, unbounded if None.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (outputs, size)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Total pickled size of the cached outputs, in bytes."""
+        return self._size
+
+    def key(self, task, variables):
+        """
+        Returns the cache key of a task for the current values of its reads, the patterns of
+        structured keys standing for the variables they cover, or None if one of them cannot
+        be hashed.
+        """
+        hashes = []
+        # repr orders the names and the tuple keys together
+        for var in sorted(expand(task.reads, variables), key=repr):
+            value_hash = fingerprint(variables.get(var, _MISSING))
+            if value_hash is None:
+                return None
+            hashes.append((var, value_hash))
+        return (task.name, tuple(hashes))
+
+    def get(self, key):
+        """Returns the cached outputs for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, outputs):
+        """Stores the outputs of a task, evicting the least recently used entries if needed."""
+        if key is None:
+            return
+        outputs = dict(outputs or {})
+        try:
+            size = len(pickle.dumps(outputs, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (outputs, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._size > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, task_name=None):
+        """Drops the cached outputs of a task, or of every task if task_name is None."""
+        with self._lock:
+            for key in [key for key in self._entries if task_name is None or key[0] == task_name]:
+                self._size -= self._entries.pop(key)[1]
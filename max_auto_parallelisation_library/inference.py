@@ -0,0 +1,334 @@
+"""
+Inference of the read and write domains of tasks from the bytecode of their run functions.
+
+Detected accesses:
+- module globals loaded and stored (global statements), as in the legacy convention;
+- closure variables loaded and stored (nonlocal statements);
+- with the explicit convention, the constant keys subscripted on the inputs parameter
+  (inputs["X"], inputs.get("X"), view["Z"] = ...) and the constant keys of the dictionary
+  literals returned by the function.
+
+Names bound to modules, functions and classes are not variables and are ignored.
+The analysis is static: accesses made through other functions, dynamic keys or
+in-place mutations of a global (X.append(...)) are not seen.
+"""
+import builtins
+import dis
+import functools
+import inspect
+import types
+import warnings
+from max_auto_parallelisation_library.resources import covered, is_pattern
+
+_MISSING = object()
+_NOT_VARIABLES = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type, functools.partial)
+_PARAM_LOADS = ("LOAD_FAST", "LOAD_FAST_CHECK", "LOAD_FAST_BORROW", "LOAD_DEREF")
+# combined instructions (Python 3.13+) whose argval is a pair of names, the second one being
+# loaded last, on the top of the stack
+_PAIR_LOADS = ("LOAD_FAST_LOAD_FAST", "LOAD_FAST_BORROW_LOAD_FAST_BORROW", "STORE_FAST_LOAD_FAST")
+# the cell of a parameter seen by nested code, which is analysed on its own
+_CELLS = ("LOAD_CLOSURE", "MAKE_CELL")
+_JUMPS = set(dis.hasjrel) | set(dis.hasjabs)
+
+
+class AccessMismatchWarning(UserWarning):
+    """Warns that the declared domains of a task differ from the inferred ones."""
+
+
+class InferredAccesses:
+    """
+    Read and write domains inferred for a run function.
+
+    Attributes:
+        reads (frozenset): The variables read.
+        writes (frozenset): The variables written.
+        complete (bool): False when the function accesses its inputs in a way the analysis
+            does not follow (dynamic keys, inputs passed to another function, outputs not
+            returned as a dictionary literal): it may then access more variables.
+    """
+
+    __slots__ = ("reads", "writes", "complete")
+
+    def __init__(self, reads, writes, complete):
+        self.reads = frozenset(reads)
+        self.writes = frozenset(writes)
+        self.complete = complete
+
+    def __repr__(self):
+        return f"InferredAccesses(reads={sorted(self.reads)}, writes={sorted(self.writes)}, complete={self.complete})"
+
+
+def infer_accesses(function):
+    """
+    Infers the variables read and written by a run function.
+
+    Args:
+        function: A Python function, bound method or functools.partial of one. When the function
+            takes a parameter left unbound, it is the inputs of the explicit convention.
+
+    Returns:
+        An InferredAccesses, or None if the callable cannot be analysed (builtins, callable objects).
+    """
+    function, param = _unwrap(function)
+    if function is None:
+        return None
+    global_reads, global_writes, cell_reads, cell_writes, reads, writes, complete = _analyse_code(
+        function.__code__, param
+    )
+
+    closure = {}
+    for name, cell in zip(function.__code__.co_freevars, function.__closure__ or ()):
+        try:
+            closure[name] = cell.cell_contents
+        except ValueError:
+            closure[name] = _MISSING
+
+    def global_variable(name):
+        value = function.__globals__.get(name, _MISSING)
+        if value is _MISSING:
+            return not hasattr(builtins, name)
+        return not isinstance(value, _NOT_VARIABLES)
+
+    reads = set(reads)
+    writes = set(writes)
+    reads.update(name for name in global_reads if global_variable(name))
+    writes.update(global_writes)
+    reads.update(name for name in cell_reads if not isinstance(closure.get(name), _NOT_VARIABLES))
+    writes.update(cell_writes)
+    return InferredAccesses(reads, writes, complete)
+
+
+def check_accesses(tasks):
+    """
+    Compares the declared domains of tasks with the inferred ones, and emits an
+    AccessMismatchWarning for each task whose domains differ:
+    - undeclared accesses make the parallel execution unsafe;
+    - declared variables that are never accessed serialise tasks for nothing, they are
+      only reported when the analysis of the task is complete.
+
+    Returns:
+        A dictionary {task_name: message} of the mismatches.
+    """
+    mismatches = {}
+    for task in tasks:
+        if task.run is None:
+            continue
+        inferred = infer_accesses(task.run)
+        if inferred is None:
+            continue
+        problems = []
+        for kind, declared, accessed in (("reads", task.reads, inferred.reads),
+                                         ("writes", task.writes, inferred.writes)):
+            undeclared = [var for var in accessed if not covered(var, declared)]
+            if undeclared:
+                problems.append(f"undeclared {kind}: {_format(undeclared)}")
+            # a declared pattern is used when it covers one of the accessed keys
+            unused = [var for var in set(declared) if var not in accessed
+                      and not (is_pattern(var) and any(covered(key, [var]) for key in accessed))]
+            if unused and inferred.complete:
+                problems.append(f"declared {kind} never accessed: {_format(unused)}")
+        if problems:
+            mismatches[task.name] = f"Task {task.name}: {'; '.join(problems)}"
+            warnings.warn(mismatches[task.name], AccessMismatchWarning, stacklevel=2)
+    return mismatches
+
+
+def _format(names):
+    # names and structured keys, sorted together
+    return ", ".join(name if isinstance(name, str) else repr(name) for name in sorted(names, key=repr))
+
+
+def inferred_task(name, run, **kwargs):
+    """
+    Builds a Task whose reads and writes are inferred from its run function.
+
+    Args:
+        name (str): The name of the task.
+        run: The run function.
+        **kwargs: The other arguments of Task (bound, cost).
+
+    Raises:
+        ValueError: If the accesses of run cannot be completely inferred.
+    """
+    # imported here, maxpar imports this module
+    from max_auto_parallelisation_library.maxpar import Task
+
+    inferred = infer_accesses(run)
+    if inferred is None or not inferred.complete:
+        raise ValueError(f"Cannot infer the reads and writes of task {name}, they must be declared")
+    return Task(name=name, reads=sorted(inferred.reads), writes=sorted(inferred.writes), run=run, **kwargs)
+
+
+def _unwrap(function):
+    """Returns the Python function to analyse and the name of its inputs parameter, if any."""
+    bound = 0
+    while isinstance(function, functools.partial):
+        bound += len(function.args)
+        function = function.func
+    if inspect.ismethod(function):
+        bound += 1
+        function = function.__func__
+    if not inspect.isfunction(function):
+        return None, None
+    code = function.__code__
+    positional = code.co_varnames[:code.co_argcount]
+    return function, positional[bound] if len(positional) > bound else None
+
+
+@functools.lru_cache(maxsize=None)
+def _analyse_code(code, param, returns_outputs=True):
+    """
+    Analyses a code object once. Returns the global and closure names accessed, which are
+    filtered later with the values they are bound to, and the keys of param accessed.
+    """
+    global_reads, global_writes = set(), set()
+    cell_reads, cell_writes = set(), set()
+    reads, writes = set(), set()
+    complete = True
+
+    instructions = list(dis.get_instructions(code))
+    for i, instruction in enumerate(instructions):
+        opname, name = instruction.opname, instruction.argval
+        use = _param_use(instruction, param) if param is not None else None
+        if opname == "LOAD_GLOBAL":
+            global_reads.add(name)
+        elif opname in ("STORE_GLOBAL", "DELETE_GLOBAL"):
+            global_writes.add(name)
+        elif use == "load":
+            access = _param_access(instructions, i)
+            if access is None:
+                complete = False
+            elif access[0] == "read":
+                reads.add(access[1])
+            else:
+                writes.add(access[1])
+        elif use == "other":
+            complete = False
+        elif opname == "LOAD_DEREF" and name in code.co_freevars:
+            cell_reads.add(name)
+        elif opname in ("STORE_DEREF", "DELETE_DEREF") and name in code.co_freevars:
+            cell_writes.add(name)
+        elif opname == "RETURN_VALUE" and param is not None and returns_outputs:
+            keys = _returned_keys(instructions, i)
+            if keys is None:
+                complete = False
+            else:
+                writes.update(keys)
+
+    # nested functions and comprehensions, which see param as a closure variable
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            nested_param = param if param in const.co_freevars else None
+            nested = _analyse_code(const, nested_param, False)
+            global_reads |= nested[0]
+            global_writes |= nested[1]
+            # only the closure variables of code, not its own locals seen by the nested code
+            cell_reads |= nested[2] & set(code.co_freevars)
+            cell_writes |= nested[3] & set(code.co_freevars)
+            reads |= nested[4]
+            writes |= nested[5]
+            complete = complete and nested[6]
+    return (frozenset(global_reads), frozenset(global_writes), frozenset(cell_reads - {param}),
+            frozenset(cell_writes), frozenset(reads), frozenset(writes), complete)
+
+
+def _param_use(instruction, param):
+    """
+    Returns how an instruction uses the inputs parameter: "load" when it pushes it on the top
+    of the stack, "cell" for its cell, "other" for any other use, which the analysis does not
+    follow, or None when the instruction does not reference it.
+    """
+    opname, name = instruction.opname, instruction.argval
+    if "FAST" not in opname and "DEREF" not in opname and opname not in _CELLS:
+        return None
+    if name == param:
+        if opname in _PARAM_LOADS:
+            return "load"
+        return "cell" if opname in _CELLS else "other"
+    if isinstance(name, tuple) and param in name:
+        if opname in _PAIR_LOADS and name[1] == param and name[0] != param:
+            return "load"
+        return "other"
+    return None
+
+
+def _constant_key(instruction):
+    # names, and structured keys such as inputs[("table", 3)]
+    if instruction.opname == "LOAD_CONST" and isinstance(instruction.argval, (str, tuple)):
+        return instruction.argval
+    return None
+
+
+def _param_access(instructions, i):
+    """
+    Returns ("read", key) or ("write", key) for an access to a constant key of the inputs
+    parameter loaded at index i, or None if the parameter is used in another way.
+    """
+    following = instructions[i + 1:i + 3]
+    if len(following) == 2:
+        key = _constant_key(following[0])
+        if key is not None and following[1].opname == "BINARY_SUBSCR":
+            return ("read", key)
+        if key is not None and following[1].opname in ("STORE_SUBSCR", "DELETE_SUBSCR"):
+            return ("write", key)
+        if following[0].opname in ("LOAD_METHOD", "LOAD_ATTR") and following[0].argval == "get":
+            key = _constant_key(following[1])
+            if key is not None:
+                return ("read", key)
+    if len(following) >= 1 and following[0].opname == "CONTAINS_OP" and i > 0:
+        key = _constant_key(instructions[i - 1])
+        if key is not None:
+            return ("read", key)
+    return None
+
+
+def _returned_keys(instructions, i):
+    """
+    Returns the keys of the dictionary literal returned at index i, an empty list when None
+    is returned, or None when the returned value is not a dictionary literal with constant keys.
+    """
+    returned = instructions[i - 1]
+    if returned.opname == "LOAD_CONST" and returned.argval is None:
+        return []
+    if returned.opname == "BUILD_CONST_KEY_MAP":
+        keys = instructions[i - 2].argval
+        if instructions[i - 2].opname == "LOAD_CONST" and all(isinstance(key, (str, tuple)) for key in keys):
+            return list(keys)
+        return None
+    if returned.opname == "BUILD_MAP":
+        starts = _operand_starts(instructions, i - 1, 2 * returned.arg)
+        if starts is None:
+            return None
+        keys = []
+        # operands are pushed key, value, key, value...: from the top, the keys are the even ones
+        for m in range(2, 2 * returned.arg + 1, 2):
+            key = _constant_key(instructions[starts[m]])
+            if key is None or starts[m] + 1 != starts[m - 1]:
+                return None
+            keys.append(key)
+        return keys
+    return None
+
+
+def _operand_starts(instructions, end, count):
+    """
+    Returns {m: index} where index is the first instruction computing the m-th operand,
+    counted from the top of the stack, of the instruction at index end. No suffix of the
+    instructions computing an operand pushes more than it pops, so walking backwards the
+    operand m starts where the net stack effect first reaches m.
+    """
+    starts = {0: end}
+    total = 0
+    for j in range(end - 1, -1, -1):
+        instruction = instructions[j]
+        if instruction.opcode in _JUMPS or instruction.is_jump_target:
+            return None
+        arg = instruction.arg if instruction.opcode >= dis.HAVE_ARGUMENT else None
+        total += dis.stack_effect(instruction.opcode, arg, jump=False)
+        if total > len(starts) - 1 and total not in starts:
+            if total != len(starts):
+                return None
+            starts[total] = j
+            if total == count:
+                return starts
+    return None
@@ -0,0 +1,181 @@
+"""
+Data-parallel map tasks: one task of the system applies a function to the chunks of a
+partitioned variable, and the schedulers fan it out over the workers at run time.
+
+    task = map_task("square", "records", "squares", square)
+    task = map_task("total", "values", "total", np.sum, reduce=sum)
+
+The input is split into as many chunks as its executor has workers (or the given number of
+chunks): NumPy arrays along their first axis, as views that vectorised functions process
+at once, sequences in slices and dictionaries in groups of items. The results of the chunks
+are merged by reduce, by default the concatenation of the chunks.
+"""
+import concurrent.futures
+import itertools
+import os
+import threading
+import time
+from max_auto_parallelisation_library.tracing import TaskMeasure, measured_call
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, arrays are then not split
+    np = None
+
+
+def split(value, count):
+    """
+    Splits value in at most count chunks of nearly equal sizes, at least one.
+
+    Raises:
+        TypeError: If value cannot be partitioned.
+    """
+    if np is not None and isinstance(value, np.ndarray):
+        return np.array_split(value, max(1, min(count, len(value))))
+    if isinstance(value, dict):
+        items = list(value.items())
+        return [dict(items[start:stop]) for start, stop in _bounds(len(items), count)]
+    try:
+        return [value[start:stop] for start, stop in _bounds(len(value), count)]
+    except TypeError:
+        raise TypeError(f"Cannot partition a value of type {type(value).__name__}") from None
+
+
+def _bounds(length, count):
+    count = max(1, min(count, length))
+    return [(i * length // count, (i + 1) * length // count) for i in range(count)]
+
+
+def concatenate(results):
+    """Merges the results of the chunks in order: the default reduce of map tasks."""
+    first = results[0]
+    if np is not None and isinstance(first, np.ndarray):
+        return np.concatenate(results)
+    if isinstance(first, dict):
+        merged = {}
+        for result in results:
+            merged.update(result)
+        return merged
+    if isinstance(first, str):
+        return "".join(results)
+    if isinstance(first, (list, tuple)):
+        return type(first)(itertools.chain.from_iterable(results))
+    raise TypeError(f"Cannot concatenate results of type {type(first).__name__}, give a reduce function")
+
+
+class MapRun:
+    """
+    Run function of a map task. Called directly, as by the sequential scheduler, it processes
+    the whole input as a single chunk; the other schedulers call submit to process the chunks
+    in parallel.
+    """
+
+    def __init__(self, function, source, target, reduce=None, chunks=None):
+        """
+        Args:
+            function: Function applied to each chunk. It must be picklable to be executed
+                by a process or a distributed backend.
+            source: The partitioned input variable.
+            target: The output variable.
+            reduce: Function merging the list of the results of the chunks, concatenate by default.
+            chunks (int): Number of chunks, the number of workers of the executor by default.
+        """
+        self.function = function
+        self.source = source
+        self.target = target
+        self.reduce = reduce if reduce is not None else concatenate
+        self.chunks = chunks
+
+    def __call__(self, inputs):
+        return {self.target: self.reduce([self.function(chunk) for chunk in split(inputs[self.source], 1)])}
+
+    def submit(self, executor, inputs, workers, measured=False):
+        """
+        Submits one call per chunk to executor and returns a future of the outputs of the task,
+        set once every chunk is done and their results are reduced. When measured is True, the
+        future returns (outputs, TaskMeasure) like measured_call, the measure spanning from the
+        start of the first chunk to the end of the reduce.
+        """
+        chunks = split(inputs[self.source], self.chunks or workers)
+        future = concurrent.futures.Future()
+        # the task runs until its last chunk is done, it cannot be cancelled as a whole
+        future.set_running_or_notify_cancel()
+        chunk_futures = []
+        results = [None] * len(chunks)
+        measures = []
+        errors = []
+        remaining = [len(chunks)]
+        lock = threading.Lock()
+
+        def fail(error):
+            if measured:
+                start = min((measure.start for measure in measures), default=time.perf_counter())
+                future.set_result((None, TaskMeasure(start, time.perf_counter(), os.getpid(),
+                                                     threading.get_ident(), error)))
+            else:
+                future.set_exception(error)
+
+        def chunk_done(index, chunk_future):
+            with lock:
+                remaining[0] -= 1
+                first_error = False
+                if not (errors or chunk_future.cancelled()):
+                    error = chunk_future.exception()
+                    if error is None and measured:
+                        results[index], measure = chunk_future.result()
+                        measures.append(measure)
+                        error = measure.error
+                    elif error is None:
+                        results[index] = chunk_future.result()
+                    if error is not None:
+                        errors.append(error)
+                        first_error = True
+                last = remaining[0] == 0
+            if first_error:
+                # the chunks not started yet are skipped, the task fails once the others are done
+                for other in chunk_futures:
+                    other.cancel()
+            if not last:
+                return
+            if errors:
+                fail(errors[0])
+                return
+            try:
+                outputs = {self.target: self.reduce(results)}
+            except Exception as reduce_error:
+                fail(reduce_error)
+                return
+            if measured:
+                first = min(measures, key=lambda measure: measure.start)
+                outputs = (outputs, TaskMeasure(first.start, time.perf_counter(), first.pid, first.thread))
+            future.set_result(outputs)
+
+        for index, chunk in enumerate(chunks):
+            if measured:
+                chunk_future = executor.submit(measured_call, self.function, chunk)
+            else:
+                chunk_future = executor.submit(self.function, chunk)
+            chunk_futures.append(chunk_future)
+            chunk_future.add_done_callback(lambda chunk_future, index=index: chunk_done(index, chunk_future))
+        return future
+
+
+def map_task(name, source, target, function, reduce=None, chunks=None, **kwargs):
+    """
+    Builds a Task reading the partitioned variable source and writing target, whose run
+    function applies function to the chunks of source in parallel (see MapRun).
+
+    Args:
+        name (str): The name of the task.
+        source: The partitioned input variable.
+        target: The output variable.
+        function: Function applied to each chunk.
+        reduce: Function merging the list of the results of the chunks, concatenate by default.
+        chunks (int): Number of chunks, the number of workers of the backend by default.
+        **kwargs: The other arguments of Task (bound, cost).
+    """
+    # imported here, the schedulers import this module
+    from max_auto_parallelisation_library.maxpar import Task
+
+    return Task(name=name, reads=[source], writes=[target],
+                run=MapRun(function, source, target, reduce, chunks), **kwargs)
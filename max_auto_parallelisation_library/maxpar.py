@@ -1,15 +1,29 @@
-import concurrent.futures
+import functools
 from max_auto_parallelisation_library.validators import TaskSystemValidationError, TaskSystemValidator
-import timeit
+from max_auto_parallelisation_library.scheduler import run_dataflow, run_levels, run_priority, run_sequential
+from max_auto_parallelisation_library.profiling import measure, summarise
+from max_auto_parallelisation_library.async_scheduler import run_dataflow_async
+from max_auto_parallelisation_library.stealing_scheduler import run_work_stealing
+from max_auto_parallelisation_library.costs import CostModel, predict_makespan, upward_ranks
+from max_auto_parallelisation_library.executors import ThreadBackend, default_backend, make_backend
+from max_auto_parallelisation_library.plan import ExecutionPlan, definition_hash, load_plan, save_plan
+from max_auto_parallelisation_library.planner import IncrementalPlanner
+from max_auto_parallelisation_library.bernstein import max_parallel_precedence
+from max_auto_parallelisation_library.coarsening import coarsen
+from max_auto_parallelisation_library.inference import check_accesses
+from max_auto_parallelisation_library.graph import compute_levels, successor_map, transitive_reduction
 import graphviz
 from pathlib import Path
   
 class Task:
-    def __init__(self, name="", reads=None, writes=None, run=None):
+    def __init__(self, name="", reads=None, writes=None, run=None, bound="io", cost=None, memory=None):
         self.name = name
         self.reads = reads if reads is not None else []
         self.writes = writes if writes is not None else []
         self.run = run
+        self.bound = bound  # "io" or "cpu", used by the hybrid executor backend
+        self.cost = cost  # estimated execution time in seconds, used by the priority scheduler
+        self.memory = memory  # estimated memory in bytes of the task and its outputs, used by a memory budget
 
 X = None
 Y = None
@@ -29,11 +43,159 @@ def runTsomme():
 
 
 class TaskSystem:
-    def __init__(self, tasks, precedence):
-        TaskSystemValidator.validate_system(tasks, precedence) # verification of the system at each creation of a system
+    def __init__(self, tasks, precedence, backend=None, max_workers=None, validate=True, plan_file=None,
+                 check_domains=False):
+        """
+        Args:
+            tasks (list[Task]): The tasks of the system.
+            precedence (dict): Precedence graph where keys are task names and values are lists of dependencies.
+            backend: Executor backend reused by every run of the system. It can be shared between
+                systems and is not closed by close(). A name ("thread", "process", "hybrid")
+                creates a backend owned by the system.
+            max_workers (int): Size of the thread pool owned by the system, instead of a backend.
+                By default, the systems share a single thread pool.
+            validate (bool): False skips the validation, for trusted systems built programmatically.
+            plan_file: Path of a file caching the plan of the system (see plan.save_plan). When it
+                holds the plan of the same tasks and precedence, the plan is loaded and neither the
+                validation nor the planning are done again. Otherwise the plan is computed as usual
+                and saved into the file.
+            check_domains (bool): True to compare the declared reads and writes of the tasks with
+                the ones inferred from their run functions, and warn about the differences
+                (see inference.check_accesses).
+
+        Raises:
+            ValueError: If both backend and max_workers are given.
+        """
+        if backend is not None and max_workers is not None:
+            raise ValueError("Give either a backend or max_workers, the size of a thread pool, not both")
+        plan = None
+        if plan_file is not None:
+            plan = load_plan(plan_file, definition_hash(tasks, precedence))
+        if validate and plan is None:
+            TaskSystemValidator.validate_system(tasks, precedence) # verification of the system at each creation of a system
+        if check_domains:
+            check_accesses(tasks)
+        if max_workers is not None:
+            backend = ThreadBackend(max_workers=max_workers)
+            self._owns_backend = True
+        else:
+            self._owns_backend = isinstance(backend, str)
+            if backend is not None:
+                backend = make_backend(backend)
+        self.backend = backend
+        self.cost_model = CostModel()
+        self._plan = None
+        self._planner = None
+        self.plan_file = plan_file
         self.tasks = tasks
-        self.task_map = {task.name: task for task in tasks}
         self.precedence = precedence.copy()
+        self._plan = plan
+
+    @property
+    def tasks(self):
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, tasks):
+        self._tasks = tasks
+        self.task_map = {task.name: task for task in tasks}
+        self._plan = None
+        self._planner = None
+
+    @property
+    def precedence(self):
+        return self._precedence
+
+    @precedence.setter
+    def precedence(self, precedence):
+        self._precedence = precedence
+        self._plan = None
+        self._planner = None
+
+    def invalidate_plan(self):
+        """
+        Discards the memoized execution plan.
+        Must be called after modifying the tasks' domains or the precedence in place.
+        """
+        self._plan = None
+        self._planner = None
+
+    def add_task(self, task, deps=()):
+        """
+        Adds a task to the system and updates the plan without a full rebuild.
+
+        Args:
+            task (Task): The new task.
+            deps: Names of the tasks it depends on, which must already be in the system.
+        """
+        self._get_planner().add_task(task, deps)
+        self._tasks.append(task)
+        self._plan = None
+
+    def remove_task(self, task_name):
+        """
+        Removes a task from the system and updates the plan without a full rebuild.
+        The tasks that depended on it depend on its dependencies instead, so the ordering
+        it implied between its dependencies and its successors is kept.
+
+        Args:
+            task_name (str): The name of the task to remove.
+        """
+        self._get_planner().remove_task(task_name)
+        self._tasks = [task for task in self._tasks if task.name != task_name]
+        self._plan = None
+
+    def add_dependency(self, task_name, dep):
+        """
+        Makes a task depend on another one and updates the plan of the task and of its
+        descendants only.
+
+        Args:
+            task_name (str): The dependent task.
+            dep (str): The task it must wait for.
+
+        Raises:
+            TaskSystemValidationError: If a task is unknown or the dependency creates a cycle.
+        """
+        self._get_planner().add_dependency(task_name, dep)
+        self._plan = None
+
+    def _get_planner(self):
+        # built on the first edit, the system then shares its graphs with the planner
+        if self._planner is None:
+            self._planner = IncrementalPlanner(self._tasks, self._precedence)
+            self._tasks = list(self._tasks)
+            self.task_map = self._planner.task_map
+            self._precedence = self._planner.precedence
+        return self._planner
+
+    def get_plan(self):
+        """
+        Returns the execution plan of the system, computed once and memoized
+        until the tasks or the precedence change.
+
+        Returns:
+            An ExecutionPlan.
+        """
+        if self._plan is None:
+            if self._planner is not None:
+                self._plan = self._planner.plan()
+            else:
+                self._plan = self._build_plan()
+            if self.plan_file is not None:
+                save_plan(self._plan, self.plan_file, definition_hash(self.tasks, self.precedence))
+        return self._plan
+
+    def _build_plan(self):
+        max_precedence = self.create_max_parallel_system().precedence
+        successors = successor_map(max_precedence)
+        return ExecutionPlan(
+            precedence=self.precedence,
+            max_precedence=max_precedence,
+            successors=successors,
+            levels=compute_levels(max_precedence, successors),
+            seq_levels=self._compute_execution_levels(),
+        )
 
     def getAllDependencies(self, task_name):
         """
@@ -46,15 +208,13 @@ class TaskSystem:
             A set containing the names of all tasks on which the given task depends.
         """
         all_deps = set()
-        
-        def collect_deps(name):
-            direct_deps = self.precedence.get(name, [])
-            for dep in direct_deps:
+        # iterative DFS, long dependency chains would exceed the recursion limit
+        stack = [task_name]
+        while stack:
+            for dep in self.precedence.get(stack.pop(), []):
                 if dep not in all_deps:
                     all_deps.add(dep)
-                    collect_deps(dep)
-        
-        collect_deps(task_name)
+                    stack.append(dep)
         return all_deps
 
     def create_max_parallel_system(self):
@@ -65,32 +225,15 @@ class TaskSystem:
         Returns:
             A new TaskSystem with maximum parallelism.
         """
-        max_precedence = {task.name: set() for task in self.tasks}
-
-        # Apply Bernstein's conditions to each pair of tasks
-        for i, task_i in enumerate(self.tasks):
-            for j, task_j in enumerate(self.tasks):
-                if i != j:
-                    reads_i = set(task_i.reads)
-                    writes_i = set(task_i.writes)
-                    reads_j = set(task_j.reads)
-                    writes_j = set(task_j.writes)
-
-                    condition1 = any(r in writes_j for r in reads_i)
-                    condition2 = any(r in writes_i for r in reads_j)
-                    condition3 = any(w in writes_j for w in writes_i)
-
-                    conflict = condition1 or condition2 or condition3
-                    # if there is a conflict, add the dependency
-                    if conflict:
-                        original_deps = self.getAllDependencies(task_j.name)
-                        if task_i.name in original_deps:
-                            max_precedence[task_j.name].add(task_i.name)
+        # Apply Bernstein's conditions to each pair of tasks sharing a variable
+        max_precedence = max_parallel_precedence(self.tasks, self.precedence)
 
         self._eliminate_redundant_edges(max_precedence)
+        # the new system is derived from a validated one, no need to validate it again
         return TaskSystem(
             tasks=self.tasks.copy(),
             precedence={k: list(v) for k, v in max_precedence.items()},
+            validate=False,
         )
 
     def _eliminate_redundant_edges(self, precedence):
@@ -101,51 +244,9 @@ class TaskSystem:
         Args:
             precedence: The precedence graph as a dictionary {task: set_of_dependencies}.
         """
+        reduced = transitive_reduction(precedence)
         for task_name, deps in precedence.items():
-            redundant = set()
-            for dep in deps:
-                deps_copy = deps.copy()  
-                deps_copy.remove(dep)  
-
-                for other_dep in deps_copy:
-                    if dep in precedence.get(other_dep, set()):
-                        redundant.add(dep)
-                        break
-                    
-                    if self._is_transitively_dependent(other_dep, dep, precedence):
-                        redundant.add(dep)
-                        break
-            
-            deps.difference_update(redundant)
-
-    def _is_transitively_dependent(self, start, target, precedence):
-        """
-        Checks if target is reachable from start via transitive dependencies using BFS.
-        
-        Args:
-            start: The name of the starting task.
-            target: The name of the target task.
-            precedence: The precedence graph as a dictionary.
-            
-        Returns:
-            True if target is reachable from start, False otherwise.
-        """
-        visited = set()
-        queue = [start]
-        # BFS to find if target is reachable from start
-        while queue:
-            current = queue.pop(0)
-            
-            if current == target:
-                return True
-            
-            if current not in visited:
-                visited.add(current)
-                for next_task in precedence.get(current, set()):
-                    if next_task not in visited:
-                        queue.append(next_task)
-        
-        return False
+            deps.intersection_update(reduced[task_name])
 
     def _compute_execution_levels(self):
         """
@@ -155,78 +256,236 @@ class TaskSystem:
         Returns:
             A list of lists, where each sublist contains the names of tasks in a level.
         """
-        # Count the number of dependencies for each task
-        remaining_deps = {}
-        for task_name, deps in self.precedence.items():
-            remaining_deps[task_name] = len(deps)
-        # Find tasks with no dependencies
-        ready_tasks = set()
-        for task_name in self.precedence:
-            if remaining_deps[task_name] == 0:
-                ready_tasks.add(task_name)
-        
-        levels = []
-        while ready_tasks:
-            current_level = list(ready_tasks)
-            levels.append(current_level)
-            ready_tasks.clear()
-            '''for each task, find tasks that depend on it, decrease their dependency count, 
-            if count is 0, add to ready_tasks'''
-            for completed_task in current_level:
-                for task_name, deps in self.precedence.items():
-                    if completed_task in deps and remaining_deps[task_name] > 0:
-                        remaining_deps[task_name] -= 1
-                        if remaining_deps[task_name] == 0:
-                            ready_tasks.add(task_name)
-        
-        return levels
+        return compute_levels(self.precedence)
 
-    def runSeq(self):
+    def runSeq(self, backend=None, variables=None, tracer=None):
         """
         Executes tasks level by level (sequential between levels),
         but parallelizes tasks that are at the same level.
+
+        Args:
+            backend: See run.
+            variables: See run.
+            tracer: See run.
+
+        Returns:
+            The variables dictionary, or None when the tasks communicate through globals.
         """
-        levels = self._compute_execution_levels()
-        
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            for level in levels:
-                futures = []
-                for task_name in level:
-                    task = self.task_map.get(task_name)
-                    if task and task.run:
-                        future = executor.submit(task.run)
-                        futures.append(future)
-                
-                for future in futures:
-                    future.result()
-
-    def run(self):
+        return self._execute(run_levels, self.get_plan().seq_levels, backend, variables, tracer)
+
+    def run_sequential(self, variables=None, tracer=None):
+        """
+        Executes the tasks one by one in the calling thread, in a topological order
+        of the original precedence. Unlike runSeq, nothing runs in parallel.
+
+        Args:
+            variables: See run.
+            tracer: See run.
+
+        Returns:
+            The variables dictionary, or None when the tasks communicate through globals.
+        """
+        order = [task_name for level in self.get_plan().seq_levels for task_name in level]
+        run_sequential(order, self.task_map, variables=variables, tracer=tracer)
+        return variables
+
+    def run(self, mode="dataflow", backend=None, variables=None, tracer=None, cache=None, data_plane=None,
+            grain=None, memory=None):
         """
         First applies the maximum parallelism algorithm, then executes the tasks
         by parallelizing those that can be according to this maximum parallelism system.
+
+        Args:
+            mode (str): "dataflow" starts each task as soon as its own predecessors are done,
+                "levels" executes the tasks level by level (sequential between levels),
+                "priority" starts the ready tasks by decreasing upward rank (longest
+                remaining path, estimated by the cost model of the system), "stealing"
+                executes the tasks on the long-lived worker threads of a StealingBackend, with
+                a deque each, which steal the tasks of the others when idle (the backend given,
+                or a shared one with as many workers as the thread backend).
+            backend: None to use the backend of the system, an executor backend instance
+                (kept open after the run), or "thread", "process", "hybrid" for a backend
+                created for this run only.
+                With "process" and "hybrid", the tasks exchange their variables explicitly.
+            variables (dict): Initial values of the variables. When given, each run function
+                receives a dictionary with the values of its reads and returns a dictionary
+                with the values of its writes, which are stored back into variables.
+                A VariableStore can be given instead: each run function then receives a view
+                restricted to its declared reads and writes, and can assign its writes into it.
+            tracer (Tracer): Records the submit, start and end time and the worker of each task.
+            cache (OutputCache): Incremental execution, only in "dataflow" mode: the tasks whose
+                reads have the same content as in a previous run reuse their cached outputs
+                instead of being executed. Requires the explicit variables convention.
+            data_plane (SharedArrayPlane): Only in "dataflow" mode, exchanges the large NumPy
+                arrays through shared memory instead of pickling them to the process workers.
+                Requires a variables dictionary, not a VariableStore.
+            grain (float): When given, the tasks whose estimated cost (measured or declared) is
+                below grain seconds are fused into work items of at most grain seconds, each
+                submitted as a single unit. An exception raised by a fused task has the name of
+                the task in its task_name attribute. The durations are measured in every mode,
+                so the tasks without a declared cost are fused from the next run on.
+            memory (MemoryManager): Only in "dataflow" mode, removes each intermediate variable
+                from variables as soon as its last reader completes and, with a budget, delays
+                the ready tasks whose declared memory does not fit. Requires a variables
+                dictionary or VariableStore.
+
+        Returns:
+            The variables dictionary, or None when the tasks communicate through globals.
         """
-        max_parallel_system = self.create_max_parallel_system()
-        
-        levels = max_parallel_system._compute_execution_levels()
-        # Execute the tasks level by level (sequential between levels)
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            for level in levels:
-                futures = []
-                for task_name in level:
-                    task = self.task_map.get(task_name)
-                    if task and task.run:
-                        future = executor.submit(task.run)
-                        futures.append(future)
-                
-                for future in futures:
-                    future.result()
-
-    def draw(self, filename="task_system", format="png"):
+        if mode not in ("dataflow", "levels", "priority", "stealing"):
+            raise ValueError(f"Unknown execution mode: {mode}")
+        if cache is not None:
+            if mode != "dataflow":
+                raise ValueError("Incremental execution is only supported in dataflow mode")
+            if variables is None:
+                variables = {}
+        if data_plane is not None:
+            if mode != "dataflow":
+                raise ValueError("Shared memory arrays are only supported in dataflow mode")
+            if cache is not None:
+                raise ValueError("Shared memory arrays cannot be used with an output cache")
+            if variables is None:
+                variables = {}
+        if memory is not None:
+            if mode != "dataflow":
+                raise ValueError("Memory management is only supported in dataflow mode")
+            if data_plane is not None:
+                raise ValueError("Memory management cannot be used with shared memory arrays")
+            if variables is None:
+                variables = {}
+
+        plan = self.get_plan()
+        graph, successors, task_map = plan.max_precedence, plan.successors, self.task_map
+        # the durations are measured when fusing the tasks, whose costs are learned from them
+        cost_model = self.cost_model if grain is not None else None
+        if grain is not None:
+            graph, task_map = coarsen(graph, task_map, self._estimated_costs(), grain, successors)
+            successors = successor_map(graph)
+
+        if mode == "dataflow":
+            scheduler = functools.partial(
+                run_dataflow, successors=successors, cache=cache, data_plane=data_plane, memory=memory,
+                cost_model=cost_model,
+            )
+            if memory is not None:
+                memory.prepare(graph, task_map)
+            if data_plane is None:
+                return self._execute(scheduler, graph, backend, variables, tracer, task_map)
+            data_plane.prepare(graph, task_map, variables)
+            try:
+                return self._execute(scheduler, graph, backend, variables, tracer, task_map)
+            finally:
+                data_plane.finish(variables)
+        if mode == "priority":
+            # the cost of a work item is declared as the sum of the costs of its tasks
+            costs = {task_name: self.cost_model.estimate(task) for task_name, task in task_map.items()}
+            scheduler = functools.partial(
+                run_priority,
+                successors=successors,
+                ranks=upward_ranks(graph, costs, successors),
+                cost_model=self.cost_model,
+            )
+            return self._execute(scheduler, graph, backend, variables, tracer, task_map)
+        if mode == "stealing":
+            scheduler = functools.partial(run_work_stealing, successors=successors, cost_model=cost_model)
+            return self._execute(scheduler, graph, backend, variables, tracer, task_map)
+        levels = plan.levels if grain is None else compute_levels(graph, successors)
+        scheduler = functools.partial(run_levels, cost_model=cost_model)
+        return self._execute(scheduler, levels, backend, variables, tracer, task_map)
+
+    def _estimated_costs(self):
+        return {task.name: self.cost_model.estimate(task) for task in self.tasks}
+
+    def predict_makespan(self, num_workers=None):
+        """
+        Predicts the execution time of run(mode="priority") from the cost model of the system.
+
+        Args:
+            num_workers (int): Number of workers, those of the backend of the system by default.
+
+        Returns:
+            The predicted makespan in seconds.
+        """
+        if num_workers is None:
+            backend = self.backend if self.backend is not None else default_backend()
+            num_workers = backend.worker_count()
+        plan = self.get_plan()
+        return predict_makespan(plan.max_precedence, self._estimated_costs(), num_workers, plan.successors)
+
+    def _execute(self, scheduler, graph, backend, variables, tracer, task_map=None):
+        """
+        Resolves the backend of a run and executes the tasks with
+        scheduler(graph, task_map, backend, variables, tracer=tracer),
+        task_map being the tasks of the system by default.
+        Backends created from a name are closed at the end of the run.
+        """
+        backend, temporary = self._resolve_backend(backend)
+        if variables is None and backend.requires_variables:
+            variables = {}
+
+        try:
+            scheduler(graph, task_map if task_map is not None else self.task_map, backend, variables, tracer=tracer)
+        finally:
+            if temporary:
+                backend.close()
+        return variables
+
+    def _resolve_backend(self, backend):
+        """
+        Returns the backend to use for a run, and whether it was created for this run only.
+        """
+        if backend is None:
+            return (self.backend if self.backend is not None else default_backend()), False
+        return make_backend(backend), isinstance(backend, str)
+
+    async def run_async(self, concurrency=100, backend=None, variables=None):
+        """
+        Executes the tasks of the maximum parallelism system on the running event loop,
+        each task starting as soon as its own predecessors are done.
+        Coroutine run functions are awaited, the other run functions are offloaded
+        to the executor backend.
+
+        Args:
+            concurrency (int): Maximum number of tasks running at the same time.
+            backend: See run.
+            variables: See run.
+
+        Returns:
+            The variables dictionary, or None when the tasks communicate through globals.
+        """
+        plan = self.get_plan()
+        backend, temporary = self._resolve_backend(backend)
+        if variables is None and backend.requires_variables:
+            variables = {}
+
+        try:
+            await run_dataflow_async(
+                plan.max_precedence, self.task_map, backend, variables,
+                successors=plan.successors, concurrency=concurrency,
+            )
+        finally:
+            if temporary:
+                backend.close()
+        return variables
+
+    def close(self):
+        """Shuts down the worker pool owned by the system, if any."""
+        if self._owns_backend:
+            self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def draw(self, filename="task_system", format="png", max_parallel=False):
         """Generates a graphical representation of the task system.
         
         Args:
             filename (str): Path where to save the output file
             format (str): Output format (png, pdf, etc.)
+            max_parallel (bool): Draw the maximum parallelism precedence of the execution plan
             
         Returns:
             str: Path to the generated file or None if graphviz is not installed
@@ -243,7 +502,8 @@ class TaskSystem:
             dot.node(task.name, label)
         
         # Add edges
-        for task, deps in self.precedence.items():
+        precedence = self.get_plan().max_precedence if max_parallel else self.precedence
+        for task, deps in precedence.items():
             for dep in deps:
                 dot.edge(dep, task)
         
@@ -253,32 +513,58 @@ class TaskSystem:
         
         print(f"Graph generated at: {output_path}")
         return output_path
-    def parCost(self, num_runs=5, warmup_runs=2, verbose=True):
+    def parCost(self, num_runs=5, warmup_runs=2, verbose=True, mode="dataflow", baseline="runSeq"):
         '''
         Compares sequential and parallel execution times of the task system.
-        Returns execution times and speedup metrics.
+        Returns execution times and speedup metrics, with the makespan predicted
+        by the cost model (learned from the runs when mode is "priority").
+
+        Each run is measured separately, so that the median, 95th percentile, standard
+        deviation and confidence interval are reported along with the mean. The planning
+        time is measured apart and excluded from the execution times.
+
+        Args:
+            num_runs (int): Number of measured runs of each execution.
+            warmup_runs (int): Runs executed before the measured runs of each execution.
+            verbose (bool): Print the results.
+            mode (str): Execution mode of the parallel runs (see run).
+            baseline (str): "runSeq" (level by level, parallel within a level) or
+                "sequential" (one task at a time in the calling thread, see run_sequential).
         '''
+        if baseline == "runSeq":
+            run_baseline = self.runSeq
+        elif baseline == "sequential":
+            run_baseline = self.run_sequential
+        else:
+            raise ValueError(f"Unknown baseline: {baseline}")
+
+        planning = summarise(measure(self._build_plan, num_runs))
+        # the execution plan is computed once, outside of the measured runs
+        self.get_plan()
+
+        # warmup_runs to prepare the cache (good practice), the two executions are
+        # measured one after the other so that their warmups do not interleave
+        sequential = summarise(measure(run_baseline, num_runs, warmup_runs))
+        parallel = summarise(measure(lambda: self.run(mode=mode), num_runs, warmup_runs))
 
-        # warmup_runs to prepare the cache (good practice)
-        for _ in range(warmup_runs):
-            self.runSeq()
-            self.run()
-        
-        seq_total_time = timeit.timeit(self.runSeq, number=num_runs)
-        par_total_time = timeit.timeit(self.run, number=num_runs)
-        
         # calculation of the average time
-        avg_seq = seq_total_time / num_runs
-        avg_par = par_total_time / num_runs
+        avg_seq = sequential["mean"]
+        avg_par = parallel["mean"]
         
         # calculate speedup
         speedup = avg_seq / avg_par if avg_par > 0 else float('inf')
+        median_speedup = sequential["median"] / parallel["median"] if parallel["median"] > 0 else float('inf')
+        predicted = self.predict_makespan()
         
         if verbose:
             print("\n===== PERFORMANCE ANALYSIS =====")
-            print(f"Mean execution time (SEQ): {avg_seq:.6f} seconds")
-            print(f"Mean execution time (PAR): {avg_par:.6f} seconds")
-            print(f"Speedup: {speedup:.2f}x")
+            print(f"Planning time: {planning['mean']:.6f} seconds (median {planning['median']:.6f})")
+            for label, stats in (("SEQ", sequential), ("PAR", parallel)):
+                print(f"Mean execution time ({label}): {stats['mean']:.6f} seconds "
+                      f"[95% CI {stats['ci95'][0]:.6f} - {stats['ci95'][1]:.6f}], "
+                      f"median {stats['median']:.6f}, p95 {stats['p95']:.6f}, stddev {stats['stddev']:.6f}")
+            print(f"Predicted makespan (PAR): {predicted:.6f} seconds")
+            print(f"Speedup: {speedup:.2f}x (median {median_speedup:.2f}x)")
             if speedup > 1:
                 print(f"Performance improvement: {((speedup - 1) * 100):.1f}%")
         
@@ -286,5 +572,11 @@ class TaskSystem:
             "sequential_mean_time": avg_seq,
             "parallel_mean_time": avg_par,
             "speedup": speedup,
-            "improvement_percentage": ((speedup - 1) * 100) if speedup > 1 else 0
+            "median_speedup": median_speedup,
+            "predicted_makespan": predicted,
+            "improvement_percentage": ((speedup - 1) * 100) if speedup > 1 else 0,
+            "baseline": baseline,
+            "planning": planning,
+            "sequential": sequential,
+            "parallel": parallel,
         }
@@ -0,0 +1,144 @@
+import threading
+from collections import Counter
+from max_auto_parallelisation_library.graph import topological_order
+from max_auto_parallelisation_library.resources import expand, is_pattern
+
+
+def version_readers(precedence, task_map, initial=()):
+    """
+    Computes the readers of each version of each variable, a version being the value written
+    by one task. Writers and readers of a variable conflict, so a topological order of the
+    maximum parallelism graph orders them as they are executed: a task reads the version of
+    the last writer before it. A pattern reads the versions of all the variables it covers.
+
+    Args:
+        precedence: The maximum parallelism graph as a dictionary {task: dependencies}.
+        task_map: A dictionary {task_name: Task}.
+        initial: The variables given before the run, whose versions have no writer.
+
+    Returns:
+        (versions_read, readers, last_writer): the list of the versions (writer, variable) read
+        by each task, writer being None for the initial values, a Counter of the readers of each
+        version and the last writer of each variable.
+    """
+    versions_read = {}
+    readers = Counter()
+    last_writer = {}
+    for task_name in topological_order(precedence):
+        task = task_map.get(task_name)
+        if not (task and task.run):
+            continue
+        # each variable covered by the reads is read once, written so far or given initially
+        known = {**dict.fromkeys(initial), **last_writer} if any(map(is_pattern, task.reads)) else ()
+        versions_read[task_name] = [(last_writer.get(var), var) for var in expand(task.reads, known)]
+        readers.update(versions_read[task_name])
+        for var in task.writes:
+            last_writer[var] = task_name
+    return versions_read, readers, last_writer
+
+
+class MemoryManager:
+    """
+    Frees the intermediate variables as soon as they are dead, and optionally keeps the memory
+    of the running tasks and of their live outputs under a budget.
+
+    Liveness is computed on the maximum parallelism graph: each version of a variable (the value
+    written by one task) is read by the tasks ordered between its writer and the next writer,
+    and is removed from the variables when the last of them completes. The initial values, the
+    variables in keep and the final versions that no task reads (the results) are never freed,
+    nor the variables written through a pattern of structured keys.
+
+    With a budget, each task is accounted for its declared memory (Task.memory, in bytes) from
+    its start until all the versions it wrote are freed or overwritten. A ready task that would
+    exceed the budget is delayed until enough memory is released, unless no task is running.
+    """
+
+    def __init__(self, budget=None, keep=()):
+        """
+        Args:
+            budget (int): Maximum memory, in bytes, of the running tasks and of their live
+                outputs. None to only free the dead variables.
+            keep: Variables whose final value is kept even if some task reads it.
+        """
+        self.budget = budget
+        self.keep = set(keep)
+        self.allocated = 0
+        self.peak = 0
+        self.freed = []
+        self._lock = threading.Lock()
+        self._readers = Counter()
+        self._versions_read = {}
+        self._final = set()
+        self._live = {}
+        self._memory = {}
+        self._current = {}
+
+    def prepare(self, precedence, task_map):
+        """Counts the readers of each version of each variable. Must be called before the run."""
+        self.allocated = self.peak = 0
+        self.freed = []
+        self._live.clear()
+        self._memory.clear()
+        self._current.clear()
+        self._versions_read, self._readers, last_writer = version_readers(precedence, task_map)
+        self._final = {(writer, var) for var, writer in last_writer.items()}
+
+    def can_start(self, task, running):
+        """
+        Returns True if task fits in the budget. A task always starts when no other task
+        is running, so that a task larger than the budget cannot block the run.
+        """
+        if self.budget is None or not running:
+            return True
+        return self.allocated + (task.memory or 0) <= self.budget
+
+    def started(self, task):
+        """Accounts for the memory of a task when it is submitted."""
+        with self._lock:
+            self._memory[task.name] = task.memory or 0
+            self.allocated += self._memory[task.name]
+            self.peak = max(self.peak, self.allocated)
+            self._live[task.name] = set(task.writes)
+
+    def completed(self, task, variables):
+        """
+        Frees the versions read by a task that are now dead, and the versions it wrote that
+        no task reads. The versions of the same variables written before are overwritten.
+        """
+        with self._lock:
+            for var in task.writes:
+                previous = self._current.get(var)
+                if previous is not None:
+                    self._dead(previous, var)
+                self._current[var] = task.name
+            if not self._live.get(task.name):
+                self._dead(task.name, None)
+            for version in self._versions_read.get(task.name, ()):
+                self._readers[version] -= 1
+                if self._readers[version] == 0:
+                    self._free(version, variables)
+            for var in task.writes:
+                if (task.name, var) not in self._readers:
+                    self._free((task.name, var), variables)
+
+    def _free(self, version, variables):
+        writer, var = version
+        if writer is None or self._current.get(var) != writer:
+            return
+        # the results and the kept variables
+        if version in self._final and (var in self.keep or version not in self._readers):
+            return
+        variables.pop(var, None)
+        self.freed.append(var)
+        del self._current[var]
+        self._dead(writer, var)
+
+    def _dead(self, writer, var):
+        """Releases the memory of writer once none of the versions it wrote is alive."""
+        live = self._live.get(writer)
+        if live is None:
+            return
+        live.discard(var)
+        if not live:
+            del self._live[writer]
+            self.allocated -= self._memory.pop(writer)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from types import MappingProxyType
+from max_auto_parallelisation_library.graph import successor_map
+
+
+class ExecutionPlan:
+    """
+    Immutable result of the planning of a task system.
+
+    Only task names are stored, so the same plan stays valid when the run functions
+    of the tasks change, but not when the tasks' domains or the precedence change.
+
+    Attributes:
+        precedence: The original precedence graph {task: tuple_of_dependencies}.
+        max_precedence: The maximum parallelism precedence graph, without redundant edges.
+        successors: Reverse adjacency of max_precedence {task: tuple_of_successors}.
+        levels: Execution levels of the maximum parallelism precedence graph.
+        seq_levels: Execution levels of the original precedence graph.
+    """
+
+    __slots__ = ("precedence", "max_precedence", "successors", "levels", "seq_levels")
+
+    def __init__(self, precedence, max_precedence, successors, levels, seq_levels):
+        object.__setattr__(self, "precedence", _freeze_graph(precedence))
+        object.__setattr__(self, "max_precedence", _freeze_graph(max_precedence))
+        object.__setattr__(self, "successors", _freeze_graph(successors))
+        object.__setattr__(self, "levels", tuple(tuple(level) for level in levels))
+        object.__setattr__(self, "seq_levels", tuple(tuple(level) for level in seq_levels))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ExecutionPlan is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ExecutionPlan is immutable")
+
+
+def _freeze_graph(precedence):
+    return MappingProxyType({task_name: tuple(deps) for task_name, deps in precedence.items()})
+
+
+# On-disk format of a plan: the magic, the hash of the definitions of the system,
+# then sections of little-endian uint32 arrays, each preceded by its length.
+# Task names are stored once, the graphs and levels refer to tasks by their index.
+_MAGIC = b"MAXPLAN1"
+_DIGEST_SIZE = 32
+
+
+def definition_hash(tasks, precedence):
+    """
+    Returns the hash of everything the plan of a system depends on: the names, reads and
+    writes of its tasks, in order, and its precedence. The run functions are not included.
+    """
+    definitions = (
+        [[task.name, list(task.reads), list(task.writes)] for task in tasks],
+        [[task_name, list(deps)] for task_name, deps in precedence.items()],
+    )
+    # repr of the range and wildcard components of structured resource keys
+    data = json.dumps(definitions, separators=(",", ":"), default=repr).encode()
+    return hashlib.blake2b(_MAGIC + data, digest_size=_DIGEST_SIZE).digest()
+
+
+def save_plan(plan, path, digest):
+    """
+    Writes a plan to a file, replaced atomically.
+
+    Args:
+        plan (ExecutionPlan): The plan to save.
+        path: The path of the file.
+        digest (bytes): The definition_hash of the system the plan was computed for.
+    """
+    names = list(plan.precedence)
+    index = {task_name: i for i, task_name in enumerate(names)}
+    encoded = [task_name.encode() for task_name in names]
+    name_offsets = _offsets(encoded)
+    blob = b"".join(encoded)
+    blob += b"\0" * (-len(blob) % 4)
+
+    sections = [name_offsets, None]
+    for graph in (plan.precedence, plan.max_precedence):
+        rows = [[index[dep] for dep in graph[task_name]] for task_name in names]
+        sections += [_offsets(rows), array("I", [i for row in rows for i in row])]
+    for levels in (plan.levels, plan.seq_levels):
+        rows = [[index[task_name] for task_name in level] for level in levels]
+        sections += [_offsets(rows), array("I", [i for row in rows for i in row])]
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(_MAGIC)
+        file.write(digest)
+        for section in sections:
+            data = blob if section is None else _little_endian(section)
+            file.write(struct.pack("<I", len(data)))
+            file.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_plan(path, digest=None):
+    """
+    Loads a plan saved by save_plan through a memory map, without any planning.
+
+    Args:
+        path: The path of the file.
+        digest (bytes): The expected definition_hash, or None to skip the check.
+
+    Returns:
+        The ExecutionPlan, or None if the file does not exist, is not a plan, or was
+        computed for other definitions.
+    """
+    try:
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header = len(_MAGIC) + _DIGEST_SIZE
+            if data[:len(_MAGIC)] != _MAGIC or (digest is not None and data[len(_MAGIC):header] != digest):
+                return None
+            return _read_sections(data, header)
+    except (OSError, ValueError, IndexError, struct.error):
+        # missing, empty or truncated file
+        return None
+
+
+def _read_sections(data, position):
+    view = memoryview(data)
+    sections = []
+    try:
+        while position < len(data):
+            (size,) = struct.unpack_from("<I", data, position)
+            position += 4
+            section = view[position:position + size]
+            sections.append(section if len(sections) == 1 else _uint32(section))
+            position += size
+        return _decode(sections)
+    finally:
+        # the views must be released before the memory map is closed
+        for section in sections:
+            if isinstance(section, memoryview):
+                section.release()
+        view.release()
+
+
+def _decode(sections):
+    name_offsets, blob = sections[0], sections[1]
+    names = [str(blob[name_offsets[i]:name_offsets[i + 1]], "utf-8") for i in range(len(name_offsets) - 1)]
+
+    def rows(offsets, indices):
+        return [[names[j] for j in indices[offsets[i]:offsets[i + 1]]] for i in range(len(offsets) - 1)]
+
+    precedence = dict(zip(names, rows(sections[2], sections[3])))
+    max_precedence = dict(zip(names, rows(sections[4], sections[5])))
+    return ExecutionPlan(
+        precedence=precedence,
+        max_precedence=max_precedence,
+        successors=successor_map(max_precedence),
+        levels=rows(sections[6], sections[7]),
+        seq_levels=rows(sections[8], sections[9]),
+    )
+
+
+def _offsets(rows):
+    offsets = array("I", [0])
+    for row in rows:
+        offsets.append(offsets[-1] + len(row))
+    return offsets
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _uint32(section):
+    if sys.byteorder == "big":
+        values = array("I", section.tobytes())
+        values.byteswap()
+        return values
+    return section.cast("I")
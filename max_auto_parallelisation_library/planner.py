@@ -0,0 +1,181 @@
+from max_auto_parallelisation_library.bernstein import ConflictIndex
+from max_auto_parallelisation_library.graph import iter_bits, topological_order
+from max_auto_parallelisation_library.plan import ExecutionPlan
+from max_auto_parallelisation_library.validators import TaskSystemValidationError, TaskSystemValidator
+
+
+class IncrementalPlanner:
+    """
+    Mutable planning state of a task system, updated in place when tasks or dependencies
+    are added or removed.
+
+    Each task gets a fixed bit position. For each task the planner keeps the bitset of its
+    ancestors in the original precedence, its dependencies in the maximum parallelism
+    precedence (without redundant edges), the bitset of its ancestors in that graph and
+    its levels in both graphs. An edit only recomputes the edited task and its descendants,
+    which are the only tasks whose ancestors can change.
+    """
+
+    def __init__(self, tasks, precedence):
+        self.task_map = {}
+        self.precedence = {}
+        self.successors = {}
+        self.position = {}
+        self.names = []  # names[position] is the task at this bit position, None once removed
+        self.conflicts = ConflictIndex([], {})
+        self.ancestors = {}
+        self.max_precedence = {}
+        self.max_successors = {}
+        self.max_ancestors = {}
+        self.level = {}
+        self.seq_level = {}
+
+        for task in tasks:
+            self._insert(task, precedence[task.name])
+        for task_name in topological_order(precedence):
+            self._recompute(task_name)
+
+    # edits
+
+    def add_task(self, task, deps=()):
+        """Adds a task depending on deps. Only the new task is planned."""
+        if task.name in self.task_map:
+            raise TaskSystemValidationError(f"Duplicated tasks name detected: {task.name}")
+        TaskSystemValidator._validate_tasks([task])
+        self._check_known(task.name, deps)
+        self._insert(task, deps)
+        self._recompute(task.name)
+
+    def add_dependency(self, task_name, dep):
+        """Makes task_name depend on dep, and replans task_name and its descendants."""
+        self._check_known(task_name, [task_name, dep])
+        if dep == task_name or self.ancestors[dep] >> self.position[task_name] & 1:
+            raise TaskSystemValidationError(
+                f"Detected cycle in precedence graph: {task_name} -> {dep} -> {task_name}"
+            )
+        if dep in self.precedence[task_name]:
+            return
+        self.precedence[task_name].append(dep)
+        self.successors[dep].add(task_name)
+        self._replan(self._descendants(task_name) | {task_name})
+
+    def remove_task(self, task_name):
+        """
+        Removes a task and its edges, and replans its descendants.
+        The tasks that depended on it depend on its dependencies instead, so the order it
+        implied between its dependencies and its successors is kept.
+        """
+        self._check_known(task_name, [task_name])
+        region = self._descendants(task_name)
+        task = self.task_map.pop(task_name)
+        position = self.position.pop(task_name)
+        self.names[position] = None
+        self.conflicts.remove(task, position)
+
+        deps = self.precedence.pop(task_name)
+        for dep in deps:
+            self.successors[dep].discard(task_name)
+        for successor in self.successors.pop(task_name):
+            successor_deps = self.precedence[successor]
+            self.precedence[successor] = list(dict.fromkeys(
+                [dep for dep in successor_deps if dep != task_name] + [dep for dep in deps if dep not in successor_deps]
+            ))
+            for dep in deps:
+                self.successors[dep].add(successor)
+        for dep in self.max_precedence.pop(task_name):
+            self.max_successors[dep].discard(task_name)
+        for successor in self.max_successors.pop(task_name):
+            self.max_precedence[successor].discard(task_name)
+        for state in (self.ancestors, self.max_ancestors, self.level, self.seq_level):
+            del state[task_name]
+
+        self._replan(region)
+
+    def plan(self):
+        """Returns the ExecutionPlan of the current state."""
+        return ExecutionPlan(
+            precedence=self.precedence,
+            max_precedence=self.max_precedence,
+            successors=self.max_successors,
+            levels=self._group(self.level),
+            seq_levels=self._group(self.seq_level),
+        )
+
+    # internals
+
+    def _check_known(self, task_name, names):
+        unknown = [name for name in names if name not in self.task_map]
+        if unknown:
+            raise TaskSystemValidationError(
+                f"Invalid dependencies for {task_name}: {', '.join(unknown)}"
+            )
+
+    def _insert(self, task, deps):
+        position = len(self.names)
+        self.names.append(task.name)
+        self.position[task.name] = position
+        self.task_map[task.name] = task
+        self.conflicts.add(task, position)
+        self.precedence[task.name] = list(deps)
+        self.successors.setdefault(task.name, set())
+        self.max_precedence[task.name] = set()
+        self.max_successors[task.name] = set()
+        for dep in deps:
+            self.successors.setdefault(dep, set()).add(task.name)
+
+    def _recompute(self, task_name):
+        """Replans a task whose dependencies are all up to date."""
+        task = self.task_map[task_name]
+        bit = 1 << self.position[task_name]
+
+        ancestors = 0
+        for dep in self.precedence[task_name]:
+            ancestors |= self.ancestors[dep] | (1 << self.position[dep])
+        self.ancestors[task_name] = ancestors
+
+        # Bernstein's conditions, then transitive reduction: a dependency is
+        # redundant when it is an ancestor of another dependency
+        deps_mask = ancestors & self.conflicts.conflicts(task) & ~bit
+        reachable = 0
+        for position in iter_bits(deps_mask):
+            reachable |= self.max_ancestors[self.names[position]]
+        kept = {self.names[position] for position in iter_bits(deps_mask & ~reachable)}
+        self.max_ancestors[task_name] = reachable | deps_mask
+
+        for dep in self.max_precedence[task_name] - kept:
+            self.max_successors[dep].discard(task_name)
+        for dep in kept:
+            self.max_successors[dep].add(task_name)
+        self.max_precedence[task_name] = kept
+
+        self.level[task_name] = 1 + max((self.level[dep] for dep in kept), default=-1)
+        self.seq_level[task_name] = 1 + max(
+            (self.seq_level[dep] for dep in self.precedence[task_name]), default=-1
+        )
+
+    def _descendants(self, task_name):
+        descendants = set()
+        stack = [task_name]
+        while stack:
+            for successor in self.successors[stack.pop()]:
+                if successor not in descendants:
+                    descendants.add(successor)
+                    stack.append(successor)
+        return descendants
+
+    def _replan(self, region):
+        """Recomputes the tasks of region in a topological order of the region."""
+        sub_precedence = {
+            task_name: [dep for dep in self.precedence[task_name] if dep in region]
+            for task_name in region
+        }
+        for task_name in topological_order(sub_precedence):
+            self._recompute(task_name)
+
+    def _group(self, levels):
+        grouped = []
+        for task_name, level in levels.items():
+            while len(grouped) <= level:
+                grouped.append([])
+            grouped[level].append(task_name)
+        return grouped
@@ -0,0 +1,70 @@
+import math
+import statistics
+import time
+
+# two-sided 95% quantiles of Student's t distribution, by degrees of freedom
+_T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074,
+    23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045,
+    30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980,
+}
+
+
+def t_quantile_95(degrees_of_freedom):
+    """Returns the two-sided 95% quantile of Student's t distribution (conservative between table entries)."""
+    for df in sorted(_T_95):
+        if degrees_of_freedom <= df:
+            return _T_95[df]
+    return 1.960
+
+
+def percentile(samples, fraction):
+    """Returns the percentile of samples with linear interpolation between the closest ranks."""
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarise(samples):
+    """
+    Computes the statistics of a list of measured times.
+
+    Returns:
+        A dictionary with the samples, their mean, median, 95th percentile, standard deviation,
+        minimum, maximum and the 95% confidence interval of the mean.
+    """
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    stddev = statistics.stdev(samples) if n > 1 else 0.0
+    margin = t_quantile_95(n - 1) * stddev / math.sqrt(n) if n > 1 else 0.0
+    return {
+        "samples": list(samples),
+        "mean": mean,
+        "median": statistics.median(samples),
+        "p95": percentile(samples, 0.95),
+        "stddev": stddev,
+        "min": min(samples),
+        "max": max(samples),
+        "ci95": (mean - margin, mean + margin),
+    }
+
+
+def measure(function, num_runs, warmup_runs=0):
+    """
+    Calls function warmup_runs times, then measures num_runs calls one by one.
+
+    Returns:
+        The list of the measured times in seconds.
+    """
+    for _ in range(warmup_runs):
+        function()
+    samples = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
@@ -0,0 +1,217 @@
+"""
+Structured resource keys, used in the reads and writes of tasks to declare parts of a dataset.
+
+Besides plain names, a resource key can be a tuple of components:
+- ("table", 3) is partition 3 of table, it does not overlap ("table", 4);
+- ("table", range(0, 8)) covers the integer components 0 to 7, ranges are compared by their
+  bounds only (a range with a step covers the integers between its bounds);
+- ("table", ...) ends with a prefix wildcard, it covers every key starting with ("table",),
+  including the partitions of any depth.
+Two keys conflict when they overlap, a plain name only overlaps itself.
+
+Keys with ranges or a wildcard are patterns: they are not variables, a task reading one
+receives the values of the variables it covers and may write any key it covers.
+"""
+from bisect import bisect_left
+
+
+def is_pattern(key):
+    """Returns True if key is a tuple containing a range or ending with a prefix wildcard."""
+    return isinstance(key, tuple) and any(
+        component is Ellipsis or isinstance(component, range) for component in key
+    )
+
+
+def _split(key):
+    """Returns the components of a tuple key and whether it ends with a prefix wildcard."""
+    if key and key[-1] is Ellipsis:
+        return key[:-1], True
+    return key, False
+
+
+def _bounds(component):
+    if component.step > 0:
+        return component.start, component.stop
+    return component.stop + 1, component.start + 1
+
+
+def _components_overlap(a, b):
+    a_range, b_range = isinstance(a, range), isinstance(b, range)
+    if a_range and b_range:
+        (a_start, a_stop), (b_start, b_stop) = _bounds(a), _bounds(b)
+        return max(a_start, b_start) < min(a_stop, b_stop)
+    if a_range:
+        return _in_range(b, a)
+    if b_range:
+        return _in_range(a, b)
+    return a == b
+
+
+def _in_range(value, component):
+    if not isinstance(value, int):
+        return False
+    start, stop = _bounds(component)
+    return start <= value < stop
+
+
+def keys_overlap(a, b):
+    """Returns True if two resource keys may designate the same data."""
+    if not isinstance(a, tuple) or not isinstance(b, tuple):
+        return a == b
+    (a, a_prefix), (b, b_prefix) = _split(a), _split(b)
+    if len(a) != len(b) and not (a_prefix if len(a) < len(b) else b_prefix):
+        return False
+    return all(_components_overlap(x, y) for x, y in zip(a, b))
+
+
+def covered(key, keys):
+    """Returns True if key is one of keys or is covered by one of their patterns."""
+    return key in keys or any(is_pattern(other) and keys_overlap(key, other) for other in keys)
+
+
+def expand(keys, variables):
+    """
+    Returns the variables designated by keys: the keys themselves, and for each pattern the
+    variables it covers.
+    """
+    names = {}
+    for key in keys:
+        if is_pattern(key):
+            # a copy of the names, other workers may store their outputs meanwhile
+            names.update((var, None) for var in list(variables) if keys_overlap(var, key))
+        else:
+            names[key] = None
+    return list(names)
+
+
+class _Intervals:
+    """
+    The range components of the children of a trie node, sorted by start. A stabbing query
+    scans backwards from the last interval starting before the end of the query, and stops as
+    soon as no earlier interval can reach its start (the prefix maximum of the stops).
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self._sorted = None
+
+    def add(self, component):
+        node = self.nodes.get(component)
+        if node is None:
+            node = self.nodes[component] = _Node()
+            self._sorted = None
+        return node
+
+    def _index(self):
+        if self._sorted is None:
+            entries = sorted(((_bounds(component), node) for component, node in self.nodes.items()
+                              if len(component)), key=lambda entry: entry[0])
+            self._sorted = ([start for (start, _), _ in entries], entries, [])
+            reach = float("-inf")
+            for (_, stop), _ in entries:
+                reach = max(reach, stop)
+                self._sorted[2].append(reach)
+        return self._sorted
+
+    def overlapping(self, start, stop):
+        """Yields the nodes of the intervals intersecting [start, stop)."""
+        if start >= stop:
+            return
+        starts, entries, reach = self._index()
+        for j in range(bisect_left(starts, stop) - 1, -1, -1):
+            if reach[j] <= start:
+                break
+            (_, interval_stop), node = entries[j]
+            if interval_stop > start:
+                yield node
+
+
+class _Node:
+    """A trie node: the keys ending here, the wildcards ending here and the children."""
+
+    __slots__ = ("exact", "prefix", "children", "intervals", "_subtree")
+
+    def __init__(self):
+        self.exact = [0, 0]  # [readers, writers] bitsets
+        self.prefix = [0, 0]
+        self.children = {}
+        self.intervals = _Intervals()
+        self._subtree = None
+
+    def subtree(self, kind):
+        """Returns the bitset of the tasks with a key of the given kind below this node."""
+        if self._subtree is None:
+            subtree = [self.exact[0] | self.prefix[0], self.exact[1] | self.prefix[1]]
+            for child in list(self.children.values()) + list(self.intervals.nodes.values()):
+                subtree[0] |= child.subtree(0)
+                subtree[1] |= child.subtree(1)
+            self._subtree = subtree
+        return self._subtree[kind]
+
+
+class ResourceIndex:
+    """
+    Trie of the tuple resource keys of a set of tasks, storing at each node the bitsets of
+    the tasks reading and writing the key ending there. The tasks whose keys overlap a given
+    key are found by walking only the branches compatible with it: exact components are
+    looked up in a dictionary, and ranges in an interval list.
+    """
+
+    READ, WRITE = 0, 1
+
+    def __init__(self):
+        self.root = _Node()
+
+    def _path(self, key):
+        components, prefix = _split(key)
+        node = self.root
+        path = [node]
+        for component in components:
+            if isinstance(component, range):
+                node = node.intervals.add(component)
+            else:
+                node = node.children.setdefault(component, _Node())
+            path.append(node)
+        return path, prefix
+
+    def add(self, key, kind, bit):
+        """Records that the task at bit reads (kind=READ) or writes (kind=WRITE) key."""
+        path, prefix = self._path(key)
+        (path[-1].prefix if prefix else path[-1].exact)[kind] |= bit
+        for node in path:
+            node._subtree = None
+
+    def remove(self, key, kind, bit):
+        """Removes a key previously added for the task at bit."""
+        path, prefix = self._path(key)
+        (path[-1].prefix if prefix else path[-1].exact)[kind] &= ~bit
+        for node in path:
+            node._subtree = None
+
+    def overlapping(self, key, kind):
+        """Returns the bitset of the tasks with a key of the given kind overlapping key."""
+        components, prefix = _split(key)
+        return self._match(self.root, components, 0, prefix, kind)
+
+    def _match(self, node, components, i, prefix, kind):
+        mask = node.prefix[kind]
+        if i == len(components):
+            return mask | (node.subtree(kind) if prefix else node.exact[kind])
+        component = components[i]
+        if isinstance(component, range):
+            start, stop = _bounds(component)
+            if stop - start <= len(node.children):
+                children = (node.children.get(value) for value in range(start, stop))
+            else:
+                children = (child for value, child in node.children.items() if _in_range(value, component))
+            intervals = node.intervals.overlapping(start, stop)
+        else:
+            children = (node.children.get(component),)
+            intervals = node.intervals.overlapping(component, component + 1) \
+                if isinstance(component, int) else ()
+        for child in children:
+            if child is not None:
+                mask |= self._match(child, components, i + 1, prefix, kind)
+        for child in intervals:
+            mask |= self._match(child, components, i + 1, prefix, kind)
+        return mask
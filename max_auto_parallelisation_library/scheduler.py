@@ -0,0 +1,318 @@
+import concurrent.futures
+import functools
+import heapq
+from max_auto_parallelisation_library.executors import task_worker_count
+from max_auto_parallelisation_library.graph import successor_map
+from max_auto_parallelisation_library.mapping import MapRun
+from max_auto_parallelisation_library.resources import covered, expand
+from max_auto_parallelisation_library.store import VariableStore, run_with_view
+from max_auto_parallelisation_library.tracing import measured_call
+
+
+def run_dataflow(precedence, task_map, backend, variables=None, successors=None, tracer=None, cache=None,
+                 data_plane=None, memory=None, cost_model=None):
+    """
+    Executes tasks as soon as all of their own predecessors have finished.
+    Unlike the level-by-level execution, there is no barrier between levels:
+    a slow task only delays the tasks that actually depend on it.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: list_of_dependencies}.
+        task_map: A dictionary {task_name: Task}.
+        backend: An executor backend (see executors.py).
+        variables: None to call the run functions without arguments, or a dictionary
+            {variable: value} from which the reads are passed and into which the writes are stored.
+        successors: The successor map of the graph, computed if not given.
+        tracer: A Tracer recording the execution of each task, or None.
+        cache: An OutputCache (requires variables). Tasks whose reads did not change since
+            a previous run are not executed, their cached outputs are reused.
+        data_plane: A SharedArrayPlane prepared for this run (requires variables), through
+            which the large arrays are exchanged.
+        memory: A MemoryManager prepared for this run (requires variables), which frees the
+            dead variables and delays the ready tasks that do not fit in its budget.
+        cost_model: A CostModel in which the measured execution times are recorded.
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+    remaining_deps = {task_name: len(deps) for task_name, deps in precedence.items()}
+
+    running = {}
+    cache_keys = {}
+    delayed = []
+    ready_tasks = [task_name for task_name, count in remaining_deps.items() if count == 0]
+
+    try:
+        while ready_tasks or running or delayed:
+            # the tasks delayed by the memory budget are tried again after each completion,
+            # after the tasks just released, which may read and free the live variables
+            ready_tasks[:0] = reversed(delayed)
+            delayed.clear()
+            # submit every ready task, tasks without a run function or with
+            # cached outputs complete immediately
+            while ready_tasks:
+                task_name = ready_tasks.pop()
+                task = task_map.get(task_name)
+                if task and task.run:
+                    if memory is not None:
+                        if not memory.can_start(task, running):
+                            delayed.append(task_name)
+                            continue
+                        memory.started(task)
+                    if cache is not None:
+                        cache_keys[task_name] = cache.key(task, variables)
+                        outputs = cache.get(cache_keys[task_name])
+                        if outputs is not None:
+                            store_outputs(task, outputs, variables)
+                            if memory is not None:
+                                memory.completed(task, variables)
+                            ready_tasks.extend(release_successors(task_name, successors, remaining_deps))
+                            continue
+                    running[submit_task(backend, task, variables, measured=cost_model is not None, tracer=tracer,
+                                        data_plane=data_plane)] = task_name
+                else:
+                    ready_tasks.extend(release_successors(task_name, successors, remaining_deps))
+
+            if not running:
+                break
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                task_name = running.pop(future)
+                outputs = collect_task(task_map[task_name], future, variables, tracer=tracer, cost_model=cost_model)
+                if cache is not None:
+                    cache.put(cache_keys.pop(task_name), outputs)
+                if data_plane is not None:
+                    data_plane.completed(task_map[task_name], outputs)
+                if memory is not None:
+                    memory.completed(task_map[task_name], variables)
+                ready_tasks.extend(release_successors(task_name, successors, remaining_deps))
+    except BaseException:
+        cancel_running(running)
+        raise
+
+
+def run_priority(precedence, task_map, backend, variables=None, successors=None,
+                 ranks=None, max_in_flight=None, cost_model=None, tracer=None):
+    """
+    List scheduling: among the ready tasks, the ones with the highest rank (typically the
+    upward rank, i.e. the longest remaining path) are started first. At most max_in_flight
+    tasks are submitted at the same time, so that the priorities are not lost in the
+    queue of the executor.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: list_of_dependencies}.
+        task_map: A dictionary {task_name: Task}.
+        backend: An executor backend (see executors.py).
+        variables: See run_dataflow.
+        successors: The successor map of the graph, computed if not given.
+        ranks: A dictionary {task_name: priority}, all tasks have the same priority if not given.
+        max_in_flight (int): Maximum number of tasks submitted at the same time,
+            the number of workers of the backend by default.
+        cost_model: A CostModel in which the measured execution times are recorded.
+        tracer: A Tracer recording the execution of each task, or None.
+    """
+    if successors is None:
+        successors = successor_map(precedence)
+    if ranks is None:
+        ranks = {}
+    if max_in_flight is None:
+        max_in_flight = backend.worker_count()
+    remaining_deps = {task_name: len(deps) for task_name, deps in precedence.items()}
+
+    running = {}
+    ready_tasks = [(-ranks.get(task_name, 0), task_name)
+                   for task_name, count in remaining_deps.items() if count == 0]
+    heapq.heapify(ready_tasks)
+
+    def release(task_name):
+        for successor in release_successors(task_name, successors, remaining_deps):
+            heapq.heappush(ready_tasks, (-ranks.get(successor, 0), successor))
+
+    try:
+        while ready_tasks or running:
+            while ready_tasks and len(running) < max_in_flight:
+                _, task_name = heapq.heappop(ready_tasks)
+                task = task_map.get(task_name)
+                if task and task.run:
+                    running[submit_task(backend, task, variables, measured=cost_model is not None, tracer=tracer)] = task_name
+                else:
+                    release(task_name)
+
+            if not running:
+                continue
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                task_name = running.pop(future)
+                collect_task(task_map[task_name], future, variables, tracer=tracer, cost_model=cost_model)
+                release(task_name)
+    except BaseException:
+        cancel_running(running)
+        raise
+
+
+def run_levels(levels, task_map, backend, variables=None, tracer=None, cost_model=None):
+    """
+    Executes tasks level by level (sequential between levels),
+    but parallelizes tasks that are at the same level.
+
+    Args:
+        levels: A list of lists of task names, as returned by _compute_execution_levels.
+        task_map: A dictionary {task_name: Task}.
+        backend: An executor backend (see executors.py).
+        variables: See run_dataflow.
+        tracer: See run_dataflow.
+        cost_model: See run_dataflow.
+    """
+    for level in levels:
+        futures = []
+        for task_name in level:
+            task = task_map.get(task_name)
+            if task and task.run:
+                futures.append((task, submit_task(backend, task, variables, measured=cost_model is not None,
+                                                  tracer=tracer)))
+
+        try:
+            for task, future in futures:
+                collect_task(task, future, variables, tracer=tracer, cost_model=cost_model)
+        except BaseException:
+            cancel_running([future for _, future in futures])
+            raise
+
+
+def run_sequential(order, task_map, backend=None, variables=None, tracer=None):
+    """
+    Executes the tasks one after the other in the calling thread, without any executor.
+    This is the true sequential baseline of a task system.
+
+    Args:
+        order: The task names in a topological order.
+        task_map: A dictionary {task_name: Task}.
+        backend: Ignored, the tasks are executed in the calling thread.
+        variables: See run_dataflow.
+        tracer: See run_dataflow.
+    """
+    for task_name in order:
+        task = task_map.get(task_name)
+        if not (task and task.run):
+            continue
+        function, args = task_function(task, variables), task_args(task, variables)
+        if tracer is None:
+            outputs = function(*args)
+        else:
+            tracer.submitted(task.name)
+            outputs, measure = measured_call(function, *args)
+            tracer.record(task.name, measure)
+            if measure.error is not None:
+                raise measure.error
+        store_outputs(task, outputs, variables)
+
+
+def submit_task(backend, task, variables, measured=False, tracer=None, data_plane=None):
+    """
+    Submits the run function of a task to the executor chosen by the backend.
+    When variables is given, the run function receives a dictionary with the values of its reads.
+    When measured is True or a tracer is given, the run function is wrapped by measured_call,
+    otherwise it is submitted as is and the instrumentation costs nothing.
+    A map task (see mapping.py) is submitted as one call per chunk of its input.
+    """
+    executor = backend.executor_for(task)
+    function, args = task_function(task, variables), task_args(task, variables)
+    if isinstance(task.run, MapRun) and variables is not None and data_plane is None:
+        if tracer is not None:
+            tracer.submitted(task.name)
+        workers = task_worker_count(backend, task)
+        return task.run.submit(executor, args[0], workers, measured=measured or tracer is not None)
+    if data_plane is not None:
+        data_plane.submitted(task, variables)
+        function = data_plane.wrap(function)
+    if tracer is None and not measured:
+        return executor.submit(function, *args)
+    if tracer is not None:
+        tracer.submitted(task.name)
+    return executor.submit(measured_call, function, *args)
+
+
+def collect_task(task, future, variables, tracer=None, cost_model=None):
+    """
+    Waits for a task submitted by submit_task, records its measure and stores its outputs.
+    The exception raised by the task, if any, is propagated.
+
+    Returns:
+        The outputs of the task.
+    """
+    result = future.result()
+    if tracer is None and cost_model is None:
+        store_outputs(task, result, variables)
+        return result
+    outputs, measure = result
+    if tracer is not None:
+        tracer.record(task.name, measure)
+    if measure.error is not None:
+        raise measure.error
+    if cost_model is not None:
+        cost_model.record(task.name, measure.duration)
+    store_outputs(task, outputs, variables)
+    return outputs
+
+
+def cancel_running(futures):
+    """
+    Cancels the submitted tasks that have not started yet and waits for the running ones,
+    so that no task of a failed run is still executing when its exception is raised.
+    """
+    for future in futures:
+        future.cancel()
+    concurrent.futures.wait(futures)
+
+
+def store_outputs(task, outputs, variables):
+    """
+    Stores the dictionary returned by a run function into variables.
+    Only the variables declared in the write domain of the task, or covered by one of its
+    patterns, can be written.
+    """
+    if variables is None or outputs is None:
+        return
+    undeclared = [var for var in outputs if not covered(var, task.writes)]
+    if undeclared:
+        raise ValueError(
+            f"Task {task.name} wrote undeclared variables: {', '.join(sorted(map(str, undeclared)))}"
+        )
+    variables.update(outputs)
+
+
+def task_args(task, variables):
+    """
+    Returns the arguments of the run function: none, the dictionary of the values of its reads,
+    or its TaskView when variables is a VariableStore. A pattern in the reads passes the values
+    of all the variables it covers.
+    """
+    if variables is None:
+        return ()
+    if isinstance(variables, VariableStore):
+        return (variables.view(task),)
+    return ({var: variables[var] for var in expand(task.reads, variables) if var in variables},)
+
+
+def task_function(task, variables):
+    """
+    Returns the function to call with task_args: the run function of the task, wrapped so that
+    the values assigned into its view are returned when variables is a VariableStore.
+    """
+    if isinstance(variables, VariableStore):
+        return functools.partial(run_with_view, task.run)
+    return task.run
+
+
+def release_successors(task_name, successors, remaining_deps):
+    """
+    Decreases the dependency count of each successor of a completed task,
+    and returns the successors with no remaining dependency.
+    """
+    ready = []
+    for successor in successors[task_name]:
+        remaining_deps[successor] -= 1
+        if remaining_deps[successor] == 0:
+            ready.append(successor)
+    return ready
@@ -0,0 +1,321 @@
+import collections
+import concurrent.futures
+import functools
+import itertools
+import random
+import threading
+from max_auto_parallelisation_library.executors import ThreadBackend
+from max_auto_parallelisation_library.graph import successor_map
+from max_auto_parallelisation_library.mapping import MapRun
+from max_auto_parallelisation_library.scheduler import store_outputs, task_args, task_function
+from max_auto_parallelisation_library.tracing import measured_call
+
+
+class StealingBackend:
+    """
+    Backend owning long-lived worker threads with a deque each, without a shared queue.
+
+    A worker pops its own deque from the end (the work pushed last) and, when it is empty,
+    steals from the front of the deque of another worker (the work pushed first). The work
+    submitted from a worker is pushed onto its own deque, so the successors released by a task
+    stay on the worker that produced their inputs. The threads are started on first use,
+    reused across runs and task systems, and stopped by close() or at the end of a with block.
+
+    run(mode="stealing") executes the graph on the workers directly (see run_work_stealing),
+    the other schedulers submit their tasks through executor_for like to a thread pool.
+    """
+
+    requires_variables = False
+
+    def __init__(self, max_workers=None, seed=None):
+        """
+        Args:
+            max_workers (int): Number of worker threads, as for a ThreadBackend by default.
+            seed: Seed of the choice of the stolen workers.
+        """
+        self.max_workers = max_workers
+        self.seed = seed
+        self._deques = []
+        self._threads = []
+        self._local = threading.local()
+        self._next_worker = itertools.count()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._sleeping = 0
+        self._closing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stops the workers once the work already pushed is done. They are started again
+        if the backend is used again.
+        """
+        with self._lock:
+            if not self._threads:
+                return
+            with self._idle:
+                self._closing = True
+                self._idle.notify_all()
+            # the work pushed meanwhile by the workers still goes to their deques
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            self._deques = []
+            self._closing = False
+
+    def executor_for(self, task):
+        return self
+
+    def worker_count(self):
+        """Returns the number of worker threads."""
+        if self.max_workers is not None:
+            return self.max_workers
+        # same default as concurrent.futures.ThreadPoolExecutor
+        return ThreadBackend.default_workers()
+
+    def submit(self, function, *args):
+        """Pushes a call onto the deque of a worker and returns its future."""
+        future = concurrent.futures.Future()
+        self._push([functools.partial(_run_future, future, function, args)])
+        return future
+
+    def run_graph(self, precedence, task_map, variables=None, successors=None, tracer=None, cost_model=None):
+        """
+        Executes the tasks of a precedence graph on the workers. See run_work_stealing.
+        """
+        if successors is None:
+            successors = successor_map(precedence)
+        graph_run = _GraphRun(self, precedence, task_map, variables, successors, tracer, cost_model)
+        ready_tasks = [task_name for task_name, count in graph_run.remaining_deps.items() if count == 0]
+        if not ready_tasks:
+            return
+        if tracer is not None:
+            for task_name in ready_tasks:
+                tracer.submitted(task_name)
+        self._push([functools.partial(graph_run.execute, task_name) for task_name in ready_tasks])
+        graph_run.done.wait()
+        if graph_run.error is not None:
+            raise graph_run.error
+
+    # worker internals
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            num_workers = max(1, self.worker_count())
+            self._deques = [collections.deque() for _ in range(num_workers)]
+            self._threads = [
+                threading.Thread(target=self._worker_loop, args=(index,), name=f"stealing-worker-{index}", daemon=True)
+                for index in range(num_workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _push(self, items):
+        """
+        Pushes work onto the deque of the current worker, or spreads it over the workers
+        when called from another thread.
+        """
+        if not self._threads:
+            self._start()
+        deques = self._deques
+        index = getattr(self._local, "index", None)
+        if index is not None:
+            deques[index].extend(items)
+            # the item executed next by the current worker does not need another one to wake up
+            wake = min(len(items), len(deques[index]) - 1)
+        else:
+            for item in items:
+                deques[next(self._next_worker) % len(deques)].append(item)
+            wake = len(items)
+        # a worker going to sleep checks the deques after counting itself as sleeping
+        if wake > 0 and self._sleeping:
+            with self._idle:
+                self._idle.notify(wake)
+
+    def _next_item(self, own, rng):
+        try:
+            return own.pop()
+        except IndexError:
+            pass
+        deques = self._deques
+        start = rng.randrange(len(deques))
+        for i in range(len(deques)):
+            try:
+                return deques[(start + i) % len(deques)].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def _wait_for_work(self):
+        """Sleeps until work is pushed or the backend is closed, returns False when it is closed."""
+        with self._idle:
+            self._sleeping += 1
+            while not self._closing and not any(self._deques):
+                self._idle.wait()
+            self._sleeping -= 1
+            return any(self._deques) or not self._closing
+
+    def _worker_loop(self, index):
+        self._local.index = index
+        own = self._deques[index]
+        rng = random.Random(None if self.seed is None else self.seed * len(self._deques) + index)
+        while True:
+            item = self._next_item(own, rng)
+            if item is None:
+                if not self._wait_for_work():
+                    return
+                continue
+            item()
+
+
+def _run_future(future, function, args):
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = function(*args)
+    except BaseException as error:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class _GraphRun:
+    """
+    State of a graph executed by run_graph. Only the counters of the remaining dependencies
+    are updated under a lock, held for a few instructions per task.
+    """
+
+    def __init__(self, backend, precedence, task_map, variables, successors, tracer, cost_model):
+        self.backend = backend
+        self.task_map = task_map
+        self.variables = variables
+        self.successors = successors
+        self.tracer = tracer
+        self.cost_model = cost_model
+        self.measured = tracer is not None or cost_model is not None
+        self.remaining_deps = {task_name: len(deps) for task_name, deps in precedence.items()}
+        self.remaining = len(self.remaining_deps)
+        self.active = 0
+        self.error = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def execute(self, task_name):
+        with self._lock:
+            # the tasks of a failed run still in the deques are skipped
+            if self.error is not None:
+                return
+            self.active += 1
+        task = self.task_map.get(task_name)
+        try:
+            if task and isinstance(task.run, MapRun) and self.variables is not None:
+                # the chunks are pushed onto the deques, the task completes with the last one
+                inputs = task_args(task, self.variables)[0]
+                future = task.run.submit(self.backend, inputs, self.backend.worker_count(), measured=self.measured)
+                future.add_done_callback(functools.partial(self._map_done, task))
+                return
+            if task and task.run:
+                function, args = task_function(task, self.variables), task_args(task, self.variables)
+                self._store(task, measured_call(function, *args) if self.measured else function(*args))
+        except Exception as error:
+            self._completed(task_name, error)
+            return
+        self._completed(task_name)
+
+    def _map_done(self, task, future):
+        try:
+            self._store(task, future.result())
+        except Exception as error:
+            self._completed(task.name, error)
+            return
+        self._completed(task.name)
+
+    def _store(self, task, result):
+        outputs = result
+        if self.measured:
+            outputs, measure = result
+            if self.tracer is not None:
+                self.tracer.record(task.name, measure)
+            if measure.error is not None:
+                raise measure.error
+            if self.cost_model is not None:
+                self.cost_model.record(task.name, measure.duration)
+        store_outputs(task, outputs, self.variables)
+
+    def _completed(self, task_name, error=None):
+        released = []
+        with self._lock:
+            self.active -= 1
+            if error is not None and self.error is None:
+                self.error = error
+            if self.error is not None:
+                # the run fails once the tasks running on the other workers are done
+                if self.active == 0:
+                    self.done.set()
+                return
+            for successor in self.successors.get(task_name, ()):
+                self.remaining_deps[successor] -= 1
+                if self.remaining_deps[successor] == 0:
+                    released.append(successor)
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+                return
+        if released:
+            if self.tracer is not None:
+                for successor in released:
+                    self.tracer.submitted(successor)
+            self.backend._push([functools.partial(self.execute, successor) for successor in released])
+
+
+_shared_backends = {}
+_shared_backends_lock = threading.Lock()
+
+
+def shared_stealing_backend(num_workers):
+    """
+    Returns the StealingBackend with num_workers workers shared by the runs in "stealing" mode
+    on the other thread backends.
+    """
+    with _shared_backends_lock:
+        if num_workers not in _shared_backends:
+            _shared_backends[num_workers] = StealingBackend(max_workers=num_workers)
+        return _shared_backends[num_workers]
+
+
+def run_work_stealing(precedence, task_map, backend, variables=None, successors=None, tracer=None, cost_model=None):
+    """
+    Executes tasks on the long-lived workers of a StealingBackend, each owning a deque.
+
+    The successors released by a task are pushed onto the deque of the worker that executed it,
+    so a chain of tasks stays on the worker that produced its inputs, and idle workers steal
+    the ready tasks of the others instead of sharing one queue.
+
+    Args:
+        precedence: The precedence graph as a dictionary {task: list_of_dependencies}.
+        task_map: A dictionary {task_name: Task}.
+        backend: A StealingBackend, or another thread backend giving the number of workers of
+            the shared StealingBackend on which the tasks are executed. The tasks are executed
+            in the threads of the StealingBackend, so the backend must not require the explicit
+            variables convention (process or distributed workers).
+        variables: See scheduler.run_dataflow.
+        successors: The successor map of the graph, computed if not given.
+        tracer: A Tracer recording the execution of each task, or None.
+        cost_model: A CostModel in which the measured execution times are recorded.
+
+    Raises:
+        ValueError: If the backend executes the tasks outside of this process.
+    """
+    if not isinstance(backend, StealingBackend):
+        if backend.requires_variables:
+            raise ValueError("Work stealing executes the tasks in its own threads, it requires a thread backend")
+        backend = shared_stealing_backend(max(1, backend.worker_count()))
+    backend.run_graph(precedence, task_map, variables, successors=successors, tracer=tracer, cost_model=cost_model)
+
@@ -0,0 +1,222 @@
+import threading
+from collections.abc import Mapping, MutableMapping
+from max_auto_parallelisation_library.resources import covered, expand
+
+
+class UndeclaredAccessError(KeyError):
+    """Raised when a task accesses a variable outside of its read or write domain."""
+
+    def __str__(self):
+        return self.args[0]
+
+
+class ReadWriteLock:
+    """
+    Lock shared by any number of readers or held by a single writer.
+    Waiting writers have priority over new readers, so writers are not starved.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+def _lock_order(var):
+    # a total order of the names and the structured (tuple) keys of variables
+    return (type(var).__name__, repr(var))
+
+
+class VariableStore(MutableMapping):
+    """
+    Variables shared by the tasks of a system, protected by one read/write lock per variable.
+
+    A store can be passed as the variables of a run instead of a dictionary. Each run function
+    then receives a TaskView restricted to its declared reads and writes rather than a copy of
+    its inputs. The values a task writes into its view, or returns, are stored back atomically.
+
+    With debug=True, every access to an undeclared variable raises an UndeclaredAccessError
+    naming the task and the variable, and is recorded in the violations attribute.
+    """
+
+    def __init__(self, initial=None, debug=False):
+        """
+        Args:
+            initial (dict): Initial values of the variables.
+            debug (bool): True to detect and record the accesses to undeclared variables.
+        """
+        self.debug = debug
+        self.violations = []  # (task_name, "read" or "write", variable)
+        self._values = dict(initial or {})
+        self._versions = {var: 1 for var in self._values}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, var):
+        lock = self._locks.get(var)
+        if lock is None:
+            with self._locks_lock:
+                lock = self._locks.setdefault(var, ReadWriteLock())
+        return lock
+
+    def __getitem__(self, var):
+        lock = self._lock(var)
+        lock.acquire_read()
+        try:
+            return self._values[var]
+        finally:
+            lock.release_read()
+
+    def __setitem__(self, var, value):
+        self.write({var: value})
+
+    def __delitem__(self, var):
+        lock = self._lock(var)
+        lock.acquire_write()
+        try:
+            del self._values[var]
+            self._versions[var] += 1
+        finally:
+            lock.release_write()
+
+    def __iter__(self):
+        return iter(list(self._values))
+
+    def __len__(self):
+        return len(self._values)
+
+    def version(self, var):
+        """Returns the number of times a variable was written, 0 if it never was."""
+        return self._versions.get(var, 0)
+
+    def read(self, names):
+        """
+        Returns a consistent snapshot {variable: value} of the given variables that have a value.
+        The locks are taken in sorted order, so concurrent snapshots and writes cannot deadlock.
+        """
+        locks = [self._lock(var) for var in sorted(set(names), key=_lock_order)]
+        for lock in locks:
+            lock.acquire_read()
+        try:
+            return {var: self._values[var] for var in names if var in self._values}
+        finally:
+            for lock in reversed(locks):
+                lock.release_read()
+
+    def write(self, values):
+        """Stores several values atomically."""
+        locks = [self._lock(var) for var in sorted(values, key=_lock_order)]
+        for lock in locks:
+            lock.acquire_write()
+        try:
+            for var, value in values.items():
+                self._values[var] = value
+                self._versions[var] = self._versions.get(var, 0) + 1
+        finally:
+            for lock in reversed(locks):
+                lock.release_write()
+
+    def update(self, other=(), **kwargs):
+        values = dict(other, **kwargs)
+        if values:
+            self.write(values)
+
+    def view(self, task):
+        """
+        Returns the TaskView given to the run function of a task. A pattern in the reads
+        gives access to all the variables it covers.
+        """
+        return TaskView(task.name, self.read(expand(task.reads, self)), task.reads, task.writes,
+                        self.violations if self.debug else None)
+
+
+class TaskView(Mapping):
+    """
+    The variables as seen by one task: a snapshot of its declared reads, taken when the task
+    is started, into which it can assign its declared writes. The keys covered by a pattern
+    of its reads or writes are declared.
+
+    Views hold no lock and can be sent to process workers.
+    """
+
+    def __init__(self, task_name, values, reads, writes, violations=None):
+        self.task_name = task_name
+        self.written = {}
+        self._values = values
+        self._reads = frozenset(reads)
+        self._writes = frozenset(writes)
+        self._violations = violations
+
+    @property
+    def debug(self):
+        return self._violations is not None
+
+    def _undeclared(self, kind, var):
+        if self._violations is not None:
+            self._violations.append((self.task_name, kind, var))
+        return UndeclaredAccessError(f"Task {self.task_name} {kind}s undeclared variable: {var}")
+
+    def __getitem__(self, var):
+        if var in self.written:
+            return self.written[var]
+        if self.debug and not covered(var, self._reads):
+            raise self._undeclared("read", var)
+        return self._values[var]
+
+    def __setitem__(self, var, value):
+        if not covered(var, self._writes):
+            raise self._undeclared("write", var)
+        self.written[var] = value
+
+    def __iter__(self):
+        return iter(self._values.keys() | self.written.keys())
+
+    def __len__(self):
+        return len(self._values.keys() | self.written.keys())
+
+    def __getstate__(self):
+        # the violations list of the store is not shared with other processes
+        state = self.__dict__.copy()
+        if state["_violations"] is not None:
+            state["_violations"] = []
+        return state
+
+    def outputs(self, result):
+        """Merges the values assigned into the view with the dictionary returned by the task."""
+        if not self.written:
+            return result
+        outputs = dict(self.written)
+        if result:
+            outputs.update(result)
+        return outputs
+
+
+def run_with_view(function, view):
+    """Calls a run function with its view and returns all of its outputs."""
+    return view.outputs(function(view))
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import time
+from max_auto_parallelisation_library.graph import topological_order
+
+
+class TaskMeasure:
+    """
+    Timestamps of one execution of a task, taken in the worker.
+    The timestamps come from time.perf_counter, which uses a system-wide clock on Linux
+    and macOS, so the measures of thread and process workers can be compared.
+    """
+
+    __slots__ = ("start", "end", "pid", "thread", "error")
+
+    def __init__(self, start, end, pid, thread, error=None):
+        self.start = start
+        self.end = end
+        self.pid = pid
+        self.thread = thread
+        self.error = error
+
+    def __getstate__(self):
+        return (self.start, self.end, self.pid, self.thread, self.error)
+
+    def __setstate__(self, state):
+        self.start, self.end, self.pid, self.thread, self.error = state
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+def measured_call(function, *args):
+    """
+    Calls function in the worker and returns (result, TaskMeasure).
+    An exception raised by function is not propagated but stored in the measure,
+    so that the timestamps of failed tasks are kept.
+    """
+    start = time.perf_counter()
+    result = None
+    error = None
+    try:
+        result = function(*args)
+    except Exception as exc:
+        error = exc
+    end = time.perf_counter()
+    return result, TaskMeasure(start, end, os.getpid(), threading.get_ident(), error)
+
+
+class Tracer:
+    """
+    Records the submit, start and end timestamps of each task of the runs it is given to,
+    with the worker (process and thread ids) that executed it and the raised exception.
+
+        tracer = Tracer()
+        system.run(tracer=tracer)
+        tracer.save("trace.json")  # open with chrome://tracing or https://ui.perfetto.dev
+        print(tracer.summary(system.get_plan().max_precedence))
+    """
+
+    def __init__(self):
+        self.events = []
+        self._submitted = {}
+        self._lock = threading.Lock()
+
+    def submitted(self, task_name):
+        """Records the submission of a task to an executor."""
+        self._submitted[task_name] = time.perf_counter()
+
+    def record(self, task_name, measure):
+        """Records the TaskMeasure of a completed task."""
+        with self._lock:
+            self.events.append({
+                "task": task_name,
+                "submit": self._submitted.pop(task_name, measure.start),
+                "start": measure.start,
+                "end": measure.end,
+                "pid": measure.pid,
+                "thread": measure.thread,
+                "error": None if measure.error is None else repr(measure.error),
+            })
+
+    def clear(self):
+        self.events = []
+        self._submitted = {}
+
+    def to_chrome_trace(self):
+        """
+        Returns the events in the Chrome trace-event format: one complete event per task
+        execution, with the time spent in the executor queue in its arguments.
+        """
+        origin = min((event["submit"] for event in self.events), default=0)
+        trace_events = []
+        for event in self.events:
+            args = {"queued_us": (event["start"] - event["submit"]) * 1e6}
+            if event["error"] is not None:
+                args["error"] = event["error"]
+            trace_events.append({
+                "name": event["task"],
+                "cat": "task",
+                "ph": "X",
+                "ts": (event["start"] - origin) * 1e6,
+                "dur": (event["end"] - event["start"]) * 1e6,
+                "pid": event["pid"],
+                "tid": event["thread"],
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def save(self, path):
+        """Writes the Chrome trace-event JSON to path."""
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+    def summary(self, precedence=None):
+        """
+        Summarises the recorded events.
+
+        Args:
+            precedence: The precedence graph that was executed, needed for the critical path.
+
+        Returns:
+            A dictionary with the wall time, the mean queue wait, and for each worker
+            its busy time, utilisation and idle gaps between two tasks. When precedence
+            is given, also the critical path (by measured durations) and its length.
+        """
+        if not self.events:
+            return {"wall_time": 0.0, "mean_queue_wait": 0.0, "workers": {}}
+        begin = min(event["submit"] for event in self.events)
+        finish = max(event["end"] for event in self.events)
+        wall_time = finish - begin
+
+        by_worker = {}
+        for event in sorted(self.events, key=lambda event: event["start"]):
+            by_worker.setdefault((event["pid"], event["thread"]), []).append(event)
+        workers = {}
+        for (pid, thread), events in by_worker.items():
+            busy = sum(event["end"] - event["start"] for event in events)
+            gaps = [
+                later["start"] - earlier["end"]
+                for earlier, later in zip(events, events[1:])
+                if later["start"] > earlier["end"]
+            ]
+            workers[f"{pid}:{thread}"] = {
+                "tasks": len(events),
+                "busy_time": busy,
+                "utilisation": busy / wall_time if wall_time > 0 else 0.0,
+                "idle_gaps": gaps,
+            }
+
+        result = {
+            "wall_time": wall_time,
+            "mean_queue_wait": sum(event["start"] - event["submit"] for event in self.events) / len(self.events),
+            "workers": workers,
+        }
+        if precedence is not None:
+            result["critical_path"], result["critical_path_length"] = self._critical_path(precedence)
+        return result
+
+    def _critical_path(self, precedence):
+        # mean duration of each task over the recorded runs
+        totals = {}
+        for event in self.events:
+            total, count = totals.get(event["task"], (0.0, 0))
+            totals[event["task"]] = (total + event["end"] - event["start"], count + 1)
+        durations = {task_name: total / count for task_name, (total, count) in totals.items()}
+        finish = {}
+        previous = {}
+        for task_name in topological_order(precedence):
+            best = max(precedence.get(task_name, ()), key=lambda dep: finish[dep], default=None)
+            previous[task_name] = best
+            finish[task_name] = durations.get(task_name, 0.0) + (finish[best] if best is not None else 0.0)
+        if not finish:
+            return [], 0.0
+        task_name = max(finish, key=finish.get)
+        length = finish[task_name]
+        path = []
+        while task_name is not None:
+            path.append(task_name)
+            task_name = previous[task_name]
+        return path[::-1], length
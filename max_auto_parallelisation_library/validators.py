@@ -1,3 +1,6 @@
+from collections import Counter
+
+
 class TaskSystemValidationError(Exception):
     """Personalised exception for task system validation errors."""
     pass
@@ -51,8 +54,8 @@ class TaskSystemValidator:
             raise TaskSystemValidationError("Task list CANNOT be empty")
             
 
-        task_names = [task.name for task in tasks]
-        duplicates = {name for name in task_names if task_names.count(name) > 1}
+        name_counts = Counter(task.name for task in tasks)
+        duplicates = [name for name, count in name_counts.items() if count > 1]
         if duplicates:
             raise TaskSystemValidationError(
                 f"Duplicated tasks name detected: {', '.join(duplicates)}"
@@ -103,26 +106,37 @@ class TaskSystemValidator:
     @staticmethod
     def _check_cycles(precedence):
         """
-        Detect cycles in the precedence graph using a depth-first search (DFS) approach.
+        Detect cycles in the precedence graph using an iterative depth-first search (DFS),
+        so that long dependency chains do not hit the recursion limit.
+        The error message contains the full path of the detected cycle.
         """
         visited = set()
-        temp_visited = set()
+        on_path = {}  # node -> position in path
+        path = []
 
-     
-        def detect_cycle(node):
-            if node in temp_visited:
-                cycle_path = [node]
-                raise TaskSystemValidationError(
-                    f"Detected cycle in precedence graph: {' -> '.join(cycle_path)}"
-                )
-                
-            if node not in visited:
-                temp_visited.add(node)
-                for neighbor in precedence[node]:
-                    detect_cycle(neighbor)
-                temp_visited.remove(node)
-                visited.add(node)
-                
-        for node in precedence:
-            if node not in visited:
-                detect_cycle(node)
\ No newline at end of file
+        for root in precedence:
+            if root in visited:
+                continue
+            stack = [(root, iter(precedence[root]))]
+            on_path[root] = 0
+            path.append(root)
+
+            while stack:
+                node, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if neighbor in on_path:
+                        cycle_path = path[on_path[neighbor]:] + [neighbor]
+                        raise TaskSystemValidationError(
+                            f"Detected cycle in precedence graph: {' -> '.join(cycle_path)}"
+                        )
+                    # unknown tasks are reported by _validate_precedence_graph
+                    if neighbor not in visited and neighbor in precedence:
+                        on_path[neighbor] = len(path)
+                        path.append(neighbor)
+                        stack.append((neighbor, iter(precedence[neighbor])))
+                        break
+                else:
+                    stack.pop()
+                    path.pop()
+                    del on_path[node]
+                    visited.add(node)
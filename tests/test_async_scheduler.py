@@ -0,0 +1,93 @@
+# tests/test_async_scheduler.py
+import asyncio
+import threading
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+
+
+def test_thousands_of_concurrent_coroutines():
+    async def io_task():
+        await asyncio.sleep(0.05)
+
+    tasks = [Task(name=f"T{i}", writes=[f"V{i}"], run=io_task) for i in range(2000)]
+    system = TaskSystem(tasks=tasks, precedence={task.name: [] for task in tasks})
+
+    start = time.perf_counter()
+    asyncio.run(system.run_async(concurrency=2000))
+
+    assert time.perf_counter() - start < 2
+
+
+def test_concurrency_limit():
+    running = 0
+    peak = 0
+
+    async def io_task():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    tasks = [Task(name=f"T{i}", writes=[f"V{i}"], run=io_task) for i in range(50)]
+    system = TaskSystem(tasks=tasks, precedence={task.name: [] for task in tasks})
+
+    asyncio.run(system.run_async(concurrency=5))
+
+    assert peak == 5
+
+
+def test_coroutines_and_sync_functions_with_variables():
+    loop_thread = threading.get_ident()
+    threads = {}
+
+    async def fetch(inputs):
+        await asyncio.sleep(0.01)
+        threads["fetch"] = threading.get_ident()
+        return {"X": 2}
+
+    def compute(inputs):
+        threads["compute"] = threading.get_ident()
+        return {"Y": inputs["X"] * 10}
+
+    async def store(inputs):
+        return {"Z": inputs["Y"] + 1}
+
+    tasks = [
+        Task(name="fetch", writes=["X"], run=fetch),
+        Task(name="compute", reads=["X"], writes=["Y"], run=compute),
+        Task(name="store", reads=["Y"], writes=["Z"], run=store),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"fetch": [], "compute": ["fetch"], "store": ["compute"]})
+
+    variables = asyncio.run(system.run_async(variables={}))
+
+    assert variables == {"X": 2, "Y": 20, "Z": 21}
+    assert threads["fetch"] == loop_thread
+    assert threads["compute"] != loop_thread
+
+
+def test_failure_cancels_running_coroutines():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    tasks = [
+        Task(name="slow", writes=["X"], run=slow),
+        Task(name="failing", writes=["Y"], run=failing),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"slow": [], "failing": []})
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(system.run_async())
+
+    assert cancelled == [True]
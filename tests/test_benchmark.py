@@ -0,0 +1,37 @@
+# tests/test_benchmark.py
+import csv
+import json
+import pytest
+from max_auto_parallelisation_library.benchmark import GENERATORS, main, make_body, run_benchmarks, write_results
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+def test_generators_build_valid_systems(generator):
+    system = GENERATORS[generator](50, body=make_body("sleep", 0.0001))
+
+    assert len(system.tasks) == 50
+    system.run()
+
+
+def test_run_benchmarks_records():
+    records = run_benchmarks(sizes=[20], bodies=["none", "cpu"], duration=0.0001)
+
+    assert len(records) == 2 * len(GENERATORS)
+    for record in records:
+        assert record["tasks"] == 20
+        assert record["bernstein"] >= 0
+        assert ("run_dataflow" in record) == (record["body"] == "cpu")
+
+
+def test_write_results(tmp_path):
+    records = run_benchmarks(sizes=[10], generators=["chain"], bodies=["none", "io"], duration=0.0001)
+
+    write_results(records, tmp_path / "results.csv")
+    with open(tmp_path / "results.csv") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["body"] for row in rows] == ["none", "io"]
+    assert rows[0]["run_dataflow"] == ""
+
+    main(["--sizes", "10", "--bodies", "none", "--output", str(tmp_path / "results.json")])
+    with open(tmp_path / "results.json") as file:
+        assert len(json.load(file)) == len(GENERATORS)
@@ -0,0 +1,56 @@
+# tests/test_bernstein.py
+import random
+import time
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.bernstein import max_parallel_precedence
+
+
+def pairwise_max_precedence(system):
+    """Reference implementation: checks Bernstein's conditions on every ordered pair."""
+    max_precedence = {task.name: set() for task in system.tasks}
+    for task_i in system.tasks:
+        for task_j in system.tasks:
+            if task_i is task_j:
+                continue
+            conflict = (
+                set(task_i.reads) & set(task_j.writes)
+                or set(task_j.reads) & set(task_i.writes)
+                or set(task_i.writes) & set(task_j.writes)
+            )
+            if conflict and task_i.name in system.getAllDependencies(task_j.name):
+                max_precedence[task_j.name].add(task_i.name)
+    return max_precedence
+
+
+def random_system(num_tasks, num_vars, seed):
+    rng = random.Random(seed)
+    variables = [f"V{i}" for i in range(num_vars)]
+    tasks = []
+    precedence = {}
+    for i in range(num_tasks):
+        name = f"T{i}"
+        tasks.append(Task(
+            name=name,
+            reads=rng.sample(variables, rng.randint(0, 3)),
+            writes=rng.sample(variables, rng.randint(0, 2)),
+        ))
+        candidates = [f"T{j}" for j in range(i)]
+        precedence[name] = rng.sample(candidates, min(len(candidates), rng.randint(0, 3)))
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_same_precedence_as_pairwise_check():
+    for seed in range(20):
+        system = random_system(num_tasks=40, num_vars=12, seed=seed)
+        expected = pairwise_max_precedence(system)
+        assert max_parallel_precedence(system.tasks, system.precedence) == expected
+
+
+def test_max_parallel_system_scales():
+    """Several thousand tasks are planned in well under a few seconds."""
+    system = random_system(num_tasks=3000, num_vars=500, seed=0)
+
+    start = time.perf_counter()
+    system.create_max_parallel_system()
+
+    assert time.perf_counter() - start < 10
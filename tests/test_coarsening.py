@@ -0,0 +1,112 @@
+# tests/test_coarsening.py
+import functools
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.coarsening import coarsen
+from max_auto_parallelisation_library.graph import topological_order
+from max_auto_parallelisation_library.tracing import Tracer
+
+
+def add_one(source, target, inputs):
+    return {target: inputs.get(source, 0) + 1}
+
+
+def increment(source, target):
+    return functools.partial(add_one, source, target)
+
+
+def chain_system(length, cost=1e-6):
+    tasks = [Task(name=f"T{i}", reads=[f"V{i - 1}"] if i else [], writes=[f"V{i}"],
+                  run=increment(f"V{i - 1}", f"V{i}"), cost=cost) for i in range(length)]
+    precedence = {f"T{i}": [f"T{i - 1}"] if i else [] for i in range(length)}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_chains_are_fused_up_to_the_grain():
+    system = chain_system(10)
+    plan = system.get_plan()
+    costs = {task.name: task.cost for task in system.tasks}
+
+    precedence, task_map = coarsen(plan.max_precedence, system.task_map, costs, grain=3.5e-6)
+
+    assert list(precedence) == ["T0+T1+T2", "T3+T4+T5", "T6+T7+T8", "T9"]
+    assert precedence["T3+T4+T5"] == ["T0+T1+T2"]
+    assert task_map["T9"] is system.task_map["T9"]
+    assert task_map["T0+T1+T2"].writes == ["V0", "V1", "V2"]
+
+
+def test_large_tasks_are_not_fused():
+    system = chain_system(5, cost=1.0)
+    plan = system.get_plan()
+    precedence, _ = coarsen(plan.max_precedence, system.task_map, {f"T{i}": 1.0 for i in range(5)}, grain=0.5)
+    assert set(precedence) == {f"T{i}" for i in range(5)}
+
+
+def test_siblings_are_batched_without_cycles():
+    tasks = [Task(name="source", writes=["S"], cost=1e-6)]
+    tasks += [Task(name=f"leaf{i}", reads=["S"], writes=[f"L{i}"], cost=1e-6) for i in range(10)]
+    tasks += [Task(name="sink", reads=[f"L{i}" for i in range(10)], writes=["R"], cost=1.0)]
+    precedence = {"source": [], "sink": [f"leaf{i}" for i in range(10)]}
+    precedence.update({f"leaf{i}": ["source"] for i in range(10)})
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+    costs = {task.name: task.cost for task in tasks}
+
+    fused, task_map = coarsen(system.get_plan().max_precedence, system.task_map, costs, grain=5e-6)
+
+    leaves = [name for name in fused if name.startswith("leaf")]
+    assert len(leaves) == 2
+    assert sorted(fused["sink"]) == sorted(leaves)
+    topological_order(fused)  # raises on a cycle
+    members = sorted(task.name for name in leaves for task in task_map[name].run.tasks)
+    assert members == sorted(f"leaf{i}" for i in range(10))
+
+
+@pytest.mark.parametrize("mode", ["dataflow", "levels", "priority"])
+def test_coarsened_run_gives_the_same_results(mode):
+    system = chain_system(50)
+    variables = system.run(mode=mode, variables={}, grain=1e-5)
+    assert variables == {f"V{i}": i + 1 for i in range(50)}
+
+
+@pytest.mark.parametrize("mode", ["dataflow", "levels", "priority", "stealing"])
+def test_measured_costs_drive_the_fusion(mode):
+    system = chain_system(50, cost=None)
+    work_items = []
+    for _ in range(2):
+        tracer = Tracer()
+        variables = system.run(mode=mode, variables={}, tracer=tracer, grain=1e-3)
+        work_items.append(len(tracer.events))
+        assert variables["V49"] == 50
+
+    # the tasks are unknown at first, then measured far below the grain
+    assert work_items[0] == 50
+    assert work_items[1] < 5
+
+
+def test_coarsened_run_with_the_process_backend():
+    system = chain_system(20)
+    variables = system.run(backend="process", variables={}, grain=1e-5)
+    assert variables["V19"] == 20
+
+
+def test_fused_task_failure_names_the_task():
+    def fail(inputs):
+        raise RuntimeError("boom")
+
+    system = chain_system(4)
+    system.task_map["T2"].run = fail
+
+    with pytest.raises(RuntimeError, match="boom") as error:
+        system.run(variables={}, grain=1.0)
+    assert error.value.task_name == "T2"
+
+
+def test_legacy_convention_is_supported():
+    executed = []
+    tasks = [Task(name=name, writes=[name], run=lambda name=name: executed.append(name), cost=0)
+             for name in "ABC"]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": ["A"], "C": ["B"]})
+
+    system.run(grain=1.0)
+
+    assert executed == ["A", "B", "C"]
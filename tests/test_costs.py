@@ -0,0 +1,74 @@
+# tests/test_costs.py
+import threading
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.costs import CostModel, predict_makespan, upward_ranks
+
+
+def test_upward_ranks():
+    precedence = {"A": [], "B": ["A"], "C": ["A"], "D": ["B", "C"]}
+    costs = {"A": 1, "B": 5, "C": 2, "D": 1}
+    assert upward_ranks(precedence, costs) == {"A": 7, "B": 6, "C": 3, "D": 1}
+
+
+def test_predict_makespan():
+    precedence = {"A": [], "B": [], "C": [], "D": ["A"]}
+    costs = {"A": 2, "B": 1, "C": 1, "D": 2}
+    # the critical path A -> D is started first
+    assert predict_makespan(precedence, costs, num_workers=2) == 4
+    assert predict_makespan(precedence, costs, num_workers=1) == 6
+    assert predict_makespan(precedence, costs, num_workers=4) == 4
+
+
+def test_cost_model_estimates():
+    model = CostModel(default_cost=3.0, smoothing=0.5)
+    task = Task(name="T1", cost=2.0)
+
+    assert model.estimate(Task(name="T2")) == 3.0
+    assert model.estimate(task) == 2.0
+    model.record("T1", 1.0)
+    model.record("T1", 3.0)
+    assert model.estimate(task) == pytest.approx(2.0)
+
+
+def test_priority_mode_starts_critical_path_first():
+    order = []
+    lock = threading.Lock()
+
+    def make_run(name):
+        def run():
+            with lock:
+                order.append(name)
+        return run
+
+    tasks = [
+        Task(name="short1", writes=["A"], run=make_run("short1"), cost=0.01),
+        Task(name="short2", writes=["B"], run=make_run("short2"), cost=0.01),
+        Task(name="long", writes=["C"], run=make_run("long"), cost=1.0),
+        Task(name="after_long", reads=["C"], writes=["D"], run=make_run("after_long"), cost=1.0),
+    ]
+    precedence = {"short1": [], "short2": [], "long": [], "after_long": ["long"]}
+    system = TaskSystem(tasks=tasks, precedence=precedence, max_workers=1)
+
+    system.run(mode="priority")
+    system.close()
+
+    assert order[0] == "long"
+    assert set(order) == {"short1", "short2", "long", "after_long"}
+    # the measured durations replace the declared costs
+    assert set(system.cost_model.measured) == set(order)
+    assert system.cost_model.estimate(tasks[2]) < 1.0
+
+
+def test_parcost_reports_predicted_makespan():
+    tasks = [
+        Task(name="T1", writes=["X"], run=lambda: None, cost=0.5),
+        Task(name="T2", writes=["Y"], run=lambda: None, cost=0.5),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"T1": [], "T2": []})
+
+    results = system.parCost(num_runs=1, warmup_runs=0, verbose=False)
+    assert results["predicted_makespan"] == pytest.approx(0.5)
+
+    results = system.parCost(num_runs=1, warmup_runs=0, verbose=False, mode="priority")
+    assert results["predicted_makespan"] < 0.5
@@ -0,0 +1,150 @@
+# tests/test_dataplane.py
+import functools
+import pickle
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+
+np = pytest.importorskip("numpy")
+from max_auto_parallelisation_library.dataplane import SharedArray, SharedArrayPlane, call_with_shared
+
+SIZE = 1 << 16
+
+
+def load(inputs):
+    return {"A": np.arange(SIZE, dtype=np.float64)}
+
+
+def double(inputs):
+    return {"B": inputs["A"] * 2}
+
+
+def total(inputs):
+    return {"S": float(inputs["A"].sum() + inputs["B"].sum())}
+
+
+def scale(inputs):
+    return {"C": inputs["W"] * 3}
+
+
+def build_system():
+    tasks = [
+        Task(name="load", writes=["A"], run=load),
+        Task(name="double", reads=["A"], writes=["B"], run=double),
+        Task(name="total", reads=["A", "B"], writes=["S"], run=total),
+        Task(name="scale", reads=["W"], writes=["C"], run=scale),
+    ]
+    precedence = {"load": [], "double": ["load"], "total": ["double"], "scale": []}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_arrays_are_exchanged_through_shared_memory(backend):
+    plane = SharedArrayPlane(min_bytes=1024)
+    weights = np.ones(SIZE)
+    variables = build_system().run(backend=backend, variables={"W": weights}, data_plane=plane)
+
+    expected = np.arange(SIZE, dtype=np.float64)
+    assert variables["S"] == expected.sum() * 3
+    np.testing.assert_array_equal(variables["B"], expected * 2)
+    np.testing.assert_array_equal(variables["C"], weights * 3)
+    # inputs never written are given back unchanged
+    assert variables["W"] is weights
+    assert len(plane) == 0
+
+
+def test_reference_counts_follow_the_precedence_graph():
+    plane = SharedArrayPlane(min_bytes=1024)
+    system = build_system()
+    variables = {"W": np.ones(SIZE)}
+    plane.prepare(system.get_plan().max_precedence, system.task_map, variables)
+    try:
+        # one reference per reader, plus one for the final version of each variable
+        assert plane._count((None, "W"), final=True) == 2
+        assert plane._count(("load", "A")) == 3
+        assert plane._count(("double", "B")) == 2
+        assert isinstance(variables["W"], SharedArray)
+    finally:
+        plane.finish(variables)
+    assert len(plane) == 0
+
+
+def test_blocks_are_freed_after_their_last_reader(monkeypatch):
+    import max_auto_parallelisation_library.dataplane as dataplane
+    events = []
+    unlink = dataplane._unlink
+
+    def record_unlink(name):
+        events.append("unlink")
+        unlink(name)
+
+    def overwrite(inputs):
+        events.append("overwrite")
+        return {"A": np.zeros(SIZE)}
+
+    monkeypatch.setattr(dataplane, "_unlink", record_unlink)
+    tasks = [
+        Task(name="load", writes=["A"], run=load),
+        Task(name="double", reads=["A"], writes=["B"], run=double),
+        Task(name="overwrite", writes=["A"], run=overwrite),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"load": [], "double": ["load"], "overwrite": ["double"]})
+
+    variables = system.run(variables={}, data_plane=SharedArrayPlane(min_bytes=1024))
+
+    # the first version of A is freed as soon as double, its only reader, completes
+    assert events[:2] == ["unlink", "overwrite"]
+    assert not variables["A"].any()
+
+
+def test_small_arrays_and_other_values_are_pickled():
+    plane = SharedArrayPlane(min_bytes=SIZE * 8 + 1)
+    variables = build_system().run(variables={"W": np.ones(4)}, data_plane=plane)
+    assert not any(isinstance(value, SharedArray) for value in variables.values())
+
+
+def test_handles_are_small_when_pickled():
+    outputs = call_with_shared(load, 1024, {})
+    handle = outputs["A"]
+    try:
+        assert isinstance(handle, SharedArray)
+        assert len(pickle.dumps(handle)) < 200
+        np.testing.assert_array_equal(handle.copy(), np.arange(SIZE, dtype=np.float64))
+    finally:
+        from max_auto_parallelisation_library.dataplane import _unlink
+        _unlink(handle.name)
+
+
+def test_requires_dataflow_mode():
+    with pytest.raises(ValueError, match="only supported in dataflow mode"):
+        build_system().run(mode="levels", variables={"W": np.ones(4)}, data_plane=SharedArrayPlane())
+
+
+def fill_part(i, inputs):
+    return {("part", i): np.full(SIZE, float(i))}
+
+
+def sum_parts(inputs):
+    return {"S": sum(float(value.sum()) for value in inputs.values())}
+
+
+def test_pattern_readers_hold_the_arrays_they_cover():
+    tasks = [Task(name=f"fill{i}", writes=[("part", i)], run=functools.partial(fill_part, i)) for i in range(3)]
+    tasks.append(Task(name="total", reads=[("part", ...), "W"], writes=["S"], run=sum_parts))
+    precedence = {"fill0": [], "fill1": [], "fill2": [], "total": ["fill0", "fill1", "fill2"]}
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+
+    plane = SharedArrayPlane(min_bytes=1024)
+    variables = {"W": np.ones(SIZE)}
+    plane.prepare(system.get_plan().max_precedence, system.task_map, variables)
+    try:
+        # one reference for the reader of each partition, plus one for its final version
+        assert plane._count(("fill1", ("part", 1))) == 2
+        assert plane._count((None, "W"), final=True) == 2
+    finally:
+        plane.finish(variables)
+
+    plane = SharedArrayPlane(min_bytes=1024)
+    variables = system.run(backend="process", variables={"W": np.ones(SIZE)}, data_plane=plane)
+    assert variables["S"] == SIZE * 4
+    np.testing.assert_array_equal(variables[("part", 2)], np.full(SIZE, 2.0))
+    assert len(plane) == 0
@@ -0,0 +1,177 @@
+# tests/test_distributed.py
+import functools
+import os
+import signal
+import threading
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.distributed import (
+    DistributedBackend, WorkerLostError, _Worker, start_local_workers
+)
+
+
+def produce(inputs):
+    return {"X": list(range(1000)), "P1": os.getpid()}
+
+
+def consume(inputs):
+    return {"Y": sum(inputs["X"]), "P2": os.getpid()}
+
+
+def total(target, inputs):
+    return {target: sum(inputs["X"])}
+
+
+def other(inputs):
+    return {"Z": 1}
+
+
+def append(target, inputs):
+    inputs["X"].append(0)
+    return {target: len(inputs["X"])}
+
+
+def fail(inputs):
+    raise ValueError("bad input")
+
+
+def die_once(marker, inputs):
+    # the first attempt kills its worker, the task succeeds when submitted again
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return {"X": 42}
+
+
+def freeze_once(marker, inputs):
+    # the first attempt stops its worker, which then misses its heartbeats
+    if not os.path.exists(marker):
+        with open(marker, "w") as file:
+            file.write(str(os.getpid()))
+        os.kill(os.getpid(), signal.SIGSTOP)
+    return {"X": 42}
+
+
+def always_die(inputs):
+    os._exit(1)
+
+
+class BlockedSocket:
+    def __init__(self):
+        self.sending = threading.Event()
+        self.release = threading.Event()
+
+    def sendall(self, data):
+        self.sending.set()
+        self.release.wait()
+
+    def close(self):
+        self.release.set()
+
+
+@pytest.fixture
+def cluster():
+    backend = DistributedBackend(heartbeat_interval=0.1, heartbeat_timeout=1.0, max_retries=1)
+    processes = start_local_workers(backend.address, 2, heartbeat_interval=0.1)
+    assert backend.wait_for_workers(2, timeout=10)
+    yield backend, processes
+    backend.close()
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+
+def test_tasks_run_on_remote_workers(cluster):
+    backend, processes = cluster
+    tasks = [
+        Task(name="produce", writes=["X", "P1"], run=produce),
+        Task(name="consume", reads=["X"], writes=["Y", "P2"], run=consume),
+        Task(name="other", writes=["Z"], run=other),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"produce": [], "consume": ["produce"], "other": []})
+
+    variables = system.run(backend=backend, variables={})
+
+    assert variables["Y"] == sum(range(1000)) and variables["Z"] == 1
+    assert variables["P1"] in {process.pid for process in processes}
+    # consume is placed on the worker holding X, which is not sent back
+    assert variables["P2"] == variables["P1"]
+    assert backend.values_reused == 1 and backend.values_sent == 0
+
+
+@pytest.mark.parametrize("mode", ["levels", "priority"])
+def test_every_scheduler_can_use_the_backend(cluster, mode):
+    backend, _ = cluster
+    tasks = [Task(name=f"T{i}", reads=["X"], writes=[f"Y{i}"], run=functools.partial(total, f"Y{i}"))
+             for i in range(6)]
+    system = TaskSystem(tasks=tasks, precedence={task.name: [] for task in tasks})
+
+    variables = system.run(mode=mode, backend=backend, variables={"X": [1, 2, 3]})
+
+    assert [variables[f"Y{i}"] for i in range(6)] == [6] * 6
+
+
+def test_task_exceptions_are_propagated(cluster):
+    backend, _ = cluster
+    system = TaskSystem(tasks=[Task(name="fail", writes=["X"], run=fail)], precedence={"fail": []})
+    with pytest.raises(ValueError, match="bad input"):
+        system.run(backend=backend, variables={})
+
+
+def test_task_is_retried_when_its_worker_dies(cluster, tmp_path):
+    backend, _ = cluster
+    future = backend.submit(die_once, str(tmp_path / "marker"), {})
+    assert future.result(timeout=10) == {"X": 42}
+    assert backend.worker_count() == 1
+
+
+def test_task_is_retried_when_its_worker_stops_answering(cluster, tmp_path):
+    backend, _ = cluster
+    marker = tmp_path / "marker"
+    future = backend.submit(freeze_once, str(marker), {})
+    try:
+        assert future.result(timeout=10) == {"X": 42}
+    finally:
+        os.kill(int(marker.read_text()), signal.SIGKILL)
+
+
+def test_task_fails_after_max_retries(cluster):
+    backend, _ = cluster
+    future = backend.submit(always_die, {})
+    with pytest.raises(WorkerLostError):
+        future.result(timeout=10)
+
+
+def test_tasks_get_their_own_copy_of_the_held_values(cluster):
+    backend, _ = cluster
+    tasks = [
+        Task(name="produce", writes=["X", "P1"], run=produce),
+        Task(name="A", reads=["X"], writes=["A"], run=functools.partial(append, "A")),
+        Task(name="B", reads=["X", "A"], writes=["B"], run=functools.partial(append, "B")),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"produce": [], "A": ["produce"], "B": ["A"]})
+
+    variables = system.run(backend=backend, variables={})
+
+    # both tasks reuse the X held by the producing worker, neither sees the other's append
+    assert backend.values_reused == 3 and backend.values_sent == 0
+    assert variables["A"] == variables["B"] == 1001 and len(variables["X"]) == 1000
+
+
+def test_tasks_are_sent_without_holding_the_lock():
+    with DistributedBackend() as backend:
+        sock = BlockedSocket()
+        with backend._lock:
+            backend._workers[0] = _Worker(0, sock, 1)
+        threading.Thread(target=backend.submit, args=(other, {}), daemon=True).start()
+        assert sock.sending.wait(10)
+
+        # the coordinator still accepts tasks while a worker is slow to receive one
+        submitted = threading.Thread(target=backend.submit, args=(other, {}), daemon=True)
+        submitted.start()
+        submitted.join(10)
+        try:
+            assert not submitted.is_alive()
+        finally:
+            sock.release.set()
@@ -0,0 +1,135 @@
+# tests/test_executors.py
+import os
+import threading
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.executors import ThreadBackend, HybridBackend, make_backend
+
+
+# process workers need picklable, module level run functions
+def run_load(inputs):
+    return {"X": 3, "Y": 4}
+
+
+def run_square(inputs):
+    return {"X2": inputs["X"] ** 2}
+
+
+def run_cube(inputs):
+    return {"Y3": inputs["Y"] ** 3}
+
+
+def run_sum(inputs):
+    return {"Z": inputs["X2"] + inputs["Y3"]}
+
+
+def run_pid(inputs):
+    return {"pid": os.getpid()}
+
+
+def build_system():
+    tasks = [
+        Task(name="load", writes=["X", "Y"], run=run_load),
+        Task(name="square", reads=["X"], writes=["X2"], run=run_square, bound="cpu"),
+        Task(name="cube", reads=["Y"], writes=["Y3"], run=run_cube, bound="cpu"),
+        Task(name="sum", reads=["X2", "Y3"], writes=["Z"], run=run_sum),
+    ]
+    precedence = {"load": [], "square": ["load"], "cube": ["load"], "sum": ["square", "cube"]}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process", "hybrid"])
+def test_backends_exchange_variables(backend):
+    variables = build_system().run(backend=backend, variables={})
+    assert variables["Z"] == 3 ** 2 + 4 ** 3
+
+
+@pytest.mark.parametrize("mode", ["dataflow", "levels"])
+def test_process_backend_modes(mode):
+    variables = build_system().run(mode=mode, backend="process", variables={"unused": 0})
+    assert variables["Z"] == 73
+    assert variables["unused"] == 0
+
+
+def test_run_seq_with_process_backend():
+    variables = build_system().runSeq(backend="process")
+    assert variables["Z"] == 73
+
+
+def test_hybrid_backend_routes_cpu_tasks_to_processes():
+    tasks = [
+        Task(name="io", writes=["pid"], run=run_pid),
+        Task(name="cpu", writes=["pid"], run=run_pid, bound="cpu"),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"io": [], "cpu": ["io"]})
+
+    variables = system.run(backend=HybridBackend())
+
+    assert variables["pid"] != os.getpid()
+
+
+def test_thread_backend_keeps_global_convention():
+    calls = []
+    tasks = [Task(name="T1", writes=["X"], run=lambda: calls.append("T1"))]
+
+    result = TaskSystem(tasks=tasks, precedence={"T1": []}).run(backend=ThreadBackend(max_workers=1))
+
+    assert result is None
+    assert calls == ["T1"]
+
+
+def test_undeclared_write_is_rejected():
+    tasks = [Task(name="T1", writes=["X"], run=lambda inputs: {"Y": 1})]
+    system = TaskSystem(tasks=tasks, precedence={"T1": []})
+
+    with pytest.raises(ValueError, match="undeclared variables: Y"):
+        system.run(variables={})
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown executor backend"):
+        make_backend("gpu")
+
+
+def test_backend_pool_is_reused_across_runs_and_systems():
+    thread_ids = set()
+
+    def record():
+        thread_ids.add(threading.get_ident())
+
+    with ThreadBackend(max_workers=1) as backend:
+        for _ in range(2):
+            system = TaskSystem(
+                tasks=[Task(name="T1", writes=["X"], run=record)],
+                precedence={"T1": []},
+                backend=backend,
+            )
+            system.run()
+            system.runSeq()
+            system.close()  # a shared backend is not closed by the system
+        executor = backend.executor_for(None)
+        assert not executor._shutdown
+
+    assert len(thread_ids) == 1
+    assert backend._executor is None
+
+
+def test_system_owned_pool_lifecycle():
+    with TaskSystem(
+        tasks=[Task(name="T1", writes=["X"], run=lambda: None)],
+        precedence={"T1": []},
+        max_workers=2,
+    ) as system:
+        system.run()
+        executor = system.backend.executor_for(None)
+        system.run()
+        assert system.backend.executor_for(None) is executor
+        assert executor._max_workers == 2
+
+    assert executor._shutdown
+
+
+def test_system_rejects_a_backend_with_max_workers():
+    with pytest.raises(ValueError, match="max_workers"):
+        TaskSystem(tasks=[Task(name="T1", writes=["X"], run=lambda: None)], precedence={"T1": []},
+                   backend="thread", max_workers=2)
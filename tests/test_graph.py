@@ -0,0 +1,91 @@
+# tests/test_graph.py
+import random
+import time
+import pytest
+from max_auto_parallelisation_library.graph import (
+    compute_levels, successor_map, topological_order, transitive_reduction
+)
+
+
+def naive_reduction(precedence):
+    """Reference implementation: drops dep if it is reachable from another dependency."""
+    def reachable(start, target):
+        stack, seen = [start], set()
+        while stack:
+            current = stack.pop()
+            if current == target:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(precedence[current])
+        return False
+
+    return {
+        task: {dep for dep in deps if not any(reachable(other, dep) for other in deps if other != dep)}
+        for task, deps in precedence.items()
+    }
+
+
+def random_dag(num_tasks, max_deps, seed):
+    rng = random.Random(seed)
+    precedence = {}
+    for i in range(num_tasks):
+        candidates = range(i)
+        precedence[f"T{i}"] = [f"T{j}" for j in rng.sample(candidates, min(i, rng.randint(0, max_deps)))]
+    return precedence
+
+
+def test_transitive_reduction_removes_shortcuts():
+    precedence = {
+        "A": [],
+        "B": ["A"],
+        "C": ["A", "B"],
+        "D": ["A", "B", "C"],
+    }
+    assert transitive_reduction(precedence) == {"A": [], "B": ["A"], "C": ["B"], "D": ["C"]}
+    # the input is left untouched
+    assert precedence["D"] == ["A", "B", "C"]
+
+
+def test_transitive_reduction_matches_naive():
+    for seed in range(20):
+        precedence = random_dag(num_tasks=50, max_deps=6, seed=seed)
+        reduced = {task: set(deps) for task, deps in transitive_reduction(precedence).items()}
+        assert reduced == naive_reduction(precedence)
+
+
+def test_transitive_reduction_large_graph():
+    """A graph with more than 50k edges is reduced in a few seconds."""
+    precedence = random_dag(num_tasks=12000, max_deps=10, seed=0)
+    assert sum(len(deps) for deps in precedence.values()) > 50000
+
+    start = time.perf_counter()
+    transitive_reduction(precedence)
+
+    assert time.perf_counter() - start < 10
+
+
+def test_topological_order_detects_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order({"A": ["B"], "B": ["A"]})
+
+
+def test_successor_map():
+    precedence = {"A": [], "B": ["A"], "C": ["A", "B"]}
+    assert successor_map(precedence) == {"A": ["B", "C"], "B": ["C"], "C": []}
+
+
+def test_compute_levels():
+    precedence = {"A": [], "B": [], "C": ["A"], "D": ["B", "C"]}
+    assert [set(level) for level in compute_levels(precedence)] == [{"A", "B"}, {"C"}, {"D"}]
+
+
+def test_compute_levels_large_graph():
+    """Levels of a graph with tens of thousands of tasks are computed in linear time."""
+    precedence = random_dag(num_tasks=50000, max_deps=4, seed=1)
+
+    start = time.perf_counter()
+    levels = compute_levels(precedence)
+
+    assert time.perf_counter() - start < 5
+    assert sum(len(level) for level in levels) == 50000
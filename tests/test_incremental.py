@@ -0,0 +1,119 @@
+# tests/test_incremental.py
+import threading
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.incremental import OutputCache, fingerprint
+
+
+def build_pipeline(executed):
+    lock = threading.Lock()
+
+    def track(name, function):
+        def run(inputs):
+            with lock:
+                executed.append(name)
+            return function(inputs)
+        return run
+
+    tasks = [
+        Task(name="clean", reads=["raw"], writes=["clean"],
+             run=track("clean", lambda inputs: {"clean": abs(inputs["raw"])})),
+        Task(name="square", reads=["clean"], writes=["squared"],
+             run=track("square", lambda inputs: {"squared": inputs["clean"] ** 2})),
+        Task(name="report", reads=["squared", "title"], writes=["report"],
+             run=track("report", lambda inputs: {"report": f"{inputs['title']}: {inputs['squared']}"})),
+        Task(name="other", reads=["other_raw"], writes=["other"],
+             run=track("other", lambda inputs: {"other": inputs["other_raw"] + 1})),
+    ]
+    precedence = {"clean": [], "square": ["clean"], "report": ["square"], "other": []}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_only_downstream_of_a_change_is_executed():
+    executed = []
+    system = build_pipeline(executed)
+    cache = OutputCache()
+
+    variables = system.run(variables={"raw": 3, "title": "t", "other_raw": 1}, cache=cache)
+    assert variables["report"] == "t: 9"
+    assert sorted(executed) == ["clean", "other", "report", "square"]
+
+    executed.clear()
+    variables = system.run(variables={"raw": 3, "title": "t", "other_raw": 1}, cache=cache)
+    assert executed == []
+    assert variables["report"] == "t: 9" and variables["other"] == 2
+
+    executed.clear()
+    variables = system.run(variables={"raw": 4, "title": "t", "other_raw": 1}, cache=cache)
+    assert executed == ["clean", "square", "report"]
+    assert variables["report"] == "t: 16"
+
+    executed.clear()
+    system.run(variables={"raw": 4, "title": "new", "other_raw": 1}, cache=cache)
+    assert executed == ["report"]
+
+
+def test_unchanged_outputs_stop_propagation():
+    executed = []
+    system = build_pipeline(executed)
+    cache = OutputCache()
+    system.run(variables={"raw": 3, "title": "t", "other_raw": 1}, cache=cache)
+
+    executed.clear()
+    # clean is executed again but produces the same value
+    variables = system.run(variables={"raw": -3, "title": "t", "other_raw": 1}, cache=cache)
+
+    assert executed == ["clean"]
+    assert variables["report"] == "t: 9"
+
+
+def test_lru_eviction():
+    cache = OutputCache(max_entries=2)
+    task = Task(name="T", reads=["x"])
+    keys = [cache.key(task, {"x": value}) for value in range(3)]
+    for key in keys:
+        cache.put(key, {"y": 0})
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == {"y": 0}
+
+
+def test_size_bound():
+    cache = OutputCache(max_bytes=2000)
+    task = Task(name="T", reads=["x"])
+    for value in range(10):
+        cache.put(cache.key(task, {"x": value}), {"y": "a" * 500})
+
+    assert cache.size <= 2000
+    assert 0 < len(cache) < 10
+
+
+def test_unpicklable_reads_are_always_executed():
+    task = Task(name="T", reads=["x"])
+    assert fingerprint(lambda: None) is None
+    assert OutputCache().key(task, {"x": threading.Lock()}) is None
+
+
+def test_cache_requires_dataflow_mode():
+    system = build_pipeline([])
+    with pytest.raises(ValueError, match="only supported in dataflow mode"):
+        system.run(mode="levels", cache=OutputCache())
+
+
+def test_pattern_reads_are_part_of_the_key():
+    executed = []
+
+    def total(inputs):
+        executed.append("total")
+        return {"s": sum(inputs.values())}
+
+    tasks = [Task(name="total", reads=["base", ("t", ...)], writes=["s"], run=total)]
+    system = TaskSystem(tasks=tasks, precedence={"total": []})
+    cache = OutputCache()
+
+    assert system.run(variables={"base": 0, ("t", 1): 1, ("t", 2): 2}, cache=cache)["s"] == 3
+    assert system.run(variables={"base": 0, ("t", 1): 100, ("t", 2): 2}, cache=cache)["s"] == 102
+    assert system.run(variables={"base": 0, ("t", 1): 100, ("t", 2): 2}, cache=cache)["s"] == 102
+    assert executed == ["total", "total"]
@@ -0,0 +1,178 @@
+# tests/test_inference.py
+import dis
+import functools
+import types
+import warnings
+import pytest
+from max_auto_parallelisation_library import maxpar
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.inference import (
+    AccessMismatchWarning, check_accesses, infer_accesses, inferred_task, _analyse_code, _param_use,
+)
+
+COUNTER = 0
+
+
+def explicit(inputs):
+    total = inputs["X"] + inputs.get("Y", 0)
+    return {"Z": total, "W": [inputs["A"] for _ in range(2)]}
+
+
+def single_output(inputs):
+    return {"Z": len(inputs["X"])}
+
+
+def with_view(view):
+    view["Z"] = view["X"] * 2
+
+
+def dynamic(key, inputs):
+    return {"Z": inputs[key]}
+
+
+def global_counter():
+    global COUNTER
+    COUNTER = COUNTER + len(maxpar.__name__)
+
+
+def test_globals_of_the_legacy_convention():
+    inferred = infer_accesses(maxpar.runTsomme)
+    assert inferred.reads == {"X", "Y"} and inferred.writes == {"Z"}
+    # modules and builtins are not variables
+    inferred = infer_accesses(global_counter)
+    assert inferred.reads == {"COUNTER"} and inferred.writes == {"COUNTER"}
+
+
+def test_subscripts_and_returned_dictionaries():
+    inferred = infer_accesses(explicit)
+    assert inferred.reads == {"X", "Y", "A"}
+    assert inferred.writes == {"Z", "W"}
+    assert inferred.complete
+    assert infer_accesses(single_output).writes == {"Z"}
+    assert infer_accesses(with_view).reads == {"X"}
+    assert infer_accesses(with_view).writes == {"Z"}
+
+
+def test_closure_variables():
+    def make():
+        state = []
+        count = 0
+
+        def run():
+            nonlocal count
+            count += len(state)
+        return run
+
+    inferred = infer_accesses(make())
+    assert inferred.reads == {"count", "state"}
+    assert inferred.writes == {"count"}
+
+
+def test_partial_and_dynamic_keys():
+    inferred = infer_accesses(functools.partial(dynamic, "X"))
+    assert not inferred.complete
+    assert infer_accesses(print) is None
+
+
+def test_results_are_cached_per_code_object():
+    _analyse_code.cache_clear()
+    first = [lambda inputs: {"Z": inputs["X"]} for _ in range(3)]
+    for function in first:
+        infer_accesses(function)
+    assert _analyse_code.cache_info().misses == 1
+    assert _analyse_code.cache_info().hits == 2
+
+
+def test_mismatches_are_reported():
+    tasks = [
+        Task(name="exact", reads=["X", "Y", "A"], writes=["Z", "W"], run=explicit),
+        Task(name="missing", reads=["X"], writes=["Z", "W"], run=explicit),
+        Task(name="too_broad", reads=["X", "B"], writes=["Z"], run=single_output),
+        Task(name="unknown", reads=["B"], writes=["Z"], run=functools.partial(dynamic, "X")),
+    ]
+    with pytest.warns(AccessMismatchWarning) as record:
+        mismatches = check_accesses(tasks)
+
+    assert mismatches == {
+        "missing": "Task missing: undeclared reads: A, Y",
+        "too_broad": "Task too_broad: declared reads never accessed: B",
+    }
+    assert len(record) == 2
+
+
+def test_task_system_checks_domains():
+    tasks = [
+        Task(name="T1", writes=["X"], run=maxpar.runT1),
+        Task(name="T2", writes=["Y"], run=maxpar.runT2),
+        Task(name="somme", reads=["X"], writes=["Z"], run=maxpar.runTsomme),
+    ]
+    precedence = {"T1": [], "T2": ["T1"], "somme": ["T2"]}
+    with pytest.warns(AccessMismatchWarning, match="undeclared reads: Y"):
+        TaskSystem(tasks=tasks, precedence=precedence, check_domains=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_inferred_domains_unlock_parallelism():
+    tasks = [
+        inferred_task("T1", maxpar.runT1),
+        inferred_task("T2", maxpar.runT2),
+        inferred_task("somme", maxpar.runTsomme),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"T1": [], "T2": ["T1"], "somme": ["T2"]})
+
+    assert tasks[2].reads == ["X", "Y"]
+    assert [set(level) for level in system.get_plan().levels] == [{"T1", "T2"}, {"somme"}]
+    with pytest.raises(ValueError, match="must be declared"):
+        inferred_task("dynamic", functools.partial(dynamic, "X"))
+
+
+def partition_total(inputs):
+    return {("total", 0): inputs["base"] + inputs[("t", 1)]}
+
+
+def test_structured_keys_and_patterns():
+    tasks = [
+        Task(name="exact", reads=["base", ("t", 1)], writes=[("total", 0)], run=partition_total),
+        Task(name="pattern", reads=["base", ("t", ...)], writes=[("total", ...)], run=partition_total),
+        Task(name="missing", reads=["b", ("t", 2)], writes=[("total", 0)], run=partition_total),
+    ]
+    inferred = infer_accesses(partition_total)
+    assert inferred.reads == {"base", ("t", 1)} and inferred.writes == {("total", 0)}
+
+    with pytest.warns(AccessMismatchWarning):
+        mismatches = check_accesses(tasks)
+    assert mismatches == {
+        "missing": "Task missing: undeclared reads: base, ('t', 1); declared reads never accessed: b, ('t', 2)",
+    }
+
+
+def rebinding(inputs):
+    inputs = dict(inputs)
+    return {"Z": inputs["X"] + inputs["Y"]}
+
+
+def test_other_uses_of_the_inputs_are_incomplete():
+    assert not infer_accesses(rebinding).complete
+    assert infer_accesses(explicit).complete
+
+
+def test_combined_instructions_of_recent_pythons():
+    def instruction(opname, argval):
+        return types.SimpleNamespace(opname=opname, argval=argval)
+
+    # [inputs["Q"] for _ in r] stores _ and loads inputs in one instruction since Python 3.13
+    assert _param_use(instruction("STORE_FAST_LOAD_FAST", ("_", "inputs")), "inputs") == "load"
+    assert _param_use(instruction("LOAD_FAST_LOAD_FAST", ("key", "inputs")), "inputs") == "load"
+    # the inputs below another value on the stack, or stored into
+    assert _param_use(instruction("LOAD_FAST_LOAD_FAST", ("inputs", "key")), "inputs") == "other"
+    assert _param_use(instruction("STORE_FAST_STORE_FAST", ("a", "inputs")), "inputs") == "other"
+    assert _param_use(instruction("LOAD_FAST_AND_CLEAR", "inputs"), "inputs") == "other"
+    assert _param_use(instruction("LOAD_CLOSURE", "inputs"), "inputs") == "cell"
+    assert _param_use(instruction("LOAD_CONST", ("inputs", 1)), "inputs") is None
+    assert _param_use(instruction("LOAD_FAST_LOAD_FAST", ("a", "b")), "inputs") is None
+
+    for function in (explicit, single_output, with_view):
+        for instruction in dis.get_instructions(function):
+            assert _param_use(instruction, "missing") is None
@@ -0,0 +1,175 @@
+# tests/test_mapping.py
+import asyncio
+import os
+import threading
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.executors import HybridBackend, ThreadBackend
+from max_auto_parallelisation_library.mapping import concatenate, map_task, split
+from max_auto_parallelisation_library.stealing_scheduler import StealingBackend
+from max_auto_parallelisation_library.tracing import Tracer
+
+
+def square_all(chunk):
+    return [value * value for value in chunk]
+
+
+def chunk_info(chunk):
+    return [(len(chunk), os.getpid())]
+
+
+def fail_on_three(chunk):
+    if 3 in chunk:
+        raise ValueError("bad record")
+    return list(chunk)
+
+
+def load(inputs):
+    return {"records": list(range(1000))}
+
+
+def total(inputs):
+    return {"total": sum(inputs["squares"])}
+
+
+def pipeline(**kwargs):
+    tasks = [
+        Task(name="load", writes=["records"], run=load),
+        map_task("square", "records", "squares", square_all, **kwargs),
+        Task(name="total", reads=["squares"], writes=["total"], run=total),
+    ]
+    return TaskSystem(tasks=tasks, precedence={"load": [], "square": ["load"], "total": ["square"]})
+
+
+def test_split_and_concatenate():
+    assert split(list(range(10)), 3) == [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]
+    assert split([1, 2], 8) == [[1], [2]]
+    assert split([], 4) == [[]]
+    assert split({"a": 1, "b": 2, "c": 3}, 2) == [{"a": 1}, {"b": 2, "c": 3}]
+    assert concatenate([[1], [2, 3]]) == [1, 2, 3]
+    assert concatenate([(1,), (2,)]) == (1, 2)
+    assert concatenate([{"a": 1}, {"b": 2}]) == {"a": 1, "b": 2}
+    with pytest.raises(TypeError):
+        split(42, 2)
+    with pytest.raises(TypeError, match="reduce"):
+        concatenate([1, 2])
+
+
+@pytest.mark.parametrize("mode", ["dataflow", "levels", "priority", "stealing"])
+def test_map_task_gives_the_same_results_in_every_mode(mode):
+    variables = pipeline().run(mode=mode, variables={})
+    assert variables["squares"] == [value * value for value in range(1000)]
+    assert variables["total"] == sum(value * value for value in range(1000))
+    assert pipeline().run_sequential(variables={}) == variables
+
+
+def test_chunks_are_sized_to_the_workers():
+    calls = []
+
+    def record(chunk):
+        calls.append(threading.get_ident())
+        return [len(chunk)]
+
+    tasks = [map_task("sizes", "records", "sizes", record)]
+    with ThreadBackend(max_workers=4) as backend:
+        variables = TaskSystem(tasks=tasks, precedence={"sizes": []}).run(
+            backend=backend, variables={"records": list(range(10))})
+    assert variables["sizes"] == [2, 3, 2, 3]
+    assert len(calls) == 4
+
+    tasks = [map_task("sizes", "records", "sizes", record, chunks=2)]
+    variables = TaskSystem(tasks=tasks, precedence={"sizes": []}).run(variables={"records": list(range(10))})
+    assert variables["sizes"] == [5, 5]
+
+
+def chunk_size(chunk):
+    return [len(chunk)]
+
+
+def test_chunks_are_fanned_out_by_every_scheduler():
+    threads = set()
+
+    def record(chunk):
+        threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return [len(chunk)]
+
+    tasks = [map_task("sizes", "records", "sizes", record)]
+    system = TaskSystem(tasks=tasks, precedence={"sizes": []})
+    inputs = {"records": list(range(8))}
+    with StealingBackend(max_workers=4) as backend:
+        assert system.run(mode="stealing", backend=backend, variables=dict(inputs))["sizes"] == [2, 2, 2, 2]
+    assert len(threads) > 1
+
+    with ThreadBackend(max_workers=4) as backend:
+        variables = asyncio.run(system.run_async(backend=backend, variables=dict(inputs)))
+    assert variables["sizes"] == [2, 2, 2, 2]
+
+
+def test_chunks_are_sized_to_the_executor_of_the_task():
+    tasks = [map_task("cpu", "records", "cpu", chunk_size, bound="cpu"),
+             map_task("io", "records", "io", chunk_size)]
+    system = TaskSystem(tasks=tasks, precedence={"cpu": [], "io": []})
+    with HybridBackend(max_threads=3, max_processes=2) as backend:
+        variables = system.run(backend=backend, variables={"records": list(range(12))})
+    assert variables["cpu"] == [6, 6]
+    assert variables["io"] == [4, 4, 4]
+
+
+def test_chunks_run_in_worker_processes():
+    tasks = [map_task("info", "records", "info", chunk_info, chunks=3)]
+    system = TaskSystem(tasks=tasks, precedence={"info": []})
+    variables = system.run(backend="process", variables={"records": list(range(9))})
+    assert [size for size, _ in variables["info"]] == [3, 3, 3]
+    assert all(pid != os.getpid() for _, pid in variables["info"])
+
+
+def test_numpy_chunks_are_vectorised():
+    np = pytest.importorskip("numpy")
+    values = np.arange(1_000_000, dtype=np.float64)
+    tasks = [
+        map_task("scale", "values", "scaled", np.sqrt),
+        map_task("sum", "values", "sum", np.sum, reduce=sum),
+    ]
+    variables = TaskSystem(tasks=tasks, precedence={"scale": [], "sum": []}).run(variables={"values": values})
+
+    assert isinstance(variables["scaled"], np.ndarray)
+    np.testing.assert_allclose(variables["scaled"], np.sqrt(values))
+    assert variables["sum"] == pytest.approx(values.sum())
+
+
+def test_chunk_errors_are_propagated_and_traced():
+    tracer = Tracer()
+    tasks = [map_task("check", "records", "checked", fail_on_three, chunks=4)]
+    system = TaskSystem(tasks=tasks, precedence={"check": []})
+
+    with pytest.raises(ValueError, match="bad record"):
+        system.run(variables={"records": list(range(8))}, tracer=tracer)
+    assert tracer.events[0]["task"] == "check"
+    assert tracer.events[0]["error"] == "ValueError('bad record')"
+
+
+def test_failed_map_task_waits_for_its_chunks():
+    finished = []
+
+    def check(chunk):
+        if 0 in chunk:
+            raise ValueError("bad record")
+        time.sleep(0.2)
+        finished.append(chunk[0])
+        return list(chunk)
+
+    tasks = [map_task("check", "records", "checked", check, chunks=2)]
+    system = TaskSystem(tasks=tasks, precedence={"check": []})
+
+    with ThreadBackend(max_workers=2) as backend:
+        with pytest.raises(ValueError, match="bad record"):
+            system.run(backend=backend, variables={"records": list(range(8))})
+        # the other chunk is done when run() raises
+        assert finished == [4]
+
+
+def test_map_tasks_are_not_coarsened():
+    variables = pipeline(cost=0).run(variables={}, grain=1.0)
+    assert variables["total"] == sum(value * value for value in range(1000))
@@ -0,0 +1,163 @@
+# tests/test_memory.py
+import functools
+import threading
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.executors import ThreadBackend
+from max_auto_parallelisation_library.memory import MemoryManager, version_readers
+from max_auto_parallelisation_library.store import VariableStore
+
+
+def copy(source, target, inputs):
+    return {target: inputs[source] + 1}
+
+
+def pipeline():
+    # A -> B -> C, each reading the output of the previous one, and D reading A
+    tasks = [
+        Task(name="A", reads=["IN"], writes=["X"], run=functools.partial(copy, "IN", "X")),
+        Task(name="B", reads=["X"], writes=["Y"], run=functools.partial(copy, "X", "Y")),
+        Task(name="C", reads=["Y"], writes=["Z"], run=functools.partial(copy, "Y", "Z")),
+        Task(name="D", reads=["X"], writes=["W"], run=functools.partial(copy, "X", "W")),
+    ]
+    return TaskSystem(tasks=tasks, precedence={"A": [], "B": ["A"], "C": ["B"], "D": ["A"]})
+
+
+def test_dead_variables_are_freed():
+    memory = MemoryManager()
+    variables = pipeline().run(variables={"IN": 0}, memory=memory)
+
+    # the inputs and the results are kept, the intermediate variables are freed
+    assert variables == {"IN": 0, "Z": 3, "W": 2}
+    assert sorted(memory.freed) == ["X", "Y"]
+
+
+def test_kept_variables_are_not_freed():
+    variables = pipeline().run(variables={"IN": 0}, memory=MemoryManager(keep=["X"]))
+    assert variables == {"IN": 0, "X": 1, "Z": 3, "W": 2}
+
+
+def test_variables_are_freed_after_their_last_reader():
+    freed_when = {}
+    memory = MemoryManager()
+
+    def record(name, target):
+        def run(inputs):
+            freed_when[name] = list(memory.freed)
+            return {target: 0}
+        return run
+
+    tasks = [
+        Task(name="P", writes=["X"], run=record("P", "X")),
+        Task(name="R1", reads=["X"], writes=["A"], run=record("R1", "A")),
+        Task(name="R2", reads=["X", "A"], writes=["B"], run=record("R2", "B")),
+        Task(name="S", reads=["B"], writes=["C"], run=record("S", "C")),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"P": [], "R1": ["P"], "R2": ["R1"], "S": ["R2"]})
+    system.run(variables={}, memory=memory)
+
+    assert "X" not in freed_when["R2"]
+    assert freed_when["S"] == ["X", "A"]
+
+
+def test_overwritten_versions_are_released():
+    tasks = [
+        Task(name="W1", writes=["X"], run=lambda inputs: {"X": 1}, memory=100),
+        Task(name="R", reads=["X"], writes=["Y"], run=functools.partial(copy, "X", "Y"), memory=10),
+        Task(name="W2", reads=["Y"], writes=["X"], run=lambda inputs: {"X": inputs["Y"]}, memory=100),
+    ]
+    memory = MemoryManager()
+    system = TaskSystem(tasks=tasks, precedence={"W1": [], "R": ["W1"], "W2": ["R"]})
+    variables = system.run(variables={}, memory=memory)
+
+    assert variables == {"X": 2}
+    # the first X is freed once R has read it, before W2 starts
+    assert memory.freed == ["X", "Y"]
+    assert memory.peak == 110
+    assert memory.allocated == 100  # the result X of W2
+
+
+def test_budget_limits_the_tasks_running_at_once():
+    running, max_running = [0], [0]
+    lock = threading.Lock()
+
+    def work(i, inputs):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return {f"T{i}": i}
+
+    def reduce(i, inputs):
+        return {f"R{i}": inputs[f"T{i}"]}
+
+    tasks = []
+    precedence = {}
+    for i in range(6):
+        tasks.append(Task(name=f"work{i}", writes=[f"T{i}"], run=functools.partial(work, i), memory=100))
+        tasks.append(Task(name=f"reduce{i}", reads=[f"T{i}"], writes=[f"R{i}"],
+                          run=functools.partial(reduce, i), memory=1))
+        precedence[f"work{i}"] = []
+        precedence[f"reduce{i}"] = [f"work{i}"]
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+    memory = MemoryManager(budget=250)
+
+    with ThreadBackend(max_workers=6) as backend:
+        variables = system.run(backend=backend, variables={}, memory=memory)
+
+    assert max_running[0] == 2
+    assert memory.peak <= 250
+    assert variables == {f"R{i}": i for i in range(6)}
+
+
+def test_a_task_larger_than_the_budget_still_runs():
+    tasks = [Task(name="big", writes=["X"], run=lambda inputs: {"X": 1}, memory=1000)]
+    system = TaskSystem(tasks=tasks, precedence={"big": []})
+    assert system.run(variables={}, memory=MemoryManager(budget=10)) == {"X": 1}
+
+
+def test_variable_store_and_unsupported_modes():
+    store = VariableStore({"IN": 0})
+    pipeline().run(variables=store, memory=MemoryManager())
+    assert "X" not in store and store["Z"] == 3
+
+    with pytest.raises(ValueError, match="dataflow"):
+        pipeline().run(mode="levels", variables={"IN": 0}, memory=MemoryManager())
+
+
+def test_pattern_reads_keep_the_partitions_alive():
+    def fill(i, inputs):
+        return {("part", i): i}
+
+    def overwrite(inputs):
+        return {("part", 0): inputs[("part", 0)] * 10}
+
+    def total(inputs):
+        return {"total": sum(inputs.values())}
+
+    tasks = [Task(name=f"fill{i}", writes=[("part", i)], run=functools.partial(fill, i)) for i in range(3)]
+    tasks.append(Task(name="total", reads=[("part", ...)], writes=["total"], run=total))
+    tasks.append(Task(name="again", reads=[("part", 0)], writes=[("part", 0)], run=overwrite))
+    precedence = {"fill0": [], "fill1": [], "fill2": [], "total": ["fill0", "fill1", "fill2"], "again": ["total"]}
+    variables = TaskSystem(tasks=tasks, precedence=precedence).run(variables={}, memory=MemoryManager())
+
+    assert variables["total"] == 3
+    assert variables[("part", 0)] == 0
+
+
+def test_version_readers_are_shared_with_the_data_plane():
+    tasks = [
+        Task(name="fill", writes=[("part", 0)], run=lambda inputs: {}),
+        Task(name="total", reads=[("part", ...), "IN"], writes=["total"], run=lambda inputs: {}),
+        Task(name="again", reads=[("part", 0)], writes=[("part", 0)], run=lambda inputs: {}),
+    ]
+    precedence = {"fill": [], "total": ["fill"], "again": ["total"]}
+    versions_read, readers, last_writer = version_readers(precedence, {task.name: task for task in tasks},
+                                                          initial=[("part", 1), "IN"])
+
+    assert sorted(versions_read["total"], key=repr) == [("fill", ("part", 0)), (None, "IN"), (None, ("part", 1))]
+    assert readers[("fill", ("part", 0))] == 2
+    assert last_writer == {("part", 0): "again", "total": "total"}
@@ -0,0 +1,143 @@
+# tests/test_plan.py
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.plan import definition_hash, load_plan, save_plan
+from max_auto_parallelisation_library.validators import TaskSystemValidator
+
+
+def build_system():
+    tasks = [
+        Task(name="T1", writes=["X"], run=None),
+        Task(name="T2", writes=["Y"], run=None),
+        Task(name="T3", reads=["X", "Y"], writes=["Z"], run=None),
+    ]
+    precedence = {"T1": [], "T2": ["T1"], "T3": ["T2"]}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_plan_content():
+    plan = build_system().get_plan()
+
+    assert {task: set(deps) for task, deps in plan.max_precedence.items()} == {
+        "T1": set(), "T2": set(), "T3": {"T1", "T2"}
+    }
+    assert {task: set(succ) for task, succ in plan.successors.items()} == {
+        "T1": {"T3"}, "T2": {"T3"}, "T3": set()
+    }
+    assert [set(level) for level in plan.levels] == [{"T1", "T2"}, {"T3"}]
+    assert [list(level) for level in plan.seq_levels] == [["T1"], ["T2"], ["T3"]]
+
+
+def test_plan_is_immutable():
+    plan = build_system().get_plan()
+
+    with pytest.raises(AttributeError):
+        plan.levels = ()
+    with pytest.raises(TypeError):
+        plan.max_precedence["T1"] = ("T2",)
+
+
+def test_plan_is_computed_once(monkeypatch):
+    system = build_system()
+    calls = []
+    original = TaskSystem.create_max_parallel_system
+
+    def counting(self):
+        calls.append(self)
+        return original(self)
+
+    monkeypatch.setattr(TaskSystem, "create_max_parallel_system", counting)
+
+    for _ in range(3):
+        system.run()
+        system.runSeq()
+    assert len(calls) == 1
+
+    # parCost measures the planning apart, the measured runs reuse the plan
+    system.parCost(num_runs=2, warmup_runs=1, verbose=False)
+    assert len(calls) == 3
+
+
+def test_plan_is_invalidated():
+    system = build_system()
+    plan = system.get_plan()
+
+    system.precedence = {"T1": [], "T2": [], "T3": ["T1", "T2"]}
+    assert system.get_plan() is not plan
+    assert [set(level) for level in system.get_plan().seq_levels] == [{"T1", "T2"}, {"T3"}]
+
+    plan = system.get_plan()
+    system.tasks[2].reads = []
+    system.invalidate_plan()
+    assert system.get_plan().max_precedence["T3"] == ()
+
+
+def test_plan_file_round_trip(tmp_path):
+    system = build_system()
+    plan = system.get_plan()
+    digest = definition_hash(system.tasks, system.precedence)
+    path = tmp_path / "plan.bin"
+
+    save_plan(plan, path, digest)
+    loaded = load_plan(path, digest)
+
+    for attribute in ("precedence", "max_precedence", "successors"):
+        assert {k: set(v) for k, v in getattr(loaded, attribute).items()} == \
+            {k: set(v) for k, v in getattr(plan, attribute).items()}
+    assert loaded.levels == plan.levels
+    assert loaded.seq_levels == plan.seq_levels
+
+
+def test_plan_file_skips_planning(tmp_path, monkeypatch):
+    path = tmp_path / "plan.bin"
+    first = build_system()
+    first.plan_file = path
+    first.get_plan()
+
+    calls = []
+    monkeypatch.setattr(TaskSystem, "_build_plan", lambda self: calls.append(1))
+    monkeypatch.setattr(TaskSystemValidator, "validate_system", lambda *args: calls.append(2))
+    tasks = [Task(name="T1", writes=["X"]), Task(name="T2", writes=["Y"]),
+             Task(name="T3", reads=["X", "Y"], writes=["Z"])]
+    system = TaskSystem(tasks=tasks, precedence={"T1": [], "T2": ["T1"], "T3": ["T2"]}, plan_file=path)
+
+    assert [set(level) for level in system.get_plan().levels] == [{"T1", "T2"}, {"T3"}]
+    assert calls == []
+
+
+def test_plan_file_is_rebuilt_when_definitions_change(tmp_path):
+    path = tmp_path / "plan.bin"
+    tasks = [Task(name="T1", writes=["X"]), Task(name="T2", writes=["Y"]), Task(name="T3", reads=["X"])]
+    precedence = {"T1": [], "T2": ["T1"], "T3": ["T2"]}
+    old_system = build_system()
+    save_plan(old_system.get_plan(), path, definition_hash(old_system.tasks, precedence))
+
+    assert load_plan(path, definition_hash(tasks, precedence)) is None
+    system = TaskSystem(tasks=tasks, precedence=precedence, plan_file=path)
+    assert system.get_plan().max_precedence["T3"] == ("T1",)
+    assert load_plan(path, definition_hash(tasks, precedence)) is not None
+
+
+def test_invalid_plan_files_are_ignored(tmp_path):
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    truncated = tmp_path / "truncated.bin"
+    system = build_system()
+    save_plan(system.get_plan(), truncated, b"\0" * 32)
+    truncated.write_bytes(truncated.read_bytes()[:60])
+
+    assert load_plan(tmp_path / "missing.bin") is None
+    assert load_plan(empty) is None
+    assert load_plan(truncated) is None
+
+
+def test_large_plan_file(tmp_path):
+    tasks = [Task(name=f"tâche{i}", reads=[f"V{i - 1}"], writes=[f"V{i}"]) for i in range(5000)]
+    precedence = {f"tâche{i}": [f"tâche{j}" for j in range(max(0, i - 3), i)] for i in range(5000)}
+    path = tmp_path / "plan.bin"
+    plan = TaskSystem(tasks=tasks, precedence=precedence, plan_file=path).get_plan()
+
+    loaded = TaskSystem(tasks=tasks, precedence=precedence, plan_file=path).get_plan()
+
+    assert loaded.max_precedence == plan.max_precedence
+    assert len(loaded.levels) == 5000
@@ -0,0 +1,128 @@
+# tests/test_planner.py
+import random
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.validators import TaskSystemValidationError
+
+
+def random_task(rng, name, num_vars=8):
+    variables = [f"V{i}" for i in range(num_vars)]
+    return Task(name=name, reads=rng.sample(variables, 2), writes=rng.sample(variables, 1))
+
+
+def assert_same_plan(system):
+    plan = system.get_plan()
+    expected = TaskSystem(
+        tasks=list(system.tasks),
+        precedence={name: list(deps) for name, deps in system.precedence.items()},
+        validate=False,
+    )._build_plan()
+
+    normalise = lambda graph: {name: set(deps) for name, deps in graph.items()}
+    assert normalise(plan.precedence) == normalise(expected.precedence)
+    assert normalise(plan.max_precedence) == normalise(expected.max_precedence)
+    assert normalise(plan.successors) == normalise(expected.successors)
+    assert [set(level) for level in plan.levels] == [set(level) for level in expected.levels]
+    assert [set(level) for level in plan.seq_levels] == [set(level) for level in expected.seq_levels]
+
+
+def test_random_edits_match_full_rebuild():
+    rng = random.Random(42)
+    tasks = [random_task(rng, f"T{i}") for i in range(20)]
+    precedence = {task.name: [f"T{j}" for j in range(i) if rng.random() < 0.2]
+                  for i, task in enumerate(tasks)}
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+    counter = len(tasks)
+
+    for _ in range(60):
+        names = list(system.task_map)
+        action = rng.choice(["add_task", "remove_task", "add_dependency"])
+        if action == "add_task":
+            deps = rng.sample(names, min(len(names), rng.randint(0, 3)))
+            system.add_task(random_task(rng, f"T{counter}"), deps)
+            counter += 1
+        elif action == "remove_task" and len(names) > 2:
+            system.remove_task(rng.choice(names))
+        else:
+            task_name, dep = rng.sample(names, 2)
+            try:
+                system.add_dependency(task_name, dep)
+            except TaskSystemValidationError:
+                continue
+        assert_same_plan(system)
+
+
+def test_add_task_runs_with_the_system():
+    results = []
+    tasks = [
+        Task(name="A", writes=["X"], run=lambda: results.append("A")),
+        Task(name="B", reads=["Y"], run=lambda: results.append("B")),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": []})
+    system.get_plan()
+
+    system.add_task(Task(name="C", reads=["X"], writes=["Z"], run=lambda: results.append("C")), deps=["A", "B"])
+
+    assert system.get_plan().max_precedence["C"] == ("A",)
+    assert system.precedence["C"] == ["A", "B"]
+    system.run()
+    assert sorted(results) == ["A", "B", "C"]
+    assert results.index("A") < results.index("C")
+
+
+def test_add_dependency_rejects_cycles():
+    tasks = [Task(name=name, writes=["X"]) for name in "ABC"]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": ["A"], "C": ["B"]})
+
+    with pytest.raises(TaskSystemValidationError, match="cycle"):
+        system.add_dependency("A", "C")
+    with pytest.raises(TaskSystemValidationError, match="cycle"):
+        system.add_dependency("A", "A")
+    assert system.precedence["A"] == []
+
+
+def test_invalid_edits_are_rejected():
+    system = TaskSystem(tasks=[Task(name="A", writes=["X"])], precedence={"A": []})
+
+    with pytest.raises(TaskSystemValidationError, match="Duplicated"):
+        system.add_task(Task(name="A"))
+    with pytest.raises(TaskSystemValidationError, match="Invalid dependencies"):
+        system.add_task(Task(name="B"), deps=["missing"])
+    with pytest.raises(TaskSystemValidationError, match="Invalid dependencies"):
+        system.remove_task("missing")
+    assert list(system.task_map) == ["A"]
+
+
+def test_remove_task_connects_its_dependencies_to_its_successors():
+    tasks = [Task(name=name, reads=["X"], writes=["X"]) for name in "ABC"]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": ["A"], "C": ["B"]})
+
+    system.remove_task("B")
+
+    assert [task.name for task in system.tasks] == ["A", "C"]
+    assert system.precedence == {"A": [], "C": ["A"]}
+    assert system.get_plan().levels == (("A",), ("C",))
+
+
+def test_remove_task_keeps_the_order_of_conflicting_tasks():
+    tasks = [
+        Task(name="A", writes=["X"]),
+        Task(name="M", writes=["Y"]),
+        Task(name="B", reads=["X"], writes=["Z"]),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "M": ["A"], "B": ["M"]})
+    assert system.get_plan().max_precedence["B"] == ("A",)
+
+    system.remove_task("M")
+
+    assert system.get_plan().max_precedence == {"A": (), "B": ("A",)}
+
+
+def test_setting_the_precedence_discards_the_planner():
+    tasks = [Task(name=name, writes=["X"]) for name in "AB"]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": []})
+    system.add_dependency("B", "A")
+
+    system.precedence = {"A": ["B"], "B": []}
+
+    assert system.get_plan().max_precedence == {"A": ("B",), "B": ()}
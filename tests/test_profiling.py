@@ -0,0 +1,71 @@
+# tests/test_profiling.py
+import threading
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.profiling import percentile, summarise
+
+
+def test_summarise():
+    stats = summarise([1.0, 2.0, 3.0, 4.0])
+
+    assert stats["mean"] == 2.5
+    assert stats["median"] == 2.5
+    assert stats["min"] == 1.0 and stats["max"] == 4.0
+    assert stats["stddev"] == pytest.approx(1.2910, abs=1e-4)
+    # t(3) = 3.182
+    assert stats["ci95"] == pytest.approx((2.5 - 2.0540, 2.5 + 2.0540), abs=1e-3)
+    assert summarise([2.0])["ci95"] == (2.0, 2.0)
+
+
+def test_percentile():
+    assert percentile(list(range(101)), 0.95) == 95
+    assert percentile([1.0, 2.0], 0.5) == 1.5
+
+
+def test_run_sequential_uses_a_single_thread():
+    threads = set()
+
+    def record():
+        threads.add(threading.get_ident())
+
+    tasks = [Task(name=f"T{i}", writes=[f"V{i}"], run=record) for i in range(5)]
+    system = TaskSystem(tasks=tasks, precedence={f"T{i}": [] for i in range(5)})
+
+    system.run_sequential()
+
+    assert threads == {threading.get_ident()}
+
+
+def test_run_sequential_follows_precedence_with_variables():
+    tasks = [
+        Task(name="B", reads=["X"], writes=["Y"], run=lambda inputs: {"Y": inputs["X"] + 1}),
+        Task(name="A", writes=["X"], run=lambda inputs: {"X": 1}),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": ["A"]})
+
+    assert system.run_sequential(variables={}) == {"X": 1, "Y": 2}
+
+
+def test_parcost_reports_statistics():
+    def sleeper():
+        time.sleep(0.01)
+
+    tasks = [Task(name=f"T{i}", writes=[f"V{i}"], run=sleeper) for i in range(4)]
+    system = TaskSystem(tasks=tasks, precedence={f"T{i}": [] for i in range(4)})
+
+    results = system.parCost(num_runs=3, warmup_runs=1, verbose=False, baseline="sequential")
+
+    assert len(results["sequential"]["samples"]) == 3
+    assert len(results["parallel"]["samples"]) == 3
+    assert len(results["planning"]["samples"]) == 3
+    assert results["sequential"]["median"] >= 0.04
+    assert results["speedup"] > 1.5
+    low, high = results["parallel"]["ci95"]
+    assert low <= results["parallel_mean_time"] <= high
+
+
+def test_parcost_unknown_baseline():
+    system = TaskSystem(tasks=[Task(name="T1")], precedence={"T1": []})
+    with pytest.raises(ValueError, match="Unknown baseline"):
+        system.parCost(baseline="none")
@@ -0,0 +1,117 @@
+# tests/test_resources.py
+import functools
+import random
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.bernstein import ConflictIndex
+from max_auto_parallelisation_library.plan import definition_hash
+from max_auto_parallelisation_library.resources import expand, is_pattern, keys_overlap
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("table", "table", True),
+    ("table", ("table",), False),
+    (("table", 1), ("table", 1), True),
+    (("table", 1), ("table", 2), False),
+    (("table", 1), ("table", 1, "x"), False),
+    (("table", ...), ("table", 1, "x"), True),
+    (("table", ...), ("table",), True),
+    (("table", ...), ("index", 1), False),
+    (("table", range(0, 4)), ("table", 3), True),
+    (("table", range(0, 4)), ("table", 4), False),
+    (("table", range(0, 4)), ("table", "3"), False),
+    (("table", range(0, 4)), ("table", range(3, 8)), True),
+    (("table", range(0, 4)), ("table", range(4, 8)), False),
+    (("table", range(0, 4)), ("table", range(2, 2)), False),
+    (("table", range(9, 0, -1)), ("table", 1), True),
+    (("table", range(0, 4), ...), ("table", 2, "column"), True),
+])
+def test_keys_overlap(a, b, expected):
+    assert keys_overlap(a, b) is expected
+    assert keys_overlap(b, a) is expected
+
+
+def test_patterns_expand_to_the_variables_they_cover():
+    variables = {("table", i): i for i in range(5)}
+    variables["total"] = 0
+    assert is_pattern(("table", ...)) and not is_pattern(("table", 1))
+    assert expand([("table", range(1, 3)), "total"], variables) == [("table", 1), ("table", 2), "total"]
+    assert expand([("table", ...)], variables) == [("table", i) for i in range(5)]
+
+
+def random_key(rng):
+    key = tuple(rng.choice(["a", "b", rng.randrange(6), range(rng.randrange(6), rng.randrange(7))])
+                for _ in range(rng.randint(1, 3)))
+    return key + (...,) if rng.random() < 0.2 else key
+
+
+def test_index_matches_pairwise_overlaps():
+    rng = random.Random(3)
+    tasks = [Task(name=f"T{i}", reads=[random_key(rng) for _ in range(2)], writes=[random_key(rng)])
+             for i in range(60)]
+    index = ConflictIndex(tasks, {task.name: i for i, task in enumerate(tasks)})
+    removed = tasks[10]
+    index.remove(removed, 10)
+
+    for i, task in enumerate(tasks):
+        expected = 0
+        for j, other in enumerate(tasks):
+            if other is removed:
+                continue
+            if (any(keys_overlap(w, v) for w in task.writes for v in other.reads + other.writes)
+                    or any(keys_overlap(r, w) for r in task.reads for w in other.writes)):
+                expected |= 1 << j
+        assert index.conflicts(task) == expected, task.name
+
+
+def partitioned_system(partitions):
+    def fill(partition, inputs):
+        return {("table", partition): partition * partition}
+
+    def total(inputs):
+        return {"total": sum(inputs.values())}
+
+    tasks = [Task(name=f"fill{i}", writes=[("table", i)], run=functools.partial(fill, i))
+             for i in range(partitions)]
+    tasks.append(Task(name="total", reads=[("table", ...)], writes=["total"], run=total))
+    precedence = {f"fill{i}": [f"fill{i - 1}"] if i else [] for i in range(partitions)}
+    precedence["total"] = [f"fill{partitions - 1}"]
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_partitioned_writes_run_in_parallel():
+    system = partitioned_system(8)
+    plan = system.get_plan()
+
+    assert len(plan.levels[0]) == 8
+    assert sorted(plan.max_precedence["total"]) == sorted(f"fill{i}" for i in range(8))
+    assert system.run(variables={})["total"] == sum(i * i for i in range(8))
+
+
+def test_pattern_writes_are_declared():
+    def fill(inputs):
+        return {("table", 1): 1, ("table", 9): 9}
+
+    tasks = [Task(name="fill", writes=[("table", range(0, 4))], run=fill)]
+    system = TaskSystem(tasks=tasks, precedence={"fill": []})
+    with pytest.raises(ValueError, match=r"\('table', 9\)"):
+        system.run(variables={})
+
+
+def test_structured_keys_are_hashed():
+    system = partitioned_system(3)
+    assert definition_hash(system.tasks, system.precedence) != definition_hash(
+        partitioned_system(4).tasks, partitioned_system(4).precedence)
+
+
+def test_conflicts_of_many_partitions_are_not_quadratic():
+    tasks = [Task(name=f"T{i}", reads=[("source", range(i, i + 2))], writes=[("table", i)])
+             for i in range(20000)]
+    index = {task.name: i for i, task in enumerate(tasks)}
+
+    start = time.perf_counter()
+    conflict_index = ConflictIndex(tasks, index)
+    masks = [conflict_index.conflicts(task) for task in tasks]
+    assert time.perf_counter() - start < 5
+    assert all(mask == 1 << i for i, mask in enumerate(masks))
@@ -0,0 +1,130 @@
+# tests/test_scheduler.py
+import functools
+import time
+import threading
+import pytest
+from max_auto_parallelisation_library.executors import ThreadBackend
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+
+
+def build_uneven_system(start_times):
+    """
+    Builds a system with a slow independent task and a short chain B -> C.
+    """
+    lock = threading.Lock()
+
+    def make_run(name, delay):
+        def run():
+            with lock:
+                start_times[name] = time.perf_counter()
+            time.sleep(delay)
+        return run
+
+    tasks = [
+        Task(name="A", writes=["X"], run=make_run("A", 0.3)),
+        Task(name="B", writes=["Y"], run=make_run("B", 0.05)),
+        Task(name="C", reads=["Y"], writes=["Z"], run=make_run("C", 0.05)),
+    ]
+    precedence = {"A": [], "B": [], "C": ["B"]}
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_dataflow_starts_tasks_without_level_barrier():
+    """C only depends on B, so it must not wait for the slow task A."""
+    start_times = {}
+    system = build_uneven_system(start_times)
+
+    begin = time.perf_counter()
+    system.run()
+
+    assert start_times["C"] - begin < 0.25, "C waited for the slow task A"
+
+
+def test_levels_mode_keeps_barrier():
+    """The level-by-level mode waits for the whole level before starting C."""
+    start_times = {}
+    system = build_uneven_system(start_times)
+
+    begin = time.perf_counter()
+    system.run(mode="levels")
+
+    assert start_times["C"] - begin >= 0.3
+
+
+def test_dataflow_respects_precedence():
+    """Every task starts after all of its predecessors have finished."""
+    order = []
+    lock = threading.Lock()
+
+    def make_run(name):
+        def run():
+            time.sleep(0.01)
+            with lock:
+                order.append(name)
+        return run
+
+    tasks = [
+        Task(name="1", writes=["A"], run=make_run("1")),
+        Task(name="2", reads=["A"], writes=["B"], run=make_run("2")),
+        Task(name="3", reads=["A"], writes=["C"], run=make_run("3")),
+        Task(name="4", reads=["B", "C"], writes=["D"], run=None),
+        Task(name="5", reads=["D"], writes=["E"], run=make_run("5")),
+    ]
+    precedence = {"1": [], "2": ["1"], "3": ["1"], "4": ["2", "3"], "5": ["4"]}
+
+    TaskSystem(tasks=tasks, precedence=precedence).run()
+
+    assert order[0] == "1"
+    assert set(order[1:3]) == {"2", "3"}
+    assert order[3] == "5"
+
+
+def test_dataflow_propagates_task_exception():
+    """An exception raised by a task is raised by run()."""
+    def failing():
+        raise RuntimeError("boom")
+
+    tasks = [Task(name="T1", writes=["X"], run=failing)]
+    system = TaskSystem(tasks=tasks, precedence={"T1": []})
+
+    with pytest.raises(RuntimeError, match="boom"):
+        system.run()
+
+
+@pytest.mark.parametrize("mode", ["dataflow", "priority"])
+def test_failed_run_waits_for_the_running_tasks(mode):
+    """When run() raises, no task of the run is still executing and the queued ones never start."""
+    finished, started = [], []
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def slow():
+        time.sleep(0.3)
+        finished.append("slow")
+
+    def later(i):
+        started.append(i)
+        time.sleep(0.02)
+
+    # the queued tasks come first, the dataflow scheduler submits the ready tasks from the last one
+    tasks = [Task(name=f"c_later{i}", writes=[f"Z{i}"], run=functools.partial(later, i)) for i in range(5)]
+    tasks += [Task(name="b_slow", writes=["Y"], run=slow), Task(name="a_fail", writes=["X"], run=failing)]
+    system = TaskSystem(tasks=tasks, precedence={task.name: [] for task in tasks})
+
+    with ThreadBackend(max_workers=2) as backend:
+        with pytest.raises(RuntimeError, match="boom"):
+            system.run(mode=mode, backend=backend)
+        assert finished == ["slow"]
+        time.sleep(0.05)
+    # the worker freed by the failure may have taken the next queued task before it was cancelled
+    assert len(started) <= 1
+
+
+def test_unknown_mode():
+    tasks = [Task(name="T1", writes=["X"], run=None)]
+    system = TaskSystem(tasks=tasks, precedence={"T1": []})
+
+    with pytest.raises(ValueError, match="Unknown execution mode"):
+        system.run(mode="unknown")
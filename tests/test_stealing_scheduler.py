@@ -0,0 +1,154 @@
+# tests/test_stealing_scheduler.py
+import threading
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.executors import ThreadBackend
+from max_auto_parallelisation_library.graph import successor_map
+from max_auto_parallelisation_library.stealing_scheduler import StealingBackend, run_work_stealing, shared_stealing_backend
+from max_auto_parallelisation_library.tracing import Tracer
+
+
+def add_one(source, target):
+    def run(inputs):
+        return {target: inputs.get(source, 0) + 1}
+    return run
+
+
+def chains(count, length):
+    tasks, precedence = [], {}
+    for c in range(count):
+        for i in range(length):
+            name, source = f"C{c}_{i}", f"V{c}_{i - 1}" if i else None
+            tasks.append(Task(name=name, reads=[source] if source else [], writes=[f"V{c}_{i}"],
+                              run=add_one(source, f"V{c}_{i}")))
+            precedence[name] = [f"C{c}_{i - 1}"] if i else []
+    return TaskSystem(tasks=tasks, precedence=precedence)
+
+
+def test_results_match_the_dataflow_scheduler():
+    system = chains(8, 50)
+    with ThreadBackend(max_workers=4) as backend:
+        variables = system.run(mode="stealing", backend=backend, variables={})
+    assert variables == system.run(variables={})
+    assert variables["V7_49"] == 50
+
+
+def test_chains_stay_on_the_worker_that_produced_their_inputs():
+    tracer = Tracer()
+    system = chains(4, 20)
+    with ThreadBackend(max_workers=4) as backend:
+        system.run(mode="stealing", backend=backend, variables={}, tracer=tracer)
+
+    threads = {}
+    for event in tracer.events:
+        threads.setdefault(event["task"].split("_")[0], set()).add(event["thread"])
+        assert event["submit"] <= event["start"] <= event["end"]
+    # a chain only moves to another worker when it is stolen
+    assert sum(len(workers) for workers in threads.values()) < 4 * 20 / 2
+
+
+def test_idle_workers_steal_ready_tasks():
+    started = []
+    barrier = threading.Barrier(4, timeout=5)
+
+    def wait_for_all():
+        started.append(threading.get_ident())
+        barrier.wait()
+
+    # the source releases four tasks on its own deque, they only finish if stolen
+    tasks = [Task(name="source", writes=["S"], run=lambda: None)]
+    tasks += [Task(name=f"T{i}", reads=["S"], writes=[f"O{i}"], run=wait_for_all) for i in range(4)]
+    precedence = {"source": []}
+    precedence.update({f"T{i}": ["source"] for i in range(4)})
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+
+    with ThreadBackend(max_workers=4) as backend:
+        system.run(mode="stealing", backend=backend)
+    assert len(set(started)) == 4
+
+
+def test_errors_stop_the_run():
+    executed = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    tasks = [Task(name="A", writes=["X"], run=fail),
+             Task(name="B", reads=["X"], writes=["Y"], run=lambda: executed.append("B"))]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": ["A"]})
+    with pytest.raises(RuntimeError, match="boom"):
+        system.run(mode="stealing")
+    assert executed == []
+
+
+def test_process_backends_are_rejected():
+    system = chains(1, 2)
+    with pytest.raises(ValueError, match="thread backend"):
+        system.run(mode="stealing", backend="process", variables={})
+
+
+def test_many_fine_grained_tasks():
+    system = chains(200, 50)
+    plan = system.get_plan()
+    variables = {}
+    start = time.perf_counter()
+    with StealingBackend(max_workers=8, seed=1) as backend:
+        run_work_stealing(plan.max_precedence, system.task_map, backend, variables,
+                          successor_map(plan.max_precedence))
+    assert time.perf_counter() - start < 30
+    assert all(variables[f"V{c}_49"] == 50 for c in range(200))
+
+
+def test_workers_are_reused_across_runs_and_systems():
+    threads = set()
+
+    def record(inputs):
+        threads.add(threading.current_thread())
+        return {}
+
+    def system(prefix):
+        tasks = [Task(name=f"{prefix}{i}", run=record) for i in range(20)]
+        return TaskSystem(tasks=tasks, precedence={task.name: [] for task in tasks})
+
+    count = threading.active_count()
+    with StealingBackend(max_workers=3) as backend:
+        for prefix in "ABC":
+            system(prefix).run(mode="stealing", backend=backend, variables={})
+        assert threading.active_count() == count + 3
+        assert len(threads) <= 3
+        # the workers also execute the tasks submitted by the other schedulers
+        assert system("D").run(backend=backend, variables={}) == {}
+    assert threading.active_count() == count
+    # a closed backend starts new workers when it is used again
+    with backend:
+        system("E").run(mode="stealing", backend=backend, variables={})
+        assert threading.active_count() == count + 3
+    assert threading.active_count() == count
+
+    # the other thread backends run on a shared stealing backend with as many workers
+    with ThreadBackend(max_workers=2) as thread_backend:
+        system("F").run(mode="stealing", backend=thread_backend, variables={})
+    assert shared_stealing_backend(2).worker_count() == 2
+    assert len(shared_stealing_backend(2)._threads) == 2
+
+
+def test_failed_run_waits_for_the_running_tasks():
+    finished = []
+
+    def fail():
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def slow():
+        time.sleep(0.2)
+        finished.append("slow")
+
+    tasks = [Task(name="A", run=fail), Task(name="B", run=slow)]
+    system = TaskSystem(tasks=tasks, precedence={"A": [], "B": []})
+    with StealingBackend(max_workers=2) as backend:
+        with pytest.raises(RuntimeError, match="boom"):
+            system.run(mode="stealing", backend=backend)
+        assert finished == ["slow"]
+        # the backend is still usable after a failed run
+        assert chains(2, 3).run(mode="stealing", backend=backend, variables={})["V1_2"] == 3
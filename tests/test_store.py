@@ -0,0 +1,172 @@
+# tests/test_store.py
+import asyncio
+import functools
+import threading
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.store import ReadWriteLock, UndeclaredAccessError, VariableStore
+
+
+def produce(view):
+    view["X"] = 1
+    view["Y"] = 2
+
+
+def add(view):
+    view["Z"] = view["X"] + view["Y"]
+
+
+def add_returning(view):
+    return {"Z": view["X"] + view["Y"]}
+
+
+def sneaky(view):
+    return {"Z": view["X"] + view["Y"] + view.get("W", 0)}
+
+
+def build_system(run_add=add, add_reads=("X", "Y")):
+    tasks = [
+        Task(name="produce", writes=["X", "Y"], run=produce, bound="cpu"),
+        Task(name="add", reads=list(add_reads), writes=["Z"], run=run_add, bound="cpu"),
+    ]
+    return TaskSystem(tasks=tasks, precedence={"produce": [], "add": ["produce"]})
+
+
+@pytest.mark.parametrize("backend", ["thread", "process", "hybrid"])
+def test_tasks_exchange_values_through_their_views(backend):
+    store = VariableStore()
+    build_system().run(backend=backend, variables=store)
+    assert dict(store) == {"X": 1, "Y": 2, "Z": 3}
+
+
+def test_returned_outputs_are_stored():
+    store = VariableStore()
+    build_system(add_returning).runSeq(variables=store)
+    assert store["Z"] == 3
+    assert store.version("Z") == 1
+
+
+def test_names_and_structured_keys_can_be_mixed():
+    def combine(view):
+        view[("t", 2)] = view["x"] + view[("t", 1)]
+
+    tasks = [Task(name="combine", reads=["x", ("t", 1)], writes=["y", ("t", 2)], run=combine)]
+    store = VariableStore({"x": 1, ("t", 1): 2})
+    TaskSystem(tasks=tasks, precedence={"combine": []}).run(variables=store)
+    assert store[("t", 2)] == 3
+
+
+def fill_part(i, view):
+    view[("t", i)] = i
+
+
+def total_parts(view):
+    # a view or the inputs dictionary of the explicit convention
+    return {"total": sum(view.values())}
+
+
+def test_patterns_of_structured_keys():
+    tasks = [Task(name=f"fill{i}", writes=[("t", ...)], run=functools.partial(fill_part, i)) for i in range(3)]
+    tasks.append(Task(name="total", reads=["base", ("t", ...)], writes=["total"], run=total_parts))
+    precedence = {"fill0": [], "fill1": ["fill0"], "fill2": ["fill1"], "total": ["fill2"]}
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+
+    store = VariableStore({"base": 10, "other": 5}, debug=True)
+    system.run(variables=store)
+    assert store["total"] == 13
+    # the same as with the dictionary of the variables
+    inputs = {"base": 10, "other": 5, ("t", 0): 0, ("t", 1): 1, ("t", 2): 2}
+    assert TaskSystem(tasks=tasks[-1:], precedence={"total": []}).run(variables=inputs)["total"] == 13
+    assert store.violations == []
+
+    # keys outside of the patterns are still undeclared
+    with pytest.raises(UndeclaredAccessError, match=r"writes undeclared variable: \('u', 0\)"):
+        store.view(tasks[0])[("u", 0)] = 1
+    with pytest.raises(UndeclaredAccessError, match="reads undeclared variable: other"):
+        store.view(tasks[-1])["other"]
+
+
+def test_undeclared_write_is_rejected():
+    def bad(view):
+        view["W"] = 0
+
+    store = VariableStore({"X": 1, "Y": 2})
+    system = TaskSystem(tasks=[Task(name="bad", reads=["X"], writes=["Z"], run=bad)], precedence={"bad": []})
+    with pytest.raises(UndeclaredAccessError, match="Task bad writes undeclared variable: W"):
+        system.run(variables=store)
+
+
+def test_undeclared_read_without_debug_is_not_visible():
+    store = VariableStore({"X": 1, "Y": 2, "W": 5})
+    # Y is not declared, the view does not expose it
+    with pytest.raises(KeyError, match="Y"):
+        TaskSystem(
+            tasks=[Task(name="add", reads=["X"], writes=["Z"], run=sneaky)], precedence={"add": []}
+        ).run_sequential(variables=store)
+    assert "Z" not in store and store.violations == []
+
+
+def test_debug_mode_flags_undeclared_reads():
+    store = VariableStore({"W": 5}, debug=True)
+    with pytest.raises(UndeclaredAccessError, match="Task add reads undeclared variable: Y"):
+        build_system(sneaky, add_reads=("X",)).run(variables=store)
+    assert store.violations == [("add", "read", "Y")]
+
+
+def test_async_coroutines_write_into_their_views():
+    async def produce_async(view):
+        await asyncio.sleep(0)
+        view["X"] = 10
+        view["Y"] = 20
+
+    tasks = [
+        Task(name="produce", writes=["X", "Y"], run=produce_async),
+        Task(name="add", reads=["X", "Y"], writes=["Z"], run=add),
+    ]
+    system = TaskSystem(tasks=tasks, precedence={"produce": [], "add": ["produce"]})
+    store = VariableStore()
+    asyncio.run(system.run_async(variables=store))
+    assert store["Z"] == 30
+
+
+def test_snapshots_are_consistent_under_concurrent_writes():
+    store = VariableStore({"A": 0, "B": 0})
+    stop = threading.Event()
+
+    def writer():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            store.write({"A": value, "B": value})
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(2000):
+            snapshot = store.read(["A", "B"])
+            assert snapshot["A"] == snapshot["B"]
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_read_write_lock_excludes_writers():
+    lock = ReadWriteLock()
+    events = []
+    lock.acquire_read()
+    lock.acquire_read()
+
+    def write():
+        lock.acquire_write()
+        events.append("write")
+        lock.release_write()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    time.sleep(0.05)
+    assert events == []
+    lock.release_read()
+    lock.release_read()
+    thread.join(timeout=1)
+    assert events == ["write"]
@@ -0,0 +1,71 @@
+# tests/test_tracing.py
+import json
+import os
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.tracing import Tracer
+
+
+def sleeper(delay):
+    def run():
+        time.sleep(delay)
+    return run
+
+
+def build_system():
+    tasks = [
+        Task(name="A", writes=["X"], run=sleeper(0.05)),
+        Task(name="B", writes=["Y"], run=sleeper(0.01)),
+        Task(name="C", reads=["X", "Y"], writes=["Z"], run=sleeper(0.02)),
+    ]
+    return TaskSystem(tasks=tasks, precedence={"A": [], "B": [], "C": ["A", "B"]}, max_workers=2)
+
+
+@pytest.mark.parametrize("mode", ["dataflow", "levels", "priority"])
+def test_tracer_records_every_task(mode):
+    tracer = Tracer()
+    with build_system() as system:
+        system.run(mode=mode, tracer=tracer)
+
+    events = {event["task"]: event for event in tracer.events}
+    assert set(events) == {"A", "B", "C"}
+    for event in events.values():
+        assert event["submit"] <= event["start"] < event["end"]
+        assert event["pid"] == os.getpid()
+        assert event["error"] is None
+    assert events["C"]["start"] >= events["A"]["end"]
+
+
+def test_summary_and_chrome_trace(tmp_path):
+    tracer = Tracer()
+    with build_system() as system:
+        system.run(tracer=tracer)
+        summary = tracer.summary(system.get_plan().max_precedence)
+
+    assert summary["critical_path"] == ["A", "C"]
+    assert summary["critical_path_length"] >= 0.07
+    assert summary["wall_time"] >= summary["critical_path_length"]
+    assert sum(worker["tasks"] for worker in summary["workers"].values()) == 3
+    for worker in summary["workers"].values():
+        assert 0 < worker["utilisation"] <= 1
+
+    tracer.save(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as file:
+        trace = json.load(file)
+    assert {event["name"] for event in trace["traceEvents"]} == {"A", "B", "C"}
+    assert all(event["ph"] == "X" and event["dur"] > 0 for event in trace["traceEvents"])
+
+
+def test_tracer_records_exceptions():
+    def failing():
+        raise RuntimeError("boom")
+
+    tracer = Tracer()
+    system = TaskSystem(tasks=[Task(name="T1", writes=["X"], run=failing)], precedence={"T1": []})
+
+    with pytest.raises(RuntimeError, match="boom"):
+        system.runSeq(tracer=tracer)
+
+    assert tracer.events[0]["error"] == "RuntimeError('boom')"
+    assert tracer.to_chrome_trace()["traceEvents"][0]["args"]["error"] == "RuntimeError('boom')"
@@ -0,0 +1,60 @@
+# tests/test_validators.py
+import time
+import pytest
+from max_auto_parallelisation_library.maxpar import Task, TaskSystem
+from max_auto_parallelisation_library.validators import TaskSystemValidationError
+
+
+def chain(num_tasks):
+    tasks = [Task(name=f"T{i}", reads=[f"V{i}"], writes=[f"V{i + 1}"]) for i in range(num_tasks)]
+    precedence = {f"T{i}": [f"T{i - 1}"] if i else [] for i in range(num_tasks)}
+    return tasks, precedence
+
+
+def test_long_chain_does_not_hit_recursion_limit():
+    tasks, precedence = chain(5000)
+
+    system = TaskSystem(tasks=tasks, precedence=precedence)
+
+    assert len(system.getAllDependencies("T4999")) == 4999
+
+
+def test_large_system_is_validated_quickly():
+    tasks, precedence = chain(100000)
+
+    start = time.perf_counter()
+    TaskSystem(tasks=tasks, precedence=precedence)
+
+    assert time.perf_counter() - start < 5
+
+
+def test_cycle_path_is_reported():
+    tasks = [Task(name=name) for name in ("A", "B", "C", "D")]
+    precedence = {"A": [], "B": ["A", "D"], "C": ["B"], "D": ["C"]}
+
+    with pytest.raises(TaskSystemValidationError) as error:
+        TaskSystem(tasks=tasks, precedence=precedence)
+
+    assert "Detected cycle in precedence graph: B -> D -> C -> B" in str(error.value)
+
+
+def test_several_duplicates_are_reported():
+    tasks = [Task(name=name) for name in ("A", "B", "A", "B", "C")]
+
+    with pytest.raises(TaskSystemValidationError, match="Duplicated tasks name detected: A, B"):
+        TaskSystem(tasks=tasks, precedence={"A": [], "B": [], "C": []})
+
+
+def test_unknown_dependency_is_reported_without_key_error():
+    tasks = [Task(name="T1")]
+
+    with pytest.raises(TaskSystemValidationError, match="Invalid dependencies for T1: T2"):
+        TaskSystem(tasks=tasks, precedence={"T1": ["T2"]})
+
+
+def test_validation_can_be_skipped():
+    tasks = [Task(name="T1"), Task(name="T1")]
+
+    system = TaskSystem(tasks=tasks, precedence={"T1": []}, validate=False)
+
+    assert system.precedence == {"T1": []}